@@ -4,6 +4,8 @@ from floor_plan_reader.agents.wall_segment import WallSegment
 
 
 class AgentManager:
+    # Queued recomputes run per tick, the rest waits for the next tick
+    RECOMPUTE_BUDGET = 32
 
     def __init__(self, simulation):
         self.simulation = simulation
@@ -20,11 +22,13 @@ class AgentManager:
                 agent.run()
             else:
                 self.zombie_candidates.append(agent)
+        world.recompute_queue.drain(self.RECOMPUTE_BUDGET)
         for zombie in self.zombie_candidates:
             if zombie in world.agents:
                 world.agents.remove(zombie)
             if zombie in world.walls:
                 world.walls.remove(zombie)
+                world.walls_by_id.pop(zombie.id, None)
             if zombie in world.blobs:
                 world.blobs.remove(zombie)
             if zombie in world.wall_segments:
@@ -35,6 +39,7 @@ class AgentManager:
             agent = world.candidates.popleft()
             if isinstance(agent, Mushroom):
                 world.walls.add(agent)
+                world.walls_by_id[agent.id] = agent
             if isinstance(agent, WallSegment):
                 world.wall_segments.add(agent)
             if isinstance(agent, Blob):
@@ -1,5 +1,7 @@
 import pygame
 
+from floor_plan_reader.display.agent_draw import AgentDraw
+
 
 class Agent:
     def __init__(self, agent_id):
@@ -21,6 +23,53 @@ class Agent:
     def draw(self, screen, zoom_factor, offset_x, offset_y):
         pass
 
+    def get_state(self):
+        """
+        Name of the state the agent is in, None for agents without states.
+        """
+        return None
+
+    def get_collision_box(self):
+        return None
+
+    def get_overlay_key(self):
+        """
+        Changes whenever get_overlay_cells() would; None when the agent shows no cells.
+        """
+        return None
+
+    def get_overlay_cells(self):
+        """
+        Cells the view paints into its OverlayLayers, as {layer: cells}.
+        """
+        return {}
+
+    def get_frozen_overlay(self):
+        """
+        (key, {layer: frozenset of cells}) for an AgentDraw, copied again only when the key changed.
+        """
+        key = self.get_overlay_key()
+        if key is None:
+            return None, {}
+        frozen = getattr(self, "_frozen_overlay", None)
+        if frozen is None or frozen[0] != key:
+            frozen = key, {layer: frozenset(cells) for layer, cells in self.get_overlay_cells().items()}
+            self._frozen_overlay = frozen
+        return frozen
+
+    def snapshot(self):
+        """
+        Immutable copy of what the view draws of this agent, taken on the simulation thread.
+        """
+        return AgentDraw(self)
+
+    def get_bounds(self):
+        """
+        (min_x, min_y, max_x, max_y) in map coordinates of what draw() paints, used to skip
+        agents outside the window. None when unknown: the agent is always drawn.
+        """
+        return None
+
     def collidepoint(self, x, y):
         rect = self.get_world_rect()
         collide = rect.collidepoint(x, y)
@@ -2,6 +2,7 @@ import numpy as np
 import pygame
 import random
 from floor_plan_reader.agents.agent import Agent
+from floor_plan_reader.display.ant_draw import AntDraw
 
 
 class Ant(Agent):
@@ -26,17 +27,17 @@ class Ant(Agent):
                 color = (255, 255, 0)
                 pygame.draw.circle(screen, color, (scaled_x, scaled_y), size)
 
-    def draw(self, screen, vp):
-        scaled_x, scaled_y = vp.convert(self.x, self.y)
+    def get_bounds(self):
+        return self.x, self.y, self.x, self.y
 
-        # Color the ant based on ID or a fixed color
-        if self.alive:
-            color = (0, 0, 255)  # red
-            size = 5
-        else:
-            color = (0, 0, 255)
-            size = 2
-        pygame.draw.circle(screen, color, (scaled_x, scaled_y), size)
+    def get_state(self):
+        return self.state
+
+    def snapshot(self):
+        return AntDraw(self)
+
+    def draw(self, screen, vp):
+        self.snapshot().draw(screen, vp)
 
     def run(self):
         if self.world.is_food(self.x, self.y):
@@ -1,9 +1,8 @@
 import random
 
-import pygame
-
 from floor_plan_reader.agents.agent import Agent
 from floor_plan_reader.cell import Cell
+from floor_plan_reader.display.overlay_layers import OverlayLayers
 from floor_plan_reader.math.bounding_box import BoundingBox
 
 
@@ -14,6 +13,8 @@ class Blob(Agent):
         self.cells = set()
         self.growth = set()
         self.free_slot = set()
+        # Bumped whenever free_slot changes, see get_overlay_key
+        self.slots_version = 0
         self.origin = Cell(x, y)
         self.cells.add(self.origin)
         self.growth.add(self.origin)
@@ -24,7 +25,10 @@ class Blob(Agent):
         self._walls = set()
         self._dead_walls = set()
         self._intersections = set()
+        # (intersections, {line id: (start, end)}) solved by the last "Blob Rerun", see set_rerun()
+        self.rerun = None
         self.bounding_box = None
+        self.bounding_box_version = None
 
     def __lt__(self, other):
         # Compare based on the 'value' attribute
@@ -33,6 +37,7 @@ class Blob(Agent):
     def free(self, cell):
         if cell in self.cells:
             self.free_slot.add(cell)
+            self.slots_version += 1
 
     def is_food(self, x, y):
         return self.world.is_food(x, y)
@@ -109,11 +114,21 @@ class Blob(Agent):
         pass
 
     def calculate_bounding_box(self):
+        # Cells are only ever added, their count tells whether the box can have changed
+        if self.bounding_box is not None and self.bounding_box_version == len(self.cells):
+            return
         self.bounding_box = BoundingBox.from_cells(self.cells)
+        self.bounding_box_version = len(self.cells)
 
     def add_intersection(self, i):
         self._intersections.add(i)
 
+    def remove_intersection(self, i):
+        self._intersections.discard(i)
+
+    def set_rerun(self, intersections, lines):
+        self.rerun = (intersections, lines)
+
     def run(self):
         if self.status == "born":
             self.status = "grow"
@@ -128,6 +143,7 @@ class Blob(Agent):
                     self.calculate_bounding_box()
                     for c in self.cells:
                         self.free_slot.add(c)
+                    self.slots_version += 1
                 else:
                     self.status = "cleanup"
             return
@@ -137,6 +153,7 @@ class Blob(Agent):
             for s in free:
                 if self.world.is_occupied(s.x, s.y) or self.world.is_wall_occupied(s.x, s.y):
                     self.free_slot.remove(s)
+                    self.slots_version += 1
             if length != len(self.free_slot) and length > 0:
                 self.status = "mush"
             elif length > 0:
@@ -162,7 +179,7 @@ class Blob(Agent):
     def print_blob(self):
         x, y = self.get_center()
         width, height = self.bounding_box.get_shape()
-        self.world.print_snapshot(x, y, width + 2, height + 2, "blob")
+        self.world.print_snapshot(x, y, width + 2, height + 2, "blob", key=(self.id, "blob"))
 
     def get_snapshot(self):
         x, y = self.get_center()
@@ -188,6 +205,7 @@ class Blob(Agent):
             cells = w.get_cells()
             for c in cells:
                 self.free_slot.add(c)
+            self.slots_version += 1
             self._walls.remove(w)
         self.alive = True
         self.status = "mush"
@@ -195,20 +213,27 @@ class Blob(Agent):
     def create_mushroom(self, x, y):
         c = Cell(x, y)
         self.free_slot.remove(c)
+        self.slots_version += 1
         self.active_mush = self.world.create_mushroom(self, x, y)
         self._walls.add(self.active_mush)
 
-    def draw_cells(self, screen, vp, cells, colour):
-        for cell in cells:
-            sx, sy = vp.convert(cell.x, cell.y)
-            pygame.draw.rect(screen, colour, pygame.Rect(sx, sy, 1, 1))
+    def get_state(self):
+        return self.status
 
-    def draw(self, screen, vp):
+    def get_overlay_key(self):
         if self.status == "done":
-            return
-        colour = (200, 0, 0)
+            return None
         if self.status != "mush":
-            self.draw_cells(screen, vp, self.cells, colour)
-        else:
-            colour = (0, 255, 0)
-            self.draw_cells(screen, vp, self.free_slot, colour)
+            return "cells", len(self.cells)
+        return "slots", self.slots_version
+
+    def get_overlay_cells(self):
+        if self.status == "done":
+            return {}
+        if self.status != "mush":
+            return {OverlayLayers.BLOB_CELLS: self.cells}
+        return {OverlayLayers.FREE_SLOTS: self.free_slot}
+
+    def draw(self, screen, vp):
+        # The cells are composited by the view's OverlayLayers
+        pass
@@ -1,22 +1,24 @@
-import logging
 import math
 
-import pygame
-
 from floor_plan_reader.agents.agent import Agent
 from floor_plan_reader.agents.mush_agent_state_machine import MushAgentStateMachine
 from floor_plan_reader.cell import Cell
-from floor_plan_reader.display.arrow import Arrow
-from floor_plan_reader.display.bounding_box_drawer import BoundingBoxDrawer
+from floor_plan_reader.display.mushroom_draw import MushroomDraw
 from floor_plan_reader.display.cell_renderer import CellRenderer
+from floor_plan_reader.display.overlay_layers import OverlayLayers
+from floor_plan_reader.log_util import Log
 from floor_plan_reader.math.Constants import Constants
 from floor_plan_reader.math.bounding_box import BoundingBox
 from floor_plan_reader.math.collision_box import CollisionBox
 from floor_plan_reader.math.min_max import MinMax
 from floor_plan_reader.math.vector import Vector
+from floor_plan_reader.pruning_util import PruningUtil
 
+from floor_plan_reader.wall_groups import WallGroups
 from floor_plan_reader.wall_scanner import WallScanner
 
+log = Log(__name__)
+
 
 class Mushroom(Agent):
     def __init__(self, world, blob, start_x, start_y, mush_id):
@@ -47,7 +49,6 @@ class Mushroom(Agent):
         self.co_axial_walls = set()
         self.state_machine = MushAgentStateMachine(self)
         self.cell_render = CellRenderer()
-        self.bb_drawer = BoundingBoxDrawer()
         self.blob = blob
 
     def xor_bool(self, a, b):
@@ -61,7 +62,17 @@ class Mushroom(Agent):
         # return False
 
     def set_position(self, x, y):
-        self.collision_box.set_position(x, y)
+        if (x, y) != self.collision_box.get_center():
+            self.collision_box.set_position(x, y)
+            self.mark_segment_dirty()
+
+    def mark_segment_dirty(self):
+        """
+        Tell the wall segment this part belongs to that the part's box changed, so the next
+        blueprint extraction rebuilds its line and openings.
+        """
+        if self.wall_segment is not None:
+            WallGroups.find(self.wall_segment).mark_dirty()
 
     def set_selected(self, selected):
         self.selected = selected
@@ -82,6 +93,9 @@ class Mushroom(Agent):
     def get_state(self):
         return self.state_machine.state
 
+    def get_collision_box(self):
+        return self.collision_box
+
     def derive_direction_and_normal(self):
         return self.collision_box.derive_direction_and_normal()
 
@@ -92,15 +106,22 @@ class Mushroom(Agent):
         for r in self.root_cells:
             self.world.free(r.x, r.y)
 
+    def request_recompute(self, action, priority=0, kind=None):
+        """
+        Queue `action` on the world's RecomputeQueue instead of running it now, merged with a
+        waiting request of the same `kind`.
+        """
+        return self.world.recompute_queue.push(self, action, priority, kind)
+
     def hey_neighbour(self):
         if self.is_outer_wall():
             # lets take over smaller wall
             points_forward, points_backward = self.get_extended_ray_trace_points()
-            if self.bulldose(points_backward):
-                self.grow()
-
-            if self.bulldose(points_forward):
-                self.grow()
+            took_backward = self.bulldose(points_backward)
+            took_forward = self.bulldose(points_forward)
+            if took_backward or took_forward:
+                # One grow covers both sides, after the neighbours released their cells
+                self.request_recompute(self.grow, self.get_width(), "grow")
 
     def bulldose(self, points):
         for p in points:
@@ -127,7 +148,10 @@ class Mushroom(Agent):
             rm = self.right_margin
         if rm is None or lm is None:
             return
-        self.collision_box.width = self.left_margin + self.right_margin
+        width = self.left_margin + self.right_margin
+        if width != self.collision_box.width:
+            self.collision_box.width = width
+            self.mark_segment_dirty()
         direction, normal = self.derive_direction_and_normal()
 
         right_dist = self.right_margin
@@ -151,7 +175,7 @@ class Mushroom(Agent):
 
         dx = lm - lm_d
         dy = rm - rm_d
-        logging.debug(f"dx:{dx} dy:{dy}")
+        log.debug("dx:%s dy:%s", dx, dy)
 
     def transition_to_renegotiate(self):
         self.state_machine.sate = "renegotiate"
@@ -183,9 +207,10 @@ class Mushroom(Agent):
                 self.add_cell(x, y)
 
     def get_occupation_ratio(self):
-        if self.collision_box.get_area() == 0:
-            return 0
-        return len(self.root_cells) / self.collision_box.get_area()
+        """
+        Occupied cells inside the collision box per unit of box area.
+        """
+        return self.world.coverage_ratio(self.collision_box, self.world.OCCUPIED)
 
     def is_parallel_to(self, other):
         return self.collision_box.is_parallel_to(other.collision_box)
@@ -194,16 +219,24 @@ class Mushroom(Agent):
         return self.collision_box.is_on_same_axis_as(other.collision_box)
 
     def evaluate_segment_agregate(self, obj):
-        wall = None
-        if obj is not None and obj.is_on_same_axis_as(self):
+        # A crawl meets the same mushroom on every cell it occupies
+        if obj is None or obj in self.co_axial_walls:
+            return
+        # Only boxes in neighbouring axis buckets can be coaxial
+        key = WallGroups.axis_key(self.collision_box)
+        if not WallGroups.same_axis_bucket(key, WallGroups.axis_key(obj.collision_box)):
+            return
+        if obj.is_on_same_axis_as(self):
             self.co_axial_walls.add(obj)
 
     def absorb_bleading_out(self):
         new_cb, division_points = self._wall_scanner.detect_bleed_along_collision_box(self, self.collision_box)
         self.division_points = division_points
-        self.collision_box.set_width(new_cb.width)
+        if new_cb.width != self.collision_box.width:
+            self.collision_box.set_width(new_cb.width)
+            self.mark_segment_dirty()
         center = new_cb.get_center()
-        self.collision_box.set_position(center[0], center[1])
+        self.set_position(center[0], center[1])
 
     def crawl(self, points):
         steps = 0
@@ -252,11 +285,13 @@ class Mushroom(Agent):
         self.crawl(points_backward)
         wall = None
         walls = set()
+        # Segments merged away resolve to the segment that took them over
+        groups = self.world.wall_groups
         if self.wall_segment is not None:
-            walls.add(self.wall_segment)
+            walls.add(groups.find(self.wall_segment))
         for coaxial in self.co_axial_walls:
             if coaxial.wall_segment is not None:
-                walls.add(coaxial.wall_segment)
+                walls.add(groups.find(coaxial.wall_segment))
 
         if len(walls) == 0:
             wall = self.world.create_wall_segment()
@@ -277,7 +312,7 @@ class Mushroom(Agent):
                     break
             for w in walls:
                 if w.id != winner.id:
-                    winner.merge(w)
+                    groups.union(winner, w)
                     w.kill()
             wall = winner
             if self.wall_segment is None:
@@ -285,8 +320,8 @@ class Mushroom(Agent):
                 wall.add_part(self)
             for coaxial in self.co_axial_walls:
                 if coaxial.wall_segment is None:
-                    coaxial.wall_segment = self.wall_segment
-                    self.wall_segment.add_part(coaxial)
+                    coaxial.wall_segment = wall
+                    wall.add_part(coaxial)
 
     def measure_limit(self, list):
         in_wall = True
@@ -364,15 +399,12 @@ class Mushroom(Agent):
 
     def overlap_phase(self):
         mushrooms = self.blob.get_walls()
-        for m in mushrooms:
-            if m != self and m.alive and m.is_valid():
-                if self.collision_box.is_parallel_to(m.collision_box):
-                    if self.collision_box.is_overlapping(m.collision_box):
-                        self.overlapping.add(m)
-                        ratio = self.get_occupation_ratio()
-                        if ratio < m.get_occupation_ratio():
-                            self.kill()
-                            # self.alive = False
+        for m in PruningUtil.overlapping(self, mushrooms):
+            self.overlapping.add(m)
+            ratio = self.get_occupation_ratio()
+            if ratio < m.get_occupation_ratio():
+                self.kill()
+                # self.alive = False
 
         pass
 
@@ -401,18 +433,21 @@ class Mushroom(Agent):
             if self.world.is_food(x, y):
                 is_on_food = True
 
+            before = self.collision_box.copy()
             self.collision_box.set_length(stem_length)
             self.collision_box.set_width(width)
-            self.set_position(cx, cy)
+            self.collision_box.set_position(cx, cy)
 
             angle = self.collision_box.calculate_rotation_from_direction(dx, dy)
             self.collision_box.rotation = angle
+            if self.collision_box != before:
+                self.mark_segment_dirty()
             self.corners()
 
             x, y = self.get_center()
             if is_on_food and not self.world.is_food(x, y):
                 area = self.collision_box.get_area()
-                print(f"center out {area}?")
+                log.info("center out %s?", area)
         else:
             self.record_stack_trace()
         # print(
@@ -441,7 +476,7 @@ class Mushroom(Agent):
             if self.world.is_food(sx, sy) and not self.world.is_occupied(sx, sy):
                 self.add_cell(sx, sy)
 
-        logging.debug(f"Mushroom {self.id}: Stem grown - {len(self.stem_points)} points")
+        log.debug("Mushroom %s: Stem grown - %d points", self.id, len(self.stem_points))
 
     def width_assessment_phase(self):
         """Assess available width at each stem point."""
@@ -460,7 +495,7 @@ class Mushroom(Agent):
                 else:
                     break
             self.widths[point] = width
-        logging.debug(f"Mushroom {self.id}: Width assessed - {len(self.widths)} points")
+        log.debug("Mushroom %s: Width assessed - %d points", self.id, len(self.widths))
 
     def width_ray_trace(self):
         points = self.collision_box.get_ray_trace_points()
@@ -491,7 +526,7 @@ class Mushroom(Agent):
                 if self.can_grow(wx, wy):
                     self.add_cell(wx, wy)
 
-        logging.info(f"Mushroom {self.id}: Width expanded - {len(self.root_cells)} cells")
+        log.info("Mushroom %s: Width expanded - %d cells", self.id, len(self.root_cells))
 
     def has_coordinate(self, x, y):
         return Cell(x, y) in self.root_cells
@@ -521,12 +556,13 @@ class Mushroom(Agent):
 
         self.perimeter = perimeter
         self.growth_cells = growth_cells
-        logging.info(f"Mushroom {self.id}: Perimeter - {len(perimeter)} cells, Growth cells - {len(growth_cells)}")
+        log.info("Mushroom %s: Perimeter - %d cells, Growth cells - %d", self.id, len(perimeter), len(growth_cells))
 
     def get_covered_ratio(self):
-        if self.collision_box.get_area() == 0:
-            return 0
-        return len(self.stem_points) / self.collision_box.get_area()
+        """
+        Food cells inside the collision box per unit of box area: how well the box fits the wall.
+        """
+        return self.world.coverage_ratio(self.collision_box, self.world.FOOD)
 
     def growth_phase(self):
         """Spawn a new mushroom from an occupied food cell not in this stem, limit to one per cycle."""
@@ -540,8 +576,8 @@ class Mushroom(Agent):
         if candidate:
             self.world.create_mushroom(candidate.x, candidate.y)
             self.growth_cells = set()  # Clear all growth cells after spawning one mushroom
-            logging.info(
-                f"Mushroom {self.id}: Spawned new mushroom at ({candidate.x}, {candidate.y}), new agent count={len(self.world.agents)}")
+            log.info("Mushroom %s: Spawned new mushroom at (%s, %s), new agent count=%d", self.id, candidate.x,
+                     candidate.y, len(self.world.agents))
         else:
             self.growth_cells.clear()
 
@@ -558,7 +594,7 @@ class Mushroom(Agent):
     def ray_trace_from_center(self, direction=None):
         center_x, center_y = self.get_center()
         if self.is_occupied_by_other_mush(center_x,center_y):
-            logging.debug("occupied ?!")
+            log.debug("occupied ?!")
         values = self.ray_trace(center_x, center_y, direction)
         return values
 
@@ -597,78 +633,29 @@ class Mushroom(Agent):
             return
         self.set_position((min_x + max_x) / 2.0, (min_y + max_y) / 2.0)
 
-    def draw_margin(self, surface, vp, color=(0, 255, 0), width=2):
-        box = self.collision_box
-        cx, cy = box.get_center()
-        cx, cy = vp.convert(cx, cy)
-        nx, ny = box.get_normal().direction
-        length = 1.5 * self.left_margin * vp.zoom_factor
-        color = (200, 0, 0)
-        self.draw_arrow(cx, cy, nx, ny, vp, surface, color, length, width)
-        nx, ny = -nx, -ny
-        length = 1.5 * self.right_margin * vp.zoom_factor
-        self.draw_arrow(cx, cy, nx, ny, vp, surface, color, length, width)
-
-    def draw_normal_arrow(self, surface, vp, color=(0, 255, 0), width=2):
-        box = self.collision_box
-        # 1) Get the center and normal from the box
-        cx, cy = box.get_center()
-        cx, cy = vp.convert(cx, cy)
-        nx, ny = box.get_normal().direction  # might not be unit-length
-        # If the user wants to draw on 'left', invert the normal
-        if self.left_inside == False:
-            nx, ny = -nx, -ny
-
-        length = 15
-        self.draw_arrow(cx, cy, nx, ny, vp, surface, color, length, width)
-
-    def draw_arrow(self, cx, cy, nx, ny, vp, surface, color, length, width=2):
-        arrow = Arrow(cx, cy, nx, ny, length, width, color)
-
-        arrow.draw(surface, vp)
-
-    def draw_cells(self, cells, screen, vp):
-        for cell in cells:
-            sx, sy = vp.convert(cell.x, cell.y)
-            pygame.draw.rect(screen, (100, 200, 160), pygame.Rect(sx, sy, 1, 1))
+    def get_overlay_key(self):
+        if self.get_state() == "done":
+            return None
+        return len(self.root_cells), len(self.core_cells)
 
-    def draw(self, screen, vp):
+    def get_overlay_cells(self):
+        if self.get_state() == "done":
+            return {}
+        return {OverlayLayers.ROOT_CELLS: self.root_cells | self.core_cells}
 
-        if self.get_state() != "done":
-            self.draw_cells(self.root_cells, screen, vp)
-            self.draw_cells(self.core_cells, screen, vp)
+    def get_bounds(self):
+        if self.collision_box is None:
+            return None
+        corners = self.collision_box.calculate_corners()
+        xs = [c[0] for c in corners]
+        ys = [c[1] for c in corners]
+        return min(xs), min(ys), max(xs), max(ys)
 
-        if self.alive:
-            if self.is_outer_wall():
-                colour = (200, 200, 20)
-            else:
-                colour = (255, 255, 0)
-        else:
-            colour = (255, 0, 0)
-        if self.collision_box is not None:
-            self.bb_drawer.draw(self.collision_box, screen, vp, colour)
+    def snapshot(self):
+        return MushroomDraw(self)
 
-        x, y = self.get_center()
-        x, y = vp.convert(x, y)
-        pygame.draw.circle(screen, colour, (x, y), 1)
-        if self.is_outer_wall():
-            self.draw_normal_arrow(screen, vp)
-        if self.left_margin is not None and self.right_margin is not None:
-            self.draw_margin(screen, vp, (0, 0, 0))
-        for p in self.outward_points:
-            x = p[0]
-            y = p[1]
-            x, y = vp.convert(x, y)
-            colour = (0, 255, 0)
-            pygame.draw.circle(screen, colour, (x, y), 1)
-
-        if self.selected:
-            for c in self.crawl_points:
-                x = c[0]
-                y = c[1]
-                x, y = vp.convert(x, y)
-                colour = (0, 255, 0)
-                pygame.draw.circle(screen, colour, (x, y), 1)
+    def draw(self, screen, vp):
+        self.snapshot().draw(screen, vp)
 
     def center_on_food(self):
         x, y = self.get_center()
@@ -685,12 +672,12 @@ class Mushroom(Agent):
         return False
 
     def merge_with(self, other):
-        logging.debug(f"Merging Mushroom {self.id} with {other.id}")
+        log.debug("Merging Mushroom %s with %s", self.id, other.id)
         self.root_cells.update(other.root_cells)
         self.core_cells.update(other.core_cells)
         self.branches.extend(other.branches)
         for cell in other.root_cells | other.core_cells:
-            self.world.occupied[cell.y, cell.x] = self.id
+            self.world.occupy(cell.x, cell.y, self)
         min_x, max_x, min_y, max_y = self.ray_trace_from_center()
         self.update_bounding_box_and_center(min_x, max_x, min_y, max_y)
         self.kill()
@@ -704,7 +691,7 @@ class Mushroom(Agent):
         bb = BoundingBox.from_cells(self.core_cells)
         x, y = bb.get_center()
         width, height = bb.get_shape()
-        self.world.print_snapshot(x, y, width + 4, height + 4, "wall")
+        self.world.print_snapshot(x, y, width + 4, height + 4, "wall", key=(self.id, "wall"))
         self.record_stack_trace()
 
     def print_box(self):
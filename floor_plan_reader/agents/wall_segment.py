@@ -1,20 +1,23 @@
 import logging
 import math
-from decimal import Decimal
 
-import pygame
-from pygame import font
+import numpy as np
 from shapely import Point, LineString
 
 from floor_plan_reader.agents.agent import Agent
 from floor_plan_reader.display.bounding_box_drawer import BoundingBoxDrawer
+from floor_plan_reader.display.wall_segment_draw import WallSegmentDraw
+from floor_plan_reader.log_util import Log
 from floor_plan_reader.math.collision_box import CollisionBox
-from floor_plan_reader.math.vector import Vector
+from floor_plan_reader.math.intervals import merge_intervals, gaps_between
+from floor_plan_reader.math.math_segments import snap_to_axis
 from floor_plan_reader.model.opening import Opening
 from floor_plan_reader.pruning_util import PruningUtil
 from shapely.affinity import rotate
 from shapely.geometry import Point, LineString
 
+log = Log(__name__)
+
 
 class Scores:
     def __init__(self, id, score):
@@ -31,39 +34,73 @@ class Scores:
 
 
 class WallSegment(Agent):
+    # Gaps between parts up to this many pixels are rounding noise, not openings
+    OPENING_MERGE_TOLERANCE = 1.0
 
     def __init__(self, agent_id, world):
         super().__init__(agent_id)
+        # Bumped by mark_dirty() whenever the boxes or the parts change
+        self.version = 0
         self.collision_box = None
         self.collision_box_extended = None
         self.world = world
         self.scores = set()
-        self.parts = set()
+        self._parts = set()
+        self._wall_dic = {}
+        # Segments merged into this one whose parts are not collected yet
+        self._absorbed = []
+        # Segment this one was merged into, see WallGroups
+        self.merged_into = None
         self.set_collision_box(CollisionBox(0, 0, 1, 1, 0))  # Will be set after ray trace
         self.alive = True
         self.state = "idle"
-        font.init()
-        self.f = font.Font(None, 8)
         self.openings = set()
+        # Version the openings were calculated at
+        self.openings_version = None
         self.overlapping = set()
-        self.nodes = set()
         self.cb_drawer = BoundingBoxDrawer()
-        self.wall_dic = {}
 
     def __hash__(self):
         return hash(self.id)
 
-    def add_node(self, node):
-        self.nodes.add(node)
+    def mark_dirty(self):
+        """
+        Flag the segment as changed so the next blueprint extraction rebuilds its line, edge and openings.
+        """
+        self.version += 1
 
     def set_collision_box(self, cb):
         if isinstance(cb, CollisionBox):
+            if cb != self.collision_box:
+                self.mark_dirty()
             self.collision_box = cb.copy()
 
+    @property
+    def parts(self):
+        if self._absorbed:
+            self._collect_absorbed()
+        return self._parts
+
+    @parts.setter
+    def parts(self, parts):
+        self._parts = parts
+        self._absorbed = []
+
+    @property
+    def wall_dic(self):
+        if self._absorbed:
+            self._collect_absorbed()
+        return self._wall_dic
+
+    @wall_dic.setter
+    def wall_dic(self, wall_dic):
+        self._wall_dic = wall_dic
+
     def add_part(self, part):
         self.wall_dic[part.id] = part
         self.parts.add(part)
         self.state = "negotiate"
+        self.mark_dirty()
 
     def run(self):
         self.process_state()
@@ -75,11 +112,22 @@ class WallSegment(Agent):
         return False
 
     def merge(self, seg):
-        for p in seg.parts:
-            p.wall_scanner = self
-            self.add_part(p)
-        for n in seg.nodes:
-            self.add_node(n)
+        """
+        Take over the parts of `seg`. The parts are collected the next time they are read,
+        so chains of merges (see WallGroups.union) stay cheap.
+        """
+        if seg._parts or seg._absorbed:
+            self._absorbed.append(seg)
+            self.state = "negotiate"
+            self.mark_dirty()
+
+    def _collect_absorbed(self):
+        absorbed, self._absorbed = self._absorbed, []
+        for seg in absorbed:
+            for p in seg.parts:
+                p.wall_scanner = self
+                self._wall_dic[p.id] = p
+                self._parts.add(p)
 
     def set_position(self, x, y):
         self.collision_box.set_position(x, y)
@@ -118,9 +166,24 @@ class WallSegment(Agent):
                     f"(distance {d:.2f} > max {max_allowed_distance:.2f})"
                 )
 
-    def get_sorted_lines(self):
+    def _align_parts(self):
+        """
+        Refit the parent box on the parts, check every part lies on it and give it the parent rotation.
+        """
         self.recalculate_parent_box_from_parts()
         self.calculate_extended_bounding_box()
+        for p in self.parts:
+            try:
+                self._validate_part_within_parent(p)
+            except :
+                self.recalculate_parent_box_from_parts()
+                self.calculate_extended_bounding_box()
+                self._validate_part_within_parent(p)
+            if p.collision_box.rotation != self.collision_box.rotation:
+                p.collision_box.rotation = self.collision_box.rotation
+
+    def get_sorted_lines(self):
+        self._align_parts()
 
         class Sortable:
             def __init__(self, line, dist):
@@ -141,13 +204,6 @@ class WallSegment(Agent):
 
         a_list = []
         for p in self.parts:
-            try:
-                self._validate_part_within_parent(p)
-            except :
-                self.recalculate_parent_box_from_parts()
-                self.calculate_extended_bounding_box()
-                self._validate_part_within_parent(p)
-
             candidate = p.collision_box.get_center_line_string()
 
             # --- Instead of using center_line.bounds, use candidate.bounds ---
@@ -155,8 +211,6 @@ class WallSegment(Agent):
             candidate_start = Point(c_bounds[0], c_bounds[1])
             candidate_end = Point(c_bounds[2], c_bounds[3])
 
-            if p.collision_box.rotation != self.collision_box.rotation:
-                p.collision_box.rotation = self.collision_box.rotation
             # Distances from our reference_start to the candidate's two endpoints
             dist_start = ref_start.distance(candidate_start)
             dist_end = ref_start.distance(candidate_end)
@@ -185,105 +239,137 @@ class WallSegment(Agent):
         return vec_to_point.dot_product(wall_direction)
 
     def calculate_openings(self):
-
+        """
+        Openings between the parts, cached until the segment changes (see mark_dirty).
+        """
+        if self.openings_version == self.version:
+            return self.openings
         if len(self.parts) < 2:
             return
         if not self.is_segment_fully_occupied():
-            parts = self.parts.copy()
-            for p in parts:
-                p.re_compute()
-                p.performe_ray_trace(self.collision_box.get_direction())
-                p.fill_box()
-                p.crawl_phase()
+            self.recompute_parts()
             return
         self.openings = set()
+        self._align_parts()
 
-        center_lines = self.get_sorted_lines()
-        center = self.get_center()
-        center_p = Point(center)
-        for i in range(len(center_lines) - 1):
-            current_line = center_lines[i]
-
-            # End of line i
-            end_i = center_lines[i].coords[-1]
-
-            # Start of line i+1
-            start_i1 = center_lines[i + 1].coords[0]
-            end = Point(end_i)
-            start = Point(start_i1)
-
-            # Midpoint
-            mid_x = (end.x + start.x) / 2
-            mid_y = (end.y + start.y) / 2
-            mid_point = Point(mid_x, mid_y)
-            vec_to_mid = Vector((mid_point.x - center_p.x, mid_point.y - center_p.y))
-            direction = self.collision_box.get_direction()
-            offset = self.project_along_wall_direction(vec_to_mid, direction)
-            # offset = mid_point.distance(center_p)
-            # Euclidean distance between these two points
-            gap_distance = end.distance(start)
-            print(f"Gap = {gap_distance:.2f}")
-            o = Opening(offset, gap_distance)
+        starts, ends = self.project_parts()
+        starts, ends = merge_intervals(starts, ends, self.OPENING_MERGE_TOLERANCE)
+        for gap_start, gap_end in zip(*gaps_between(starts, ends)):
+            # Offsets are measured along the wall direction from the wall center
+            o = Opening(float(gap_start + gap_end) / 2, float(gap_end - gap_start))
             self.add_opening(o)
 
+        # Aligning may have bumped the version, the openings match the aligned boxes
+        self.openings_version = self.version
         return self.openings
 
-    def is_segment_fully_occupied(self):
+    def get_openings(self):
         """
-        Validates whether the full axis of a wall segment is covered by its collision boxes.
+        The openings of the last calculate_openings, never recomputed.
+        """
+        return self.openings
 
-        Args:
-            segment (List[CollisionBox]): List of aligned boxes forming a wall segment.
-            world: The world object with a method `is_occupied(x, y)` -> bool
+    def recompute_parts(self):
+        """
+        Queue every part to be traced again, used when the parts leave gaps on the wall axis.
+
+        Parts already waiting are not queued twice; wider parts are traced first.
+        """
+        direction = self.collision_box.get_direction()
+        for p in self.parts.copy():
+            p.request_recompute(lambda part=p: self._retrace_part(part, direction), p.get_width(), "retrace")
+
+    def _retrace_part(self, part, direction):
+        part.re_compute()
+        part.performe_ray_trace(direction)
+        part.fill_box()
+        part.crawl_phase()
+        self.mark_dirty()
+
+    def project_parts(self):
+        """
+        Extent of every part along the wall axis, relative to the wall center.
 
         Returns:
-            bool: True if the full axis is covered, False if there are any gaps.
+            (starts, ends) arrays, one interval per part.
         """
+        direction, _ = self.collision_box.derive_direction_and_normal()
+        direction = np.asarray(direction.direction)
+        boxes = [p.collision_box for p in self.parts]
+        centers = np.array([b.get_center() for b in boxes], dtype=np.float64).reshape(-1, 2)
+        half_lengths = np.array([b.length for b in boxes], dtype=np.float64) / 2
+        along = (centers - np.asarray(self.get_center())) @ direction
+        return along - half_lengths, along + half_lengths
+
+    def _profile_line(self):
+        """
+        The axis spanned by the parts' center lines.
 
+        Returns:
+            (start point, (dx, dy) direction, length in whole pixels).
+        """
         direction, _ = self.collision_box.derive_direction_and_normal()
         dx, dy = direction.direction
 
-        # Project all start/end points to get full coverage range
-        projections = []
-        for cb in self.parts:
-            p1, p2 = cb.collision_box.get_center_line()
-            projections.extend([
-                (p1[0], p1[1]),
-                (p2[0], p2[1])
-            ])
+        # Start/end: the center line end points with the smallest and largest projection
+        points = np.array([pt for p in self.parts for pt in p.collision_box.get_center_line()], dtype=np.float64)
+        projections = points[:, 0] * dx + points[:, 1] * dy
+        start_pt = points[np.argmin(projections)]
+        end_pt = points[len(points) - 1 - np.argmax(projections[::-1])]
+        distance = int(math.hypot(end_pt[0] - start_pt[0], end_pt[1] - start_pt[1]))
+        return start_pt, (dx, dy), distance
 
-        # Sort all by projection along wall axis
-        def project(pt):
-            return pt[0] * dx + pt[1] * dy
+    def occupancy_profile(self):
+        """
+        Sample the grid pixel by pixel along the axis spanned by the parts' center lines.
 
-        projections = sorted(projections, key=project)
+        Returns:
+            (xs, ys, food, occupied) arrays, one entry per sampled pixel.
+        """
+        start_pt, (dx, dy), distance = self._profile_line()
+        steps = np.arange(distance + 1)
+        xs = np.rint(start_pt[0] + dx * steps).astype(np.int64)
+        ys = np.rint(start_pt[1] + dy * steps).astype(np.int64)
+        food, occupied = self.world.sample_cells(xs, ys)
+        return xs, ys, food, occupied
 
-        start_pt = projections[0]
-        end_pt = projections[-1]
+    def is_segment_fully_occupied(self):
+        """
+        Validates whether the full axis of a wall segment is covered by its collision boxes.
 
-        # Step along wall axis pixel by pixel
-        distance = int(math.hypot(end_pt[0] - start_pt[0], end_pt[1] - start_pt[1]))
-        for i in range(distance + 1):
-            x = int(round(start_pt[0] + dx * i))
-            y = int(round(start_pt[1] + dy * i))
-            if self.world.is_food(x, y) and not self.world.is_occupied(x, y):
-                for p in self.parts:
-                    if p.collidepoint(x, y):
-                        logging.error("wtf")
-                logging.info("not fully compliant")
-                return False  # There's a gap
+        Axis aligned and diagonal axes are counted at once against the world's free food
+        layer; the axis is only sampled pixel by pixel when that finds a gap or cannot be used.
+
+        Returns:
+            bool: True if the full axis is covered, False if there are any gaps.
+        """
+        start_pt, (dx, dy), distance = self._profile_line()
+        start = (int(np.rint(start_pt[0])), int(np.rint(start_pt[1])))
+        end = (int(np.rint(start_pt[0] + dx * distance)), int(np.rint(start_pt[1] + dy * distance)))
+        if self.world.count_on_line(start, end, self.world.FREE_FOOD) == 0:
+            return True
+
+        xs, ys, food, occupied = self.occupancy_profile()
+        gaps = np.flatnonzero(food & ~occupied)
+        if len(gaps):
+            x, y = int(xs[gaps[0]]), int(ys[gaps[0]])
+            for p in self.parts:
+                if p.collidepoint(x, y):
+                    log.error("wtf")
+            log.info("not fully compliant", every=100)
+            return False  # There's a gap
 
         return True
 
     def add_opening(self, o):
         if o.width > 120:
-            logging.info("wtf")
+            log.info("wtf")
             center = self.get_center()
             width = 250
             height = 250
             x = center[0]
             y = center[1]
-            self.world.print_snapshot(x, y, width + 2, height + 2, self.id)
+            self.world.print_snapshot(x, y, width + 2, height + 2, self.id, key=(self.id, "wide_opening"))
         self.openings.add(o)
 
     def merge_alighned(self, cb, p):
@@ -293,14 +379,16 @@ class WallSegment(Agent):
 
     def negotiate(self):
         cb = None
+        boxes = []
         for p in self.parts:
             ratio = p.get_covered_ratio()
             s = Scores(p.id, ratio)
             self.scores.add(s)
-            if cb is None:
-                cb = p.collision_box.copy()
-            else:
-                cb = self.merge_alighned(cb, p)
+            boxes.append(p.collision_box)
+        if len(boxes) == 1:
+            cb = boxes[0].copy()
+        elif boxes:
+            cb = CollisionBox.fold_aligned(boxes)
 
         self.set_collision_box(cb)
 
@@ -328,6 +416,7 @@ class WallSegment(Agent):
             self.state = "normalize"
 
     def calculate_extended_bounding_box(self):
+        previous = self.collision_box_extended
         h, w = self.world.get_shape()
         points_forward, points_backward = self.collision_box.get_extended_ray_trace_points(w, h)
         steps_backward, bx, by = self.crawl(points_backward)
@@ -346,7 +435,7 @@ class WallSegment(Agent):
                 id_end = self.world.get_occupied_id(x2, y2)
                 if id_start in self.wall_dic and id_end in self.wall_dic:
                     if steps_forward > 1 or steps_backward > 1:
-                        logging.info("error")
+                        log.info("error")
 
             else:
                 self.collision_box_extended.move_backward(abs(steps_backward - steps_forward) / 2)
@@ -355,9 +444,11 @@ class WallSegment(Agent):
                 id_end = self.world.get_occupied_id(x2, y2)
                 if id_start in self.wall_dic and id_end in self.wall_dic:
                     if steps_forward > 1 or steps_backward > 1:
-                        logging.info("error")
+                        log.info("error")
 
-        logging.info(f"steps b{steps_backward} steps f{steps_forward}")
+        log.info("steps b%s steps f%s", steps_backward, steps_forward, every=100)
+        if self.collision_box_extended != previous:
+            self.mark_dirty()
 
     def crawl(self, points):
         steps = 0
@@ -419,17 +510,14 @@ class WallSegment(Agent):
 
         width = self.collision_box.width
 
-        self.collision_box = CollisionBox.create_from_line(center_line, width)
+        box = CollisionBox.create_from_line(center_line, width)
+        if box != self.collision_box:
+            self.mark_dirty()
+        self.collision_box = box
 
     def process_state(self):
-
-        wrongs = []
         if self.state == "error":
-            for n in self.parts:
-                for i in self.parts:
-                    if not n.collision_box.is_on_same_axis_as(i.collision_box):
-                        wrongs.append(i)
-                logging.debug("error")
+            log.debug("error")
             return
         if self.state == "negotiate":
             self.negotiate_phase()
@@ -454,12 +542,14 @@ class WallSegment(Agent):
             self.state = "done"
             return
         elif self.state == "dead":
-            for e in self.overlapping:
-                ratio = e.collision_box.calculate_overlap(self.collision_box)
-                area = self.collision_box.get_area()
-                r = ratio / area
-                percent = r * 100
-                print(f"{percent}%")
+            # Only worth the overlap computations when someone reads them
+            if log.is_enabled(logging.DEBUG):
+                for e in self.overlapping:
+                    ratio = e.collision_box.calculate_overlap(self.collision_box)
+                    area = self.collision_box.get_area()
+                    r = ratio / area
+                    percent = r * 100
+                    log.debug("%s%%", percent, every=100)
             return
 
     def fill_box(self):
@@ -480,81 +570,25 @@ class WallSegment(Agent):
             width = min(width, p.collision_box.width)
         self.collision_box.width = width
 
-        def dot(px, py, qx, qy):
-            """Dot product of 2D vectors (px,py) · (qx,qy)."""
-            return px * qx + py * qy
-
         parent_box = self.get_collision_box()  # The "merged/normalized" parent
         if not parent_box:
             return  # no parent box => nothing to do
 
-        # ------------------------------------------------------------
-        # 1) Get parent's orientation & geometry
-        # ------------------------------------------------------------
-        # - Parent direction & normal (unit vectors in float form)
+        # Snap every child onto the parent's center line: keep each child's offset
+        # along the parent direction, replace its normal offset by the parent's
         p_direction, p_normal = parent_box.derive_direction_and_normal()
-        # - Convert to Decimal for consistent arithmetic
-        pdx, pdy = Decimal(p_direction.direction[0]), Decimal(p_direction.direction[1])
-        pnx, pny = Decimal(p_normal.direction[0]), Decimal(p_normal.direction[1])
+        parts = [part for part in self.parts if part.collision_box]
+        centers = snap_to_axis([part.collision_box.get_center() for part in parts],
+                               p_direction.direction, p_normal.direction, parent_box.get_center())
 
-        # - Parent center
-        pcx_float, pcy_float = parent_box.get_center()
-        pcx, pcy = Decimal(float(pcx_float)), Decimal(float(pcy_float))
-
-        # - Parent rotation
-        p_rotation = parent_box.rotation
-
-        # - Parent width (we want children to match)
-        p_width = parent_box.width
-
-        # ------------------------------------------------------------
-        # 2) Compute the parent's normal offset:
-        #    the dot product of parent's center on parent's normal
-        # ------------------------------------------------------------
-        parent_normal_offset = dot(pcx, pcy, pnx, pny)
-
-        # ------------------------------------------------------------
-        # 3) For each child, re-align
-        # ------------------------------------------------------------
-        for part in self.parts:
+        for part, (new_cx, new_cy) in zip(parts, centers.tolist()):
             cbox = part.collision_box
-            if not cbox:
-                continue
-
-            # Step (a) Child's center in Decimal
-            ccx_f, ccy_f = cbox.get_center()
-            ccx, ccy = Decimal(float(ccx_f)), Decimal(float(ccy_f))
-
-            # Step (b) Child's direction offset => dot(child_center, parent_direction)
-            child_dir_offset = dot(ccx, ccy, pdx, pdy)
-
-            # Step (c) We want the child's normal offset to match the parent's
-            #          So we do child_norm_offset = parent_normal_offset
-            #          (We ignore the child's old normal offset.)
-            #
-            # If, for some reason, you want to shift each child differently,
-            # you can, but typically "snap them to the parent's normal line."
-            child_norm_offset = parent_normal_offset
-
-            # Step (d) Recompute child's new center in world coords:
-            #   new_center = child_dir_offset * direction + child_norm_offset * normal
-            new_cx_dec = child_dir_offset * pdx + child_norm_offset * pnx
-            new_cy_dec = child_dir_offset * pdy + child_norm_offset * pny
-
-            # Step (e) Update child's box
-            #    - same rotation as parent
-            #    - same width as parent
-            #    - keep original length (or you can clamp it too)
-            #    - set its new center
-            cbox.rotation = p_rotation
-            cbox.set_width(p_width)
-            # cbox.set_length(...)  # if you also want to unify lengths, do it here
-
-            cbox.set_position(float(new_cx_dec), float(new_cy_dec))
-
-            # Force recalculation of corners so it’s consistent
-            cbox.corners = None
+            # Same rotation and width as the parent, original length
+            cbox.rotation = parent_box.rotation
+            cbox.set_width(parent_box.width)
+            cbox.set_position(new_cx, new_cy)
             cbox.calculate_corners()
+        self.mark_dirty()
 
     def corners(self):
         return self.collision_box.calculate_corners()
@@ -565,45 +599,19 @@ class WallSegment(Agent):
     def draw_corners(self, screen, vp, colour=(0, 255, 255), size=1):
         self.cb_drawer.draw(self.collision_box, screen, vp, colour)
 
-    def draw(self, screen, vp):
-
-        size = 1
-        if self.is_selected():
-            size = 3
-
-        colour = (0, 255, 0)
-        self.draw_corners(screen, vp, colour, size)
-        for o in self.overlapping:
-            self.cb_drawer.draw(o.collision_box, screen, vp, colour)
-
-        x, y = self.get_center()
-        x, y = vp.convert(x, y)
-        pygame.draw.circle(screen, colour, (x, y), 1)
-        self.f = font.Font(None, int(vp.zoom_factor * 8))
-        for p in self.parts:
-            score = p.get_covered_ratio()
-            x, y = p.get_center()
-            x, y = vp.convert(x, y)
-            text_surface = self.f.render(f"s: {score:.{2}f}", True, (15, 255, 0))
-            screen.blit(text_surface, (x, y))  # Position (x=10, y=10)
+    def get_bounds(self):
+        if self.collision_box is None:
+            return None
+        corners = self.collision_box.calculate_corners()
+        xs = [c[0] for c in corners]
+        ys = [c[1] for c in corners]
+        return min(xs), min(ys), max(xs), max(ys)
 
-        self.draw_opening(screen, vp)
+    def snapshot(self):
+        return WallSegmentDraw(self)
 
-    def draw_opening(self, screen, vp):
-        colour = (255, 0, 0)
-        for o in self.openings:
-            center = self.get_center()
-            v = Vector(center)
-            direction = self.collision_box.get_direction()
-            direction.scale(o.center_x)
-            position = v + direction
-            x = position.dx()
-            y = position.dy()
-            width = self.collision_box.width
-
-            collision_box = CollisionBox(x, y, width, o.width,
-                                         self.collision_box.rotation)
-            self.cb_drawer.draw(collision_box, screen, vp, colour)
+    def draw(self, screen, vp):
+        self.snapshot().draw(screen, vp)
 
     def get_score(self):
         return len(self.parts)
@@ -611,14 +619,12 @@ class WallSegment(Agent):
     def get_collision_box(self):
         return self.collision_box
 
+    def get_state(self):
+        return self.state
+
     def get_occupation_ratio(self):
-        if self.collision_box.get_area() == 0:
-            return 0
-        value = 0
-        for p in self.parts:
-            value += p.get_occupation_ratio()
-        ratio = value / len(self.parts)
-        return ratio
+        return self.world.coverage_ratio(self.collision_box, self.world.OCCUPIED)
 
     def kill(self):
         self.alive = False
+        self.mark_dirty()
@@ -0,0 +1,261 @@
+import logging
+import queue
+import threading
+import time
+
+from floor_plan_reader.agents.wall_segment import WallSegment
+from floor_plan_reader.intersections_solver import IntersectionSolver
+from floor_plan_reader.world import World
+
+
+class PartSnapshot:
+    """
+    Copy of the collision box of a wall segment part, all the extraction needs from a Mushroom.
+    """
+
+    def __init__(self, part):
+        self.id = part.id
+        self.collision_box = part.collision_box.copy()
+
+    def collidepoint(self, x, y):
+        return self.collision_box.is_point_inside(int(x), int(y))
+
+    def get_center(self):
+        return self.collision_box.get_center()
+
+
+class SegmentSnapshot(WallSegment):
+    """
+    Detached copy of a WallSegment that the extraction worker can align and compute openings on.
+
+    Boxes and parts are copies, so nothing here touches the live segment. Changes the live
+    segment needs are put on the mutation queue and run by the main loop.
+    """
+
+    def __init__(self, seg, mutations):
+        # WallSegment.__init__ sets up fonts and drawing state a snapshot never uses
+        self.id = seg.id
+        self.alive = seg.alive
+        self.state = seg.state
+        self.source = seg
+        self.source_version = seg.version
+        self.version = seg.version
+        self.world = None
+        self.collision_box = seg.collision_box.copy()
+        self.collision_box_extended = None
+        if seg.collision_box_extended is not None:
+            self.collision_box_extended = seg.collision_box_extended.copy()
+        self.parts = {PartSnapshot(p) for p in seg.parts}
+        self.wall_dic = {p.id: p for p in self.parts}
+        self.openings = {o.copy() for o in seg.openings}
+        self.openings_version = seg.openings_version
+        # Intersections on this segment, filled by the IntersectionSolver
+        self.nodes = set()
+        self.mutations = mutations
+
+    def add_node(self, node):
+        self.nodes.add(node)
+
+    def recompute_parts(self):
+        # Tracing the parts again moves agents and writes the grids: main loop only
+        self.mutations.put(self._recompute_source)
+
+    def _recompute_source(self):
+        if self.source.version == self.source_version:
+            self.source.recompute_parts()
+
+    def apply(self):
+        """
+        Copy the openings and the aligned boxes back to the live segment, unless it changed meanwhile.
+        """
+        seg = self.source
+        if seg.version != self.source_version:
+            return  # The next extraction picks the new state up
+        seg.openings = self.openings
+        for p in seg.parts:
+            if p.collision_box.rotation != self.collision_box.rotation:
+                p.collision_box.rotation = self.collision_box.rotation
+        if self.version != self.source_version:
+            seg.collision_box = self.collision_box.copy()
+            seg.collision_box_extended = self.collision_box_extended.copy()
+            seg.mark_dirty()
+        if self.openings_version == self.version:
+            # The openings were calculated on exactly the boxes just copied over
+            seg.openings_version = seg.version
+
+
+class WorldSnapshot:
+    """
+    What a blueprint extraction reads from the world, copied on the main loop.
+
+    The worker keeps its own copy of the grids, so only the tiles the world wrote since
+    the previous snapshot are copied. The first snapshot, and any after the grids were
+    replaced, copies the grids whole.
+    """
+
+    def __init__(self, world, mutations, whole=False):
+        tiles = world.take_changed_tiles()
+        if whole:
+            tiles = None
+        # Whole grids, or None when the tiles are enough
+        self.grids = None
+        # (tile row, tile column) -> windows of the grid, occupied and occupied_wall
+        self.tiles = {}
+        if tiles is None:
+            self.grids = (world.grid.copy(), world.occupied.copy(), world.occupied_wall.copy())
+        else:
+            t = World.TILE
+            for ty, tx in tiles:
+                window = (slice(ty * t, (ty + 1) * t), slice(tx * t, (tx + 1) * t))
+                self.tiles[ty, tx] = (world.grid[window].copy(), world.occupied[window].copy(),
+                                      world.occupied_wall[window].copy())
+        self.segments = [SegmentSnapshot(seg, mutations) for seg in world.wall_segments]
+
+    def follow(self, dropped):
+        """
+        Take over the grid changes of an older snapshot that is dropped without being extracted.
+        """
+        if self.grids is not None:
+            return
+        self.grids = dropped.grids
+        self.tiles = {**dropped.tiles, **self.tiles}
+
+    def apply(self, world):
+        """
+        Bring the grids of the worker's world up to this snapshot.
+        """
+        if self.grids is not None:
+            world.grid, world.occupied, world.occupied_wall = self.grids
+            world.reset_coverage()
+        for (ty, tx), windows in self.tiles.items():
+            world.paste_tile(ty, tx, *windows)
+
+
+class BlueprintExtractor:
+    """
+    Builds the blueprint (lines, nodes, edges, openings and JSON) on a worker thread.
+
+    submit() snapshots the world on the main loop and hands it to the worker, replacing a
+    snapshot still waiting. The worker owns the IntersectionSolver and its Model; everything
+    it wants changed in the live world is queued and run by run_pending() on the main loop,
+    including `on_result` with the finished extraction.
+    """
+
+    def __init__(self, on_result, json_writer=None, meter_per_pixel=0.028):
+        self.on_result = on_result
+        self.jw = json_writer
+        self.meter_per_pixel = meter_per_pixel
+        # Grids of the latest snapshot plus the model the worker builds
+        self.world = World()
+        self.solver = IntersectionSolver(self.world)
+        self.jobs = queue.Queue(maxsize=1)
+        self.mutations = queue.Queue()
+        self.thread = None
+        # The worker has no grids until the first snapshot copied them whole
+        self.has_grids = False
+        # Seconds the last snapshot took on the main loop and the last extraction on the worker
+        self.last_snapshot_time = None
+        self.last_extract_time = None
+
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._work, daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def submit(self, world):
+        start = time.perf_counter()
+        snapshot = WorldSnapshot(world, self.mutations, whole=not self.has_grids)
+        self.has_grids = True
+        self.last_snapshot_time = time.perf_counter() - start
+        try:
+            # Drop a snapshot the worker has not started yet, its grid changes move to this one
+            dropped = self.jobs.get_nowait()
+            if dropped is not None:
+                snapshot.follow(dropped)
+            self.jobs.task_done()
+        except queue.Empty:
+            pass
+        self.jobs.put(snapshot)
+        self.start()
+
+    def wait(self):
+        """
+        Block until the worker has processed every submitted snapshot.
+        """
+        self.jobs.join()
+
+    def run_pending(self):
+        """
+        Run the queued mutations. Call from the main loop only.
+        """
+        while True:
+            try:
+                mutation = self.mutations.get_nowait()
+            except queue.Empty:
+                return
+            mutation()
+
+    def _work(self):
+        while True:
+            snapshot = self.jobs.get()
+            try:
+                if snapshot is None:
+                    return
+                start = time.perf_counter()
+                result = self.extract(snapshot)
+                self.last_extract_time = time.perf_counter() - start
+                self.mutations.put(lambda: self.on_result(result))
+            except Exception:
+                logging.exception("blueprint extraction failed")
+            finally:
+                self.jobs.task_done()
+
+    def extract(self, snapshot):
+        """
+        Bring the worker model up to date with a snapshot and write the floorplan JSON.
+
+        Returns:
+            dict with the "model", "lines", "intersections" and "removed_intersections", detached
+            copies sharing nothing with the worker: it keeps changing its own on the next snapshot.
+        """
+        snapshot.apply(self.world)
+        for seg in snapshot.segments:
+            seg.world = self.world
+
+        result = self.solver.build_lines_and_intersections(snapshot.segments)
+        # Only segments that changed since the last extraction need their openings refreshed
+        for l in result.get("dirty_lines"):
+            l.seg.calculate_openings()
+            self.mutations.put(l.seg.apply)
+
+        model = self.world.model
+        model.convert_to_scale(self.meter_per_pixel)
+        nodes = list(model.get_nodes())
+        edges = list(model.get_edges())
+        for e in edges:
+            e.calculate_opening()
+        data = {
+            "nodes": nodes,
+            "edges": edges
+        }
+        if self.jw is not None and len(edges) > 10:
+            self.jw.build_floorplan_json(data, self.world.walls)
+
+        copies = {}
+        detached = model.detached_copy(copies)
+
+        def copy_of(node):
+            return copies.get(id(node)) or node.detached()
+
+        return {
+            "model": detached,
+            "lines": [l.detached() for l in result["lines"]],
+            "intersections": [copy_of(n) for n in result["intersections"]],
+            "removed_intersections": [copy_of(n) for n in result["removed_intersections"]],
+        }
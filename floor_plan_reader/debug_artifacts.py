@@ -0,0 +1,83 @@
+import logging
+import os
+import threading
+from collections import deque
+
+from PIL import Image
+
+
+class DebugArtifacts:
+    """
+    Writes debug images of a run, off the simulation thread.
+
+    Callers hand over how to build an RGB array and go on, PNG encoding and disk I/O happen
+    on one long-lived writer thread. An image with a key, usually (agent id, reason), is only kept
+    the first time that key is seen, so an agent dumping the same view every tick writes it
+    once. At most `budget` images are written per run, later ones are dropped and counted.
+    """
+    DIRECTORY = "debug_output"
+    BUDGET = 200
+
+    def __init__(self, directory=DIRECTORY, budget=BUDGET):
+        self.directory = directory
+        self.budget = budget
+        self.seen = set()
+        self.accepted = 0
+        self.dropped = 0
+        self.written = 0
+        self._pending = deque()
+        self._busy = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def save(self, name, build, key=None):
+        """
+        Queue the image `build()` returns as `name`.png.
+
+        `build` runs on the calling thread and only when the image is kept, so a dropped
+        image costs nothing; the RGB uint8 array it returns must not change afterwards.
+        Returns False when the image was dropped as a duplicate of `key` or over the budget.
+        """
+        if self.accepted >= self.budget or (key is not None and key in self.seen):
+            self.dropped += 1
+            return False
+        image = build()
+        if image is None:
+            return False
+        if key is not None:
+            self.seen.add(key)
+        self.accepted += 1
+        if self.accepted == self.budget:
+            logging.info(f"debug image budget of {self.budget} used, dropping further images")
+        with self._condition:
+            self._pending.append((os.path.join(self.directory, f"{name}.png"), image))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+        return True
+
+    def flush(self):
+        """
+        Block until every queued image is on disk.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: not self._pending and not self._busy)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                path, image = self._pending.popleft()
+                self._busy = True
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                Image.fromarray(image).save(path)
+                self.written += 1
+                logging.info(f"{image.shape[1]}x{image.shape[0]} region saved as '{path}'")
+            except Exception:
+                logging.exception(f"could not save {path}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
@@ -0,0 +1,34 @@
+class AgentDraw:
+    """
+    What the view needs of an agent to draw it, copied on the simulation thread.
+
+    The renderer only reads these, so the simulation can keep changing the agent while a
+    frame is drawn. A draw compares and hashes like the agent it was taken from, so the
+    view's OverlayLayers keeps tracking the same agent from one frame to the next.
+    """
+
+    def __init__(self, agent):
+        self.id = agent.id
+        self.alive = agent.alive
+        self.bounds = agent.get_bounds()
+        self.overlay_key, self.overlay_cells = agent.get_frozen_overlay()
+
+    def __eq__(self, other):
+        if isinstance(other, AgentDraw):
+            return self.id == other.id
+        return False
+
+    def __hash__(self):
+        return hash(self.id)
+
+    def get_bounds(self):
+        return self.bounds
+
+    def get_overlay_key(self):
+        return self.overlay_key
+
+    def get_overlay_cells(self):
+        return self.overlay_cells
+
+    def draw(self, screen, vp):
+        pass
@@ -0,0 +1,22 @@
+import pygame
+
+from floor_plan_reader.display.agent_draw import AgentDraw
+
+
+class AntDraw(AgentDraw):
+    def __init__(self, ant):
+        super().__init__(ant)
+        self.x = ant.x
+        self.y = ant.y
+
+    def draw(self, screen, vp):
+        scaled_x, scaled_y = vp.convert(self.x, self.y)
+
+        # Color the ant based on ID or a fixed color
+        if self.alive:
+            color = (0, 0, 255)  # red
+            size = 5
+        else:
+            color = (0, 0, 255)
+            size = 2
+        pygame.draw.circle(screen, color, (scaled_x, scaled_y), size)
@@ -0,0 +1,86 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class BackgroundCache:
+    """
+    The floorplan image scaled to the view's zoom, blitted one window at a time.
+
+    The image is scaled once per zoom factor and kept for the last few zoom factors, so
+    panning and redrawing at the same zoom only blit the visible part. Scaling a large plan
+    far in would not fit in memory: past MAX_CACHED_PIXELS only the part of the image under
+    the window is scaled, again only when the zoom or the window moves.
+    """
+    MAX_CACHED_PIXELS = 4096 * 4096
+    MAX_ZOOM_LEVELS = 3
+
+    def __init__(self, scale=pygame.transform.smoothscale):
+        """
+        Args:
+            scale: scaling function with the signature of pygame.transform.smoothscale.
+        """
+        self.scale = scale
+        self.source = None
+        self.scaled = OrderedDict()
+        self.window_key = None
+        self.window_surface = None
+
+    def invalidate(self):
+        self.scaled.clear()
+        self.window_key = None
+        self.window_surface = None
+
+    def draw(self, screen, source, size, vp):
+        """
+        Draw `source` scaled from `size` (map pixels) by vp.zoom_factor at the view offset.
+        """
+        if source is not self.source:
+            self.invalidate()
+            self.source = source
+        zoom = vp.zoom_factor
+        new_w = int(size[0] * zoom)
+        new_h = int(size[1] * zoom)
+        if new_w <= 0 or new_h <= 0:
+            return
+        ox, oy = vp.get_center()
+        ox, oy = int(ox), int(oy)
+        screen_w, screen_h = screen.get_size()
+        # Visible part of the scaled image, in scaled image pixels
+        left, top = max(0, -ox), max(0, -oy)
+        right, bottom = min(new_w, screen_w - ox), min(new_h, screen_h - oy)
+        if right <= left or bottom <= top:
+            return
+        if new_w * new_h <= self.MAX_CACHED_PIXELS:
+            img = self._scaled(source, zoom, (new_w, new_h))
+            screen.blit(img, (ox + left, oy + top), pygame.Rect(left, top, right - left, bottom - top))
+            return
+        self._draw_window(screen, source, size, zoom, (ox, oy), (left, top, right, bottom))
+
+    def _scaled(self, source, zoom, scaled_size):
+        img = self.scaled.get(zoom)
+        if img is None:
+            img = self.scale(source, scaled_size)
+            self.scaled[zoom] = img
+            if len(self.scaled) > self.MAX_ZOOM_LEVELS:
+                self.scaled.popitem(last=False)
+        else:
+            self.scaled.move_to_end(zoom)
+        return img
+
+    def _draw_window(self, screen, source, size, zoom, offset, visible):
+        left, top, right, bottom = visible
+        # Source pixels under the window, widened to whole pixels
+        src_left = int(left / zoom)
+        src_top = int(top / zoom)
+        src_right = min(size[0], source.get_width(), int(right / zoom) + 1)
+        src_bottom = min(size[1], source.get_height(), int(bottom / zoom) + 1)
+        if src_right <= src_left or src_bottom <= src_top:
+            return
+        key = (zoom, src_left, src_top, src_right, src_bottom)
+        if key != self.window_key:
+            area = source.subsurface(pygame.Rect(src_left, src_top, src_right - src_left, src_bottom - src_top))
+            scaled_size = (int((src_right - src_left) * zoom), int((src_bottom - src_top) * zoom))
+            self.window_surface = self.scale(area, scaled_size)
+            self.window_key = key
+        screen.blit(self.window_surface, (offset[0] + int(src_left * zoom), offset[1] + int(src_top * zoom)))
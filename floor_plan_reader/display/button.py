@@ -1,9 +1,11 @@
 import pygame
 
+from floor_plan_reader.display.glyph_atlas import GlyphAtlas
+
 
 class Button:
     def __init__(self,parent, text, position):
-        self.font = pygame.font.SysFont(None, 24)
+        self.font_size = 24
         self.text = text
         self.position = position
         btn_w, btn_h = 100, 40
@@ -19,7 +21,7 @@ class Button:
         white = (255, 255, 255)
         pygame.draw.rect(surface, (100, 100, 200), self.button_rect)
         pygame.draw.rect(surface, white, self.button_rect, 2)
-        label_text = self.font.render(self.text, True, white)
+        label_text = GlyphAtlas.shared().render(self.text, self.font_size, white)
         label_rect = label_text.get_rect(center=self.button_rect.center)
         surface.blit(label_text, label_rect)
 
@@ -0,0 +1,50 @@
+from collections import OrderedDict
+
+import pygame
+
+
+class GlyphAtlas:
+    """
+    Fonts and rendered text shared by every text overlay.
+
+    Fonts are opened once per (name, size) and rendered labels are kept, least recently
+    used first out, so labels drawn every frame are rendered once. Only used from the
+    render thread, pygame's font module is not thread safe.
+    """
+    MAX_TEXTS = 1024
+    _instance = None
+
+    @classmethod
+    def shared(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self):
+        self.fonts = {}
+        self.texts = OrderedDict()
+
+    def get_font(self, size, name=None):
+        key = (name, size)
+        f = self.fonts.get(key)
+        if f is None:
+            if not pygame.font.get_init():
+                pygame.font.init()
+            f = pygame.font.SysFont(name, size)
+            self.fonts[key] = f
+        return f
+
+    def render(self, text, size, colour, name=None):
+        """
+        Rendered, anti aliased `text`; the returned surface is shared and must not be drawn on.
+        """
+        key = (name, size, text, colour)
+        surface = self.texts.get(key)
+        if surface is None:
+            surface = self.get_font(size, name).render(text, True, colour)
+            self.texts[key] = surface
+            if len(self.texts) > self.MAX_TEXTS:
+                self.texts.popitem(last=False)
+        else:
+            self.texts.move_to_end(key)
+        return surface
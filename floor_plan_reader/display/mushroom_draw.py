@@ -1,71 +1,45 @@
 import pygame
 
+from floor_plan_reader.display.agent_draw import AgentDraw
 from floor_plan_reader.display.arrow import Arrow
 from floor_plan_reader.display.bounding_box_drawer import BoundingBoxDrawer
-from floor_plan_reader.display.cell_renderer import CellRenderer
 
 
-class MushroomDraw:
+class MushroomDraw(AgentDraw):
     def __init__(self, mushroom):
-        self.cell_render = CellRenderer()
+        super().__init__(mushroom)
         self.bb_drawer = BoundingBoxDrawer()
-        self.selected = False
-        self.mushroom = mushroom
-
-    def get_collision_box(self):
-        return self.mushroom.collision_box
-
-    def get_margins(self):
-        return self.mushroom.left_margin, self.mushroom.right_margin
-
-    def get_left_inside(self):
-        return self.mushroom.left_inside
-
-    def get_state(self):
-        return self.mushroom.get_state()
-
-    def id_alive(self):
-        return self.mushroom.alive
-
-    def get_outward_points(self):
-        return self.mushroom.outward_points
-
-    def get_root_cells(self):
-        return self.mushroom.root_cells
-
-    def get_core_cells(self):
-        return self.mushroom.core_cells
-
-    def get_crawl_points(self):
-        return self.mushroom.crawl_points
-
-    def is_outer_wall(self):
-        return self.mushroom.is_outer_wall()
-
-    def get_center(self):
-        return self.mushroom.get_center()
+        box = mushroom.collision_box
+        self.collision_box = box.copy() if box is not None else None
+        self.left_margin = mushroom.left_margin
+        self.right_margin = mushroom.right_margin
+        self.left_inside = mushroom.left_inside
+        self.outer_wall = mushroom.is_outer_wall()
+        self.center = mushroom.get_center()
+        self.outward_points = tuple(mushroom.outward_points)
+        self.selected = mushroom.selected
+        self.crawl_points = tuple(mushroom.crawl_points) if self.selected else ()
 
     def draw_margin(self, surface, vp, color=(0, 255, 0), width=2):
-        left_margin, right_margin = self.get_margins()
-        box = self.get_collision_box()
+        box = self.collision_box
         cx, cy = box.get_center()
         cx, cy = vp.convert(cx, cy)
         nx, ny = box.get_normal().direction
-        length = 1.5 * left_margin * vp.zoom_factor
+        length = 1.5 * self.left_margin * vp.zoom_factor
         color = (200, 0, 0)
         self.draw_arrow(cx, cy, nx, ny, vp, surface, color, length, width)
         nx, ny = -nx, -ny
-        length = 1.5 * right_margin * vp.zoom_factor
+        length = 1.5 * self.right_margin * vp.zoom_factor
         self.draw_arrow(cx, cy, nx, ny, vp, surface, color, length, width)
 
     def draw_normal_arrow(self, surface, vp, color=(0, 255, 0), width=2):
-        box = self.get_collision_box()
+        box = self.collision_box
         # 1) Get the center and normal from the box
         cx, cy = box.get_center()
         cx, cy = vp.convert(cx, cy)
         nx, ny = box.get_normal().direction  # might not be unit-length
         # If the user wants to draw on 'left', invert the normal
-        if not self.get_left_inside():
+        if self.left_inside == False:
             nx, ny = -nx, -ny
 
         length = 15
@@ -76,51 +50,34 @@ class MushroomDraw:
 
         arrow.draw(surface, vp)
 
-    def draw_cells(self, cells, screen, vp):
-        for cell in cells:
-            sx, sy = vp.convert(cell.x, cell.y)
-            pygame.draw.rect(screen, (100, 200, 160), pygame.Rect(sx, sy, 1, 1))
-
     def draw(self, screen, vp):
-        collision_box = self.get_collision_box()
-        left_margin, right_margin = self.get_margins()
-
-        if self.get_state() != "done":
-            self.draw_cells(self.get_root_cells(), screen, vp)
-            self.draw_cells(self.get_core_cells(), screen, vp)
-
-        OUTER_WALL_BLUE = (50, 11, 168)
-        RED = (255, 0, 0)
-        colour = OUTER_WALL_BLUE
-
-        if self.id_alive():
-            if self.is_outer_wall():
-                colour = OUTER_WALL_BLUE
+        if self.alive:
+            if self.outer_wall:
+                colour = (200, 200, 20)
             else:
-                colour = (111, 50, 168)
+                colour = (255, 255, 0)
         else:
-            colour = RED
-        if collision_box is not None:
-            self.bb_drawer.draw(collision_box, screen, vp, colour)
+            colour = (255, 0, 0)
+        if self.collision_box is not None:
+            self.bb_drawer.draw(self.collision_box, screen, vp, colour)
 
-        x, y = self.get_center()
+        x, y = self.center
         x, y = vp.convert(x, y)
         pygame.draw.circle(screen, colour, (x, y), 1)
-        if self.is_outer_wall():
+        if self.outer_wall:
             self.draw_normal_arrow(screen, vp)
-        if left_margin is not None and right_margin is not None:
+        if self.left_margin is not None and self.right_margin is not None:
             self.draw_margin(screen, vp, (0, 0, 0))
-        for p in self.get_outward_points():
+        for p in self.outward_points:
             x = p[0]
             y = p[1]
             x, y = vp.convert(x, y)
             colour = (0, 255, 0)
             pygame.draw.circle(screen, colour, (x, y), 1)
 
-        if self.selected:
-            for c in self.get_crawl_points():
-                x = c[0]
-                y = c[1]
-                x, y = vp.convert(x, y)
-                colour = (0, 255, 0)
-                pygame.draw.circle(screen, colour, (x, y), 1)
+        for c in self.crawl_points:
+            x = c[0]
+            y = c[1]
+            x, y = vp.convert(x, y)
+            colour = (0, 255, 0)
+            pygame.draw.circle(screen, colour, (x, y), 1)
@@ -0,0 +1,92 @@
+import os
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+from floor_plan_reader.display.simulation_view import SimulationView
+
+
+class OffscreenRenderer:
+    """
+    Draws the simulation without a window, for visual checks of batch runs.
+
+    Frames are drawn by a SimulationView of its own onto a plain Surface, so they look like
+    the window, and written as numbered PNGs into a directory or appended to a video when
+    the path ends in a video extension. A frame is due every `every` ticks; a due frame is
+    skipped while rendering has used more than `budget` of the time since the renderer
+    started, so it never costs more than that fraction of the run. Meant for headless runs:
+    pygame's font rendering is not thread safe, so not next to an open window.
+    """
+    VIDEO_EXTENSIONS = (".mp4", ".avi")
+
+    def __init__(self, simulation, path, every=50, budget=0.05, scale=1.0, fps=30, clock=time.perf_counter):
+        """
+        Args:
+            simulation: the Simulation to draw, its world must exist.
+            path: a directory for PNG frames, or a .mp4/.avi file.
+            every: ticks between two frames.
+            budget: largest fraction of the run spent rendering.
+            scale: zoom factor of the frames relative to the plan.
+            fps: frame rate of the video.
+            clock: returns seconds, times the run and the rendering.
+        """
+        self.simulation = simulation
+        self.path = path
+        self.every = every
+        self.budget = budget
+        self.fps = fps
+        self.clock = clock
+        self.view = SimulationView(simulation)
+        self.view.vp.zoom_factor = scale
+        width, height = simulation.world.grid.shape[1], simulation.world.grid.shape[0]
+        self.size = (int(width * scale), int(height * scale))
+        self.surface = pygame.Surface(self.size)
+        self.video = None
+        if not path.lower().endswith(self.VIDEO_EXTENSIONS):
+            os.makedirs(path, exist_ok=True)
+        self.started = None
+        self.render_time = 0.0
+        self.last_tick = None
+        self.frames = 0
+        self.skipped = 0
+
+    def tick(self):
+        """
+        Call after every tick, renders when a frame is due and the budget allows it.
+        """
+        now = self.clock()
+        if self.started is None:
+            self.started = now
+        tick = self.simulation.tick
+        if self.last_tick is not None and tick - self.last_tick < self.every:
+            return
+        if self.render_time > self.budget * (now - self.started):
+            self.skipped += 1
+            return
+        self.last_tick = tick
+        self.render(tick)
+        self.render_time += self.clock() - now
+
+    def render(self, tick):
+        self.view.render(self.surface, self.simulation.take_frame())
+        if self.path.lower().endswith(self.VIDEO_EXTENSIONS):
+            self._write_video_frame()
+        else:
+            pygame.image.save(self.surface, os.path.join(self.path, f"frame_{tick:07d}.png"))
+        self.frames += 1
+
+    def _write_video_frame(self):
+        if self.video is None:
+            codec = "mp4v" if self.path.lower().endswith(".mp4") else "MJPG"
+            self.video = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*codec), self.fps, self.size)
+        # surfarray is (width, height, RGB), OpenCV wants (height, width, BGR)
+        rgb = pygame.surfarray.pixels3d(self.surface)
+        self.video.write(np.ascontiguousarray(rgb.swapaxes(0, 1)[:, :, ::-1]))
+        del rgb
+
+    def close(self):
+        if self.video is not None:
+            self.video.release()
+            self.video = None
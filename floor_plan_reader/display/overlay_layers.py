@@ -0,0 +1,95 @@
+import numpy as np
+import pygame
+
+from floor_plan_reader.display.background_cache import BackgroundCache
+
+
+class OverlayLayers:
+    """
+    Agent cells painted into full resolution overlay layers, blitted with one scaled blit per frame.
+
+    Every layer counts per pixel how many agents show that cell, so agents sharing cells can
+    come and go independently. sync() only repaints agents whose get_overlay_key() changed
+    and only the region they touched is composited again. The composite is black where no
+    layer shows a cell, black being the colour key, and is scaled like the background,
+    nearest neighbour so cells stay sharp.
+    """
+    BLOB_CELLS = "blob_cells"
+    FREE_SLOTS = "free_slots"
+    ROOT_CELLS = "root_cells"
+    # Drawing order, later layers on top
+    LAYERS = (BLOB_CELLS, FREE_SLOTS, ROOT_CELLS)
+    COLOURS = {
+        BLOB_CELLS: (200, 0, 0),
+        FREE_SLOTS: (0, 255, 0),
+        ROOT_CELLS: (100, 200, 160),
+    }
+
+    def __init__(self, shape):
+        self.height, self.width = shape
+        self.counts = {layer: np.zeros(shape, dtype=np.int32) for layer in self.LAYERS}
+        self.rgb = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        # Colour keyed rather than per pixel alpha: blitting it is an order of magnitude faster
+        self.surface = pygame.image.frombuffer(self.rgb, (self.width, self.height), "RGB")
+        self.surface.set_colorkey((0, 0, 0))
+        # agent -> (overlay key, {layer: (ys, xs)}) of what it has painted
+        self.painted = {}
+        self.dirty = None
+        self.scaler = BackgroundCache(pygame.transform.scale)
+        # Scaled per frame only where the window is, the layers change too often to keep every zoom
+        self.scaler.MAX_CACHED_PIXELS = 0
+
+    def sync(self, agents):
+        """
+        Bring the layers up to date with the cells of the live agents.
+        """
+        live = set()
+        for agent in agents:
+            if not agent.alive:
+                continue
+            key = agent.get_overlay_key()
+            previous = self.painted.get(agent)
+            if previous is not None and previous[0] == key:
+                live.add(agent)
+                continue
+            if previous is not None:
+                self._add(previous[1], -1)
+                del self.painted[agent]
+            if key is None:
+                continue
+            coords = {}
+            for layer, cells in agent.get_overlay_cells().items():
+                xy = np.array([(c.x, c.y) for c in cells], dtype=np.int64).reshape(-1, 2)
+                inside = (xy[:, 0] >= 0) & (xy[:, 0] < self.width) & (xy[:, 1] >= 0) & (xy[:, 1] < self.height)
+                coords[layer] = (xy[inside, 1], xy[inside, 0])
+            self._add(coords, 1)
+            self.painted[agent] = (key, coords)
+            live.add(agent)
+        for agent in [a for a in self.painted if a not in live]:
+            self._add(self.painted.pop(agent)[1], -1)
+
+    def _add(self, coords, delta):
+        for layer, (ys, xs) in coords.items():
+            if len(xs) == 0:
+                continue
+            np.add.at(self.counts[layer], (ys, xs), delta)
+            bounds = (int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1)
+            if self.dirty is None:
+                self.dirty = bounds
+            else:
+                self.dirty = (min(self.dirty[0], bounds[0]), min(self.dirty[1], bounds[1]),
+                              max(self.dirty[2], bounds[2]), max(self.dirty[3], bounds[3]))
+
+    def _composite(self):
+        x0, y0, x1, y1 = self.dirty
+        region = self.rgb[y0:y1, x0:x1]
+        region[:] = 0
+        for layer in self.LAYERS:
+            region[self.counts[layer][y0:y1, x0:x1] > 0] = self.COLOURS[layer]
+        self.dirty = None
+        self.scaler.invalidate()
+
+    def draw(self, screen, vp):
+        if self.dirty is not None:
+            self._composite()
+        self.scaler.draw(screen, self.surface, (self.width, self.height), vp)
@@ -1,6 +1,7 @@
 import pygame
 
 from floor_plan_reader.display.button import Button
+from floor_plan_reader.display.glyph_atlas import GlyphAtlas
 from floor_plan_reader.display.intersectionview import IntersectionView
 from floor_plan_reader.display.point import Point
 from floor_plan_reader.display.text_box import TextBox
@@ -23,6 +24,53 @@ class Converter:
         return self.convert_(point[0], point[1])
 
 
+class Inspection:
+    """
+    Everything the pop-up shows of the selected wall, gathered on the simulation thread.
+
+    The blob snapshots are versioned by the blob's cell count and the world's writes to the
+    grid they show, and taken over from the previous inspection while those are unchanged.
+    """
+
+    def __init__(self, selected, line_dic, previous=None):
+        blob = selected.blob
+        world = blob.world
+        self.text = [f"blob id:{blob.id}", f"{selected.id}:{selected.get_state()}"]
+        if selected.wall_segment is not None:
+            self.text.append(f"state seg:{selected.wall_segment.state}")
+        blob.calculate_bounding_box()
+        self.bounding_box = blob.get_corners()
+        self.grid_key = (blob.id, len(blob.cells), world.writes[world.FOOD])
+        if previous is not None and previous.grid_key == self.grid_key:
+            self.grid_snapshot = previous.grid_snapshot
+        else:
+            self.grid_snapshot = blob.get_snapshot()
+        self.occupied_key = (blob.id, len(blob.cells), world.writes[world.OCCUPIED])
+        if previous is not None and previous.occupied_key == self.occupied_key:
+            self.occupied_snapshot = previous.occupied_snapshot
+        else:
+            self.occupied_snapshot = blob.get_occupied_snapshot()
+        self.intersections = tuple(blob.get_intersections())
+        # line id -> (start, end) of the lines through the intersections
+        self.lines = {}
+        for i in self.intersections:
+            for l in i.lines:
+                if line_dic is not None and l in line_dic:
+                    self.lines[l] = (line_dic[l].start_point, line_dic[l].end_point)
+        if blob.rerun is not None:
+            # What the last "Blob Rerun" found, next to the blueprint's intersections
+            intersections, lines = blob.rerun
+            self.text.append(f"rerun: {len(lines)} lines, {len(intersections)} intersections")
+            self.intersections += intersections
+            self.lines.update(lines)
+        segments = set()
+        for w in blob.get_walls():
+            if w.wall_segment is not None:
+                segments.add(w.wall_segment)
+        self.segment_lines = tuple(s.collision_box_extended.get_center_line_string().bounds
+                                   for s in segments if s.collision_box_extended is not None)
+
+
 class PopupMenu(Window):
     def __init__(self, view, x, y, width, height, title="Action Menu"):
         self.view = view
@@ -40,90 +88,62 @@ class PopupMenu(Window):
         self.components.add(self.button_run_blob)
         self.components.add(self.text_box)
 
-        # Basic fonts for text
-        self.tfont = pygame.font.SysFont(None, 14)
-        self.font = pygame.font.SysFont(None, 24)
-        self.big_font = pygame.font.SysFont(None, 32)
+        self.title_size = 32
+        # (snapshot array, zoomed surface) of the last snapshots drawn
+        self.zoomed = []
 
     def run_blob(self):
-        self.view.run_blob()
+        self.view.simulation.submit(self.view.run_blob)
 
-    def draw(self, surface):
+    def draw(self, surface, inspection=None):
         """Draw the pop-up and its button if visible."""
-        if not self.visible:
+        if not self.visible or inspection is None:
             return
         super().draw(surface)
         # Title
-        selected = self.view.selected
-        state = selected.get_state()
-        text = []
-        text.append(f"blob id:{selected.blob.id}")
-        text.append(f"{selected.id}:{state}")
-        if selected.wall_segment is not None:
-            text.append(f"state seg:{selected.wall_segment.state}")
-        self.text_box.set_text(text)
-        title_text = self.big_font.render(self.title, True, (255, 255, 255))
+        self.text_box.set_text(inspection.text)
+        title_text = GlyphAtlas.shared().render(self.title, self.title_size, (255, 255, 255))
         title_rect = title_text.get_rect(center=(self.rect.centerx, self.rect.y + 30))
         surface.blit(title_text, title_rect)
 
         # --- Zoom/Scale the surface ---
-        blob = selected.blob
-        blob.calculate_bounding_box()
-        snapshot = blob.get_snapshot()
         position = (50, 100)
         snap_x = self.rect.x + position[0]
         snap_y = self.rect.y + position[1]
-        self.draw_snapshot(surface, snapshot, position)
+        self.draw_snapshot(surface, inspection.grid_snapshot, position)
+        self.draw_snapshot(surface, inspection.occupied_snapshot, position)
 
-        snapshot = blob.get_occupied_snapshot()
-        self.draw_snapshot(surface, snapshot, position)
-
-        intersections = blob.get_intersections()
-        center = blob.get_center()
-        blob.calculate_bounding_box()
+        bounding_box = inspection.bounding_box
+        self.draw_segments(surface, inspection.segment_lines, bounding_box, snap_x, snap_y)
 
-        bounding_box = blob.get_corners()
-        walls = blob.get_walls()
-        segments = set()
-        for w in walls:
-            if w.wall_segment is not None:
-                segments.add(w.wall_segment)
-
-        self.draw_segments(surface, segments, bounding_box, snap_x, snap_y)
-
-        self.draw_intersections(surface, intersections, bounding_box, snap_x, snap_y)
+        self.draw_intersections(surface, inspection.intersections, inspection.lines, bounding_box, snap_x, snap_y)
 
     def convert(self, bounding_box, x, y, zoom, p_x, p_y):
         dx, dy = x - bounding_box.min_x, y - bounding_box.min_y
         sx, sy = dx * zoom, dy * zoom
         return sx + p_x, sy + p_y
 
-    def draw_segments(self, surface, segments, bounding_box, snap_x, snap_y):
+    def draw_segments(self, surface, segment_lines, bounding_box, snap_x, snap_y):
         conv = Converter(bounding_box, snap_x, snap_y, self.convert)
-        for s in segments:
-            if s.collision_box_extended is not None:
-                cb = s.collision_box_extended
-                line = cb.get_center_line_string()
-                x1, y1, x2, y2 = line.bounds
-                sx1, sy1 = conv.convert_(x1, y1)
-                sx2, sy2 = conv.convert_(x2, y2)
-                pygame.draw.line(surface, (255, 255, 0), (sx1, sy1), (sx2, sy2), 3)
+        for x1, y1, x2, y2 in segment_lines:
+            sx1, sy1 = conv.convert_(x1, y1)
+            sx2, sy2 = conv.convert_(x2, y2)
+            pygame.draw.line(surface, (255, 255, 0), (sx1, sy1), (sx2, sy2), 3)
 
-    def draw_intersections(self, surface, intersections, bounding_box, snap_x, snap_y):
+    def draw_intersections(self, surface, intersections, lines, bounding_box, snap_x, snap_y):
 
         conv = Converter(bounding_box, snap_x, snap_y, self.convert)
         v = IntersectionView()
         # w, h = blob.get_shape()
         vp = ViewPoint()
         vp.zoom_factor = 4
+        atlas = GlyphAtlas.shared()
 
         for i in intersections:
             (ix, iy) = i.point
             ex, ey = conv.convert_(ix, iy)
             pygame.draw.circle(surface, (0, 255, 255), (ex, ey), 6)
-            # Define a font
-            font = pygame.font.SysFont("Arial", 16)  # (font_name, size)
-            text_surface = font.render(f"{i.id}", True, (255, 255, 255))
+            text_surface = atlas.render(f"{i.id}", 16, (255, 255, 255), "Arial")
             text_rect = text_surface.get_rect(center=(ex, ey))
             half_width = text_rect.width // 2
             # Add some padding around the text
@@ -140,12 +160,12 @@ class PopupMenu(Window):
 
             surface.blit(text_surface, (ex-half_width, ey-half_width))
             for l in i.lines:
-                if l in self.view.simulation._line_dic:
-                    line = self.view.simulation._line_dic[l]
-                    start = conv.convert_tuple(line.start_point)
-                    end = conv.convert_tuple(line.end_point)
+                if l in lines:
+                    start_point, end_point = lines[l]
+                    start = conv.convert_tuple(start_point)
+                    end = conv.convert_tuple(end_point)
                     pygame.draw.line(surface, (255, 0, 0), start, end)
-                    text_surface = font.render(f"{l}", True, (255, 255, 255))
+                    text_surface = atlas.render(f"{l}", 16, (255, 255, 255), "Arial")
                     surface.blit(text_surface, ((start[0]+end[0])/2, (start[1]+end[1])/2))
 
         center = (snap_x, snap_y)
@@ -154,14 +174,24 @@ class PopupMenu(Window):
         v.draw_intersections(surface, vp, intersections, (0, 255, 0))
 
     def draw_snapshot(self, surface, snapshot, position):
+        surface.blit(self.get_zoomed(snapshot), (self.rect.x + position[0], self.rect.y + position[1]))
+
+    def get_zoomed(self, snapshot):
+        """
+        `snapshot` as a surface magnified 4x, made again only when the inspection took a new one.
+        """
+        for array, zoomed_surface in self.zoomed:
+            if array is snapshot:
+                return zoomed_surface
         surface_blob = pygame.surfarray.make_surface(snapshot.swapaxes(0, 1))
         zoom_factor = 4  # magnify by 4x
         scaled_width = surface_blob.get_width() * zoom_factor
         scaled_height = surface_blob.get_height() * zoom_factor
 
         zoomed_surface = pygame.transform.scale(surface_blob, (scaled_width, scaled_height))
-
-        surface.blit(zoomed_surface, (self.rect.x + position[0], self.rect.y + position[1]))
+        # The grid and the occupied snapshot are drawn every frame
+        self.zoomed = [(snapshot, zoomed_surface)] + self.zoomed[:1]
+        return zoomed_surface
 
     def handle_event(self, event, on_button_click=None):
         for c in self.components:
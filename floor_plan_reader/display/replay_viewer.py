@@ -0,0 +1,147 @@
+import bisect
+import sys
+
+import numpy as np
+import pygame
+
+from floor_plan_reader.display.background_cache import BackgroundCache
+from floor_plan_reader.display.bounding_box_drawer import BoundingBoxDrawer
+from floor_plan_reader.display.glyph_atlas import GlyphAtlas
+from floor_plan_reader.display.view_point import ViewPoint
+from floor_plan_reader.event_log import EventLog
+from floor_plan_reader.math.collision_box import CollisionBox
+
+
+class ReplayViewer:
+    """
+    Window to scrub through an event log without running the simulation.
+
+    Left/Right step to the previous/next recorded tick, 100 ticks with shift, Home/End jump
+    to the first/last tick and a click on the bar at the bottom jumps to that point of the
+    run. The mouse wheel zooms and W/A/S/D pan as in the simulation window.
+    """
+    COLOURS = {
+        "Mushroom": (255, 255, 0),
+        "WallSegment": (0, 255, 0),
+        "Blob": (200, 0, 0),
+        "Ant": (0, 0, 255),
+        "other": (255, 0, 255),
+    }
+    OCCUPIED_COLOUR = (100, 200, 160)
+    BAR_HEIGHT = 12
+    MOVE_SPEED = 10
+
+    def __init__(self, log):
+        self.log = log
+        self.ticks = [tick for tick, _ in log.ticks]
+        self.vp = ViewPoint()
+        self.background = BackgroundCache(pygame.transform.scale)
+        self.overlay = BackgroundCache(pygame.transform.scale)
+        # Replaced on every seek, not worth keeping per zoom
+        self.overlay.MAX_CACHED_PIXELS = 0
+        self.cb_drawer = BoundingBoxDrawer()
+        self.state = None
+        self.grid_surface = None
+        self.occupied_surface = None
+        self.screen = None
+        self.running = False
+
+    def seek(self, tick):
+        tick = min(max(tick, self.log.first_tick()), self.log.last_tick())
+        self.state = self.log.state_at(tick)
+        self.state.tick = tick
+        self.grid_surface = self._grid_surface(self.state.grid)
+        self.occupied_surface = self._occupied_surface(self.state.occupied)
+
+    def step(self, count):
+        """
+        Move `count` recorded ticks forward, backward when negative.
+        """
+        index = bisect.bisect_right(self.ticks, self.state.tick) - 1
+        index = min(max(index + count, 0), len(self.ticks) - 1)
+        self.seek(self.ticks[index])
+
+    def _grid_surface(self, grid):
+        rgb = np.where((grid == 1)[..., None], np.uint8(255), np.uint8(0)).repeat(3, axis=2)
+        return pygame.surfarray.make_surface(rgb.swapaxes(0, 1))
+
+    def _occupied_surface(self, occupied):
+        rgb = np.zeros(occupied.shape + (3,), dtype=np.uint8)
+        rgb[occupied != 0] = self.OCCUPIED_COLOUR
+        surface = pygame.surfarray.make_surface(rgb.swapaxes(0, 1))
+        surface.set_colorkey((0, 0, 0))
+        return surface
+
+    def draw(self, screen):
+        screen.fill((250, 250, 250))
+        size = (self.log.width, self.log.height)
+        self.background.draw(screen, self.grid_surface, size, self.vp)
+        self.overlay.draw(screen, self.occupied_surface, size, self.vp)
+        for kind, state, box in self.state.agents.values():
+            if box is not None:
+                self.cb_drawer.draw(CollisionBox(*box), screen, self.vp, self.COLOURS[kind])
+
+        width, height = screen.get_size()
+        bar = pygame.Rect(0, height - self.BAR_HEIGHT, width, self.BAR_HEIGHT)
+        pygame.draw.rect(screen, (60, 60, 60), bar)
+        first, last = self.log.first_tick(), self.log.last_tick()
+        if last > first:
+            x = int((self.state.tick - first) / (last - first) * (width - 1))
+            pygame.draw.line(screen, (255, 255, 255), (x, bar.top), (x, bar.bottom))
+        label = GlyphAtlas.shared().render(f"tick {self.state.tick}/{last} agents {len(self.state.agents)}", 18,
+                                           (255, 0, 0))
+        screen.blit(label, (10, 10))
+
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.running = False
+        elif event.type == pygame.KEYDOWN:
+            steps = 100 if event.mod & pygame.KMOD_SHIFT else 1
+            if event.key == pygame.K_ESCAPE:
+                self.running = False
+            elif event.key == pygame.K_RIGHT:
+                self.step(steps)
+            elif event.key == pygame.K_LEFT:
+                self.step(-steps)
+            elif event.key == pygame.K_HOME:
+                self.seek(self.log.first_tick())
+            elif event.key == pygame.K_END:
+                self.seek(self.log.last_tick())
+            elif event.key == pygame.K_a:
+                self.vp.move_left(self.MOVE_SPEED)
+            elif event.key == pygame.K_d:
+                self.vp.move_right(self.MOVE_SPEED)
+            elif event.key == pygame.K_w:
+                self.vp.offset_y -= self.MOVE_SPEED
+            elif event.key == pygame.K_s:
+                self.vp.offset_y += self.MOVE_SPEED
+        elif event.type == pygame.MOUSEBUTTONDOWN:
+            if event.button == 4:
+                self.vp.zoom_in()
+            elif event.button == 5:
+                self.vp.zoom_out()
+            elif event.button == 1:
+                width, height = self.screen.get_size()
+                if event.pos[1] >= height - self.BAR_HEIGHT:
+                    first, last = self.log.first_tick(), self.log.last_tick()
+                    self.seek(first + round(event.pos[0] / max(1, width - 1) * (last - first)))
+
+    def run(self):
+        pygame.init()
+        pygame.key.set_repeat(250, 30)
+        self.screen = pygame.display.set_mode((self.log.width, self.log.height + self.BAR_HEIGHT), pygame.RESIZABLE)
+        pygame.display.set_caption("Replay")
+        clock = pygame.time.Clock()
+        self.seek(self.log.first_tick())
+        self.running = True
+        while self.running:
+            for event in pygame.event.get():
+                self.handle_event(event)
+            self.draw(self.screen)
+            pygame.display.flip()
+            clock.tick(60)
+        pygame.quit()
+
+
+if __name__ == "__main__":
+    ReplayViewer(EventLog(sys.argv[1])).run()
@@ -3,25 +3,38 @@ from collections import deque
 
 import pygame
 
+from floor_plan_reader.blueprint_extractor import SegmentSnapshot
+from floor_plan_reader.display.background_cache import BackgroundCache
 from floor_plan_reader.display.intersectionview import IntersectionView
-from floor_plan_reader.display.popup_menu import PopupMenu
+from floor_plan_reader.display.overlay_layers import OverlayLayers
+from floor_plan_reader.display.popup_menu import Inspection, PopupMenu
 from floor_plan_reader.display.status_window import StatusWindow
 from floor_plan_reader.display.user_input import UserInput
 from floor_plan_reader.display.view_point import ViewPoint
 from floor_plan_reader.intersections_solver import IntersectionSolver
+from floor_plan_reader.world import World
 
 
 class SimulationView:
+    # Screen pixels around the window in which agents are still drawn, for arrows and labels
+    CULL_MARGIN = 40
+    # Cells around a click searched for walls, their boxes reach at most this far past their cells
+    PICK_RADIUS = 3
+
     def __init__(self,simulation):
         self.selected = None
         self.popup = PopupMenu(self, 300, 200, 500, 350, title="Actions")
-        self.sw = StatusWindow(simulation, 10, 10, 100, 100)
+        self.sw = StatusWindow(simulation, 10, 10, 200, 100)
         self.vp = ViewPoint()
+        self.background = BackgroundCache()
+        self.overlays = None
         self.user_input = UserInput(self)
         self.screen = None
         self.simulation=simulation
         self.intersections_view = IntersectionView(self.simulation)
         self.selected = None
+        # Last inspection of the selection, its snapshots are reused while unchanged
+        self.inspection = None
         self.selections = set()
         self.mouse_actions = deque()
 
@@ -49,9 +62,6 @@ class SimulationView:
             popup.show()
             # self.selected = selection_candidate
 
-    def get_walls(self):
-        return self.simulation.world.walls.copy()
-
     def execute_on_selected(self):
         boxes = []
         # create_box_image
@@ -65,23 +75,52 @@ class SimulationView:
         self.selected.print_box()
 
     def run_blob(self):
+        """
+        Rebuild the selected blob's walls from scratch. Simulation thread; the intersections of
+        its segments are solved on the background worker, on copies, see solve_blob().
+        """
         blob = self.selected.blob
-        s = IntersectionSolver(blob.world)
         blob.purge_dead_walls()
         segments = set()
         for w in blob.get_walls():
             if w.alive and w.wall_segment is not None:
                 w.wall_segment.calculate_extended_bounding_box()
                 segments.add(w.wall_segment)
-        s.build_lines_and_intersections(segments)
+        snapshots = [SegmentSnapshot(seg, self.simulation.commands) for seg in segments]
+        self.simulation.run_in_background(lambda: self.solve_blob(blob, snapshots))
 
         blob.print_blob()
         blob.full_reset()
 
+    def solve_blob(self, blob, segments):
+        """
+        Lines and intersections of segment snapshots, with a model of their own. Background
+        worker; the result is handed to the blob on the simulation thread, the pop-up shows it.
+        """
+        world = World()
+        for seg in segments:
+            seg.world = world
+        result = IntersectionSolver(world).build_lines_and_intersections(segments)
+        logging.info(f"Blob {blob.id}: {len(result['lines'])} lines, {len(result['intersections'])} intersections")
+        intersections = tuple(result["intersections"])
+        lines = {l.id: (l.start_point, l.end_point) for l in result["lines"]}
+        self.simulation.submit(lambda: blob.set_rerun(intersections, lines))
+        return result
+
+    def inspect(self):
+        """
+        What the pop-up shows of the selection, None when nothing is selected. Simulation thread.
+        """
+        selected = self.selected
+        if selected is None:
+            self.inspection = None
+            return None
+        self.inspection = Inspection(selected, self.simulation._line_dic, self.inspection)
+        return self.inspection
+
     def evaluate_selected(self, mx, my):
         selection_candidate = None
-        shallow = self.get_walls()
-        for a in shallow:
+        for a in self.simulation.world.get_walls_near(mx, my, self.PICK_RADIUS):
             if self.simulation.is_wall(a, mx, my):
                 selection_candidate = a
                 break
@@ -93,34 +132,46 @@ class SimulationView:
         self.user_input.run()
         if not len(self.mouse_actions) == 0:
             x, y = self.mouse_actions.pop()
-            self.evaluate_selected(x, y)
+            self.simulation.submit(lambda: self.evaluate_selected(x, y))
+
     def draw(self):
-        # --- Draw ---
-        self.screen.fill((250, 250, 250))
+        self.render(self.screen, self.simulation.get_frame())
+        pygame.display.flip()
+
+    def render(self, screen, frame):
+        """
+        Draw `frame` onto `screen`, the window or any other surface. Only the background
+        while there is no frame yet.
+        """
+        screen.fill((250, 250, 250))
         width = self.get_width()
         height = self.get_height()
-        # Scale the floorplan based on zoom_factor
-        new_w = int(width * self.vp.zoom_factor)
-        new_h = int(height * self.vp.zoom_factor)
-        #floorplan_scaled = pygame.transform.smoothscale(self.simulation.floorplan_surf, (new_w, new_h))
-        img = pygame.transform.smoothscale(self.simulation.img_colour_surface, (new_w, new_h))
-
-        # Blit the scaled floorplan at (0,0)
-        # screen.blit(floorplan_scaled, vp.get_center())
-        self.screen.blit(img, self.vp.get_center())
-        # Draw ants (scaled)
-        for agent in self.simulation.world.agents:
-            if agent.alive:
-                agent.draw(self.screen, self.vp)
+        # Scaled once per zoom factor, only the part under the window is blitted
+        self.background.draw(screen, self.simulation.img_colour_surface, (width, height), self.vp)
+
+        if frame is None:
+            return
+
+        # Agent cells: repainted when they change, one blit for all of them
+        shape = self.simulation.world.grid.shape
+        if self.overlays is None or (self.overlays.height, self.overlays.width) != shape:
+            self.overlays = OverlayLayers(shape)
+        self.overlays.sync(frame.agents)
+        self.overlays.draw(screen, self.vp)
+
+        # Draw the agents that can be seen in the window
+        screen_w, screen_h = screen.get_size()
+        visible = self.vp.visible_bounds(screen_w, screen_h, self.CULL_MARGIN)
+        for agent in frame.agents:
+            if self.vp.is_visible(agent.get_bounds(), visible):
+                agent.draw(screen, self.vp)
         # Render the number of agents in the top-left corner
 
-        self.sw.draw(self.screen)
+        self.sw.draw(screen, frame)
 
         self.handle_visible_pupup()
 
-        self.intersections_view.draw(self.screen, self.vp)
+        self.intersections_view.draw_intersections(screen, self.vp, frame.intersections)
 
         # Draw the pop-up
-        self.popup.draw(self.screen)
-
-        pygame.display.flip()
+        self.popup.draw(screen, frame.inspection)
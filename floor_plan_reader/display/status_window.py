@@ -3,20 +3,48 @@ from floor_plan_reader.display.window import Window
 
 
 class StatusWindow(Window):
+    # Most common agent states listed under the totals
+    STATES_SHOWN = 6
+
     def __init__(self, simulation, x, y, width, height, title="Action Menu"):
         self.simulation = simulation
         super().__init__(x, y, width, height)
         self.text_box = TextBox(self, [], (0, 0))
         self.components.add(self.text_box)
 
-    def draw(self, surface):
-        super().draw(surface)
-        txt =[]
+    def draw(self, surface, frame):
+        txt = []
 
-        agent_txt = f"Agents: {self.simulation.get_agent_count()}"
-        seg_txt = f"Wall Seg: {self.simulation.get_wall_segment_count()}"
-        blob_txt = f"blobs:{self.simulation.get_blob_count()}"
+        agent_txt = f"Agents: {frame.agent_count}"
+        seg_txt = f"Wall Seg: {frame.wall_segment_count}"
+        blob_txt = f"blobs:{frame.blob_count}"
         txt.append(agent_txt)
         txt.append(seg_txt)
         txt.append(blob_txt)
+        txt.extend(self.metrics_text(frame.metrics))
+        # Grow with the text, the box starts 50 pixels down
+        self.rect.height = 50 + len(txt) * self.text_box.vertical_spacing
         self.text_box.set_text(txt)
+        super().draw(surface)
+
+    def metrics_text(self, metrics):
+        if not metrics:
+            return []
+        txt = [f"tick: {metrics['tick']}"]
+        if "ticks_per_s" in metrics:
+            txt.append(f"ticks/s: {metrics['ticks_per_s']:.1f}")
+            txt.append(f"occ writes/tick: {metrics['occupancy_writes_per_tick']:.1f}")
+        agents = metrics["agents"]
+        txt.append(f"active: {agents['active']} sleeping: {agents['sleeping']}")
+        txt.append(f"candidates: {metrics['candidates']} recompute: {metrics['recompute_queue']}")
+        txt.append(f"cascade depth: {metrics['recompute_queue.depth']} max: {metrics['recompute_queue.max_depth']}"
+                   f" coalesced: {metrics['recompute_queue.coalesced']}")
+        for name in ("blueprint_snapshot_ms", "blueprint_extract_ms", "json_write_ms"):
+            if metrics[name] is not None:
+                txt.append(f"{name[:-3].replace('_', ' ')}: {metrics[name]:.0f} ms")
+        if metrics["rss_mb"] is not None:
+            txt.append(f"RSS: {metrics['rss_mb']:.0f} MB")
+        states = sorted(agents["states"].items(), key=lambda item: -item[1])
+        for state, count in states[:self.STATES_SHOWN]:
+            txt.append(f"{state}: {count}")
+        return txt
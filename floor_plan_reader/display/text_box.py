@@ -1,4 +1,4 @@
-import pygame
+from floor_plan_reader.display.glyph_atlas import GlyphAtlas
 
 
 class TextBox:
@@ -8,7 +8,7 @@ class TextBox:
         self.position = position
         self.color = (255, 255, 255)
         self.vertical_spacing = 15
-        self.font = pygame.font.SysFont(None, 14)
+        self.font_size = 14
 
     def set_text(self, text):
         self.lines = text
@@ -22,7 +22,7 @@ class TextBox:
     def draw(self, surface):
         center_x, start_y = self.get_center_x(), self.get_y() + 50
         for i, text_str in enumerate(self.lines):
-            text_surface = self.font.render(text_str, True, self.color)
+            text_surface = GlyphAtlas.shared().render(text_str, self.font_size, self.color)
             text_rect = text_surface.get_rect(center=(center_x, start_y + i * self.vertical_spacing))
             surface.blit(text_surface, text_rect)
 
@@ -38,7 +38,7 @@ class UserInput:
                 if self.view.popup.visible:
                     self.view.popup.handle_event(
                         event,
-                        on_button_click=lambda: self.view.execute_on_selected()
+                        on_button_click=lambda: self.view.simulation.submit(self.view.execute_on_selected)
                     )
                 else:
                     # Otherwise, handle normal events (e.g., box selection)
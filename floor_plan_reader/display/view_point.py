@@ -37,6 +37,27 @@ class ViewPoint:
         y_map = screen_y / self.zoom_factor - self.offset_y
         return x_map, y_map
 
+    def visible_bounds(self, width, height, margin=0):
+        """
+        Map area shown in a width x height window, grown by `margin` screen pixels on every side.
+
+        Returns:
+            (min_x, min_y, max_x, max_y) in map coordinates.
+        """
+        min_x, min_y = self.convert_back(-margin, -margin)
+        max_x, max_y = self.convert_back(width + margin, height + margin)
+        return min_x, min_y, max_x, max_y
+
+    @staticmethod
+    def is_visible(bounds, visible):
+        """
+        True if map bounds (min_x, min_y, max_x, max_y) intersect the visible_bounds; unknown bounds (None) are visible.
+        """
+        if bounds is None:
+            return True
+        return (bounds[0] <= visible[2] and bounds[2] >= visible[0] and
+                bounds[1] <= visible[3] and bounds[3] >= visible[1])
+
     def get_center(self):
         return self.offset_x * self.zoom_factor, self.offset_y * self.zoom_factor
 
@@ -0,0 +1,48 @@
+import pygame
+
+from floor_plan_reader.display.agent_draw import AgentDraw
+from floor_plan_reader.display.bounding_box_drawer import BoundingBoxDrawer
+from floor_plan_reader.display.glyph_atlas import GlyphAtlas
+from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.math.vector import Vector
+
+
+class WallSegmentDraw(AgentDraw):
+    def __init__(self, segment):
+        super().__init__(segment)
+        self.cb_drawer = BoundingBoxDrawer()
+        self.collision_box = segment.collision_box.copy()
+        self.selected = segment.is_selected()
+        self.overlapping = tuple(o.collision_box.copy() for o in segment.overlapping)
+        self.center = segment.get_center()
+        # (center, covered ratio) of every part
+        self.parts = tuple((p.get_center(), p.get_covered_ratio()) for p in segment.parts)
+        self.openings = tuple((o.center_x, o.width) for o in segment.openings)
+
+    def draw(self, screen, vp):
+        colour = (0, 255, 0)
+        self.cb_drawer.draw(self.collision_box, screen, vp, colour)
+        for box in self.overlapping:
+            self.cb_drawer.draw(box, screen, vp, colour)
+
+        x, y = self.center
+        x, y = vp.convert(x, y)
+        pygame.draw.circle(screen, colour, (x, y), 1)
+        atlas = GlyphAtlas.shared()
+        font_size = int(vp.zoom_factor * 8)
+        for center, score in self.parts:
+            x, y = vp.convert(center[0], center[1])
+            text_surface = atlas.render(f"s: {score:.{2}f}", font_size, (15, 255, 0))
+            screen.blit(text_surface, (x, y))  # Position (x=10, y=10)
+
+        self.draw_opening(screen, vp)
+
+    def draw_opening(self, screen, vp):
+        colour = (255, 0, 0)
+        direction = self.collision_box.get_direction()
+        for center_x, width in self.openings:
+            x, y = Vector.madd_t(self.center, direction.direction, center_x)
+
+            collision_box = CollisionBox(x, y, self.collision_box.width, width,
+                                         self.collision_box.rotation)
+            self.cb_drawer.draw(collision_box, screen, vp, colour)
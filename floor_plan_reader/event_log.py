@@ -0,0 +1,325 @@
+import bisect
+import mmap
+import struct
+import zlib
+
+import numpy as np
+
+from floor_plan_reader.world import World
+
+MAGIC = b"FPEVLOG1"
+# magic, height, width, keyframe interval
+HEADER = struct.Struct("<8sIII")
+# record type, payload length
+RECORD = struct.Struct("<BI")
+TICK_RECORD = struct.Struct("<I")
+NAME_RECORD = struct.Struct("<H")
+KEYFRAME_RECORD = struct.Struct("<III")
+
+# Record types
+TICK = 1
+NAME = 2
+SPAWNS = 3
+KILLS = 4
+STATES = 5
+BOXES = 6
+OCCUPIED = 7
+FOOD = 8
+KEYFRAME = 9
+
+# Agent kinds, by class name
+KINDS = ("other", "Ant", "Blob", "Mushroom", "WallSegment")
+NO_STATE = 0xFFFF
+
+SPAWN_DTYPE = np.dtype([("id", "<u4"), ("kind", "u1")])
+STATE_DTYPE = np.dtype([("id", "<u4"), ("state", "<u2")])
+BOX_DTYPE = np.dtype([("id", "<u4"), ("box", "<f4", 5)])
+CELL_DTYPE = np.dtype([("x", "<u4"), ("y", "<u4"), ("value", "<u8")])
+AGENT_DTYPE = np.dtype([("id", "<u4"), ("kind", "u1"), ("state", "<u2"), ("has_box", "u1"), ("box", "<f4", 5)])
+
+
+def kind_of(agent):
+    name = type(agent).__name__
+    return KINDS.index(name) if name in KINDS else 0
+
+
+def box_of(agent):
+    """
+    (center_x, center_y, width, length, rotation) of the agent's collision box, or None.
+    """
+    box = agent.get_collision_box()
+    if box is None:
+        return None
+    return box.center_x, box.center_y, box.width, box.length, box.rotation
+
+
+class GridJournal:
+    """
+    Cells the world wrote since the last tick was recorded, filled by World._touch.
+    """
+
+    def __init__(self):
+        self.occupied = set()
+        self.food = set()
+        # The grids were replaced as a whole, only a keyframe can describe that
+        self.replaced = False
+
+    def touch(self, x, y, layers):
+        if World.OCCUPIED in layers:
+            self.occupied.add((x, y))
+        if World.FOOD in layers:
+            self.food.add((x, y))
+
+    def clear(self):
+        self.occupied.clear()
+        self.food.clear()
+        self.replaced = False
+
+
+class EventLogWriter:
+    """
+    Records what changes in the world tick by tick into a compact binary log.
+
+    Each tick that changed anything is a TICK record followed by one array record per kind
+    of change: agents spawned and killed, state transitions, collision boxes and the cells
+    written to the occupied and food grids. Every keyframe_interval ticks, and whenever the
+    grids were replaced as a whole, a KEYFRAME holds the full grids and every agent, so a
+    reader only ever replays deltas from the closest keyframe. State names are written once
+    as NAME records and referred to by index.
+
+    Agents are compared with what was recorded for them, which costs a few attribute reads
+    per agent per tick; cells come from the world's GridJournal rather than a grid diff.
+    """
+    KEYFRAME_INTERVAL = 500
+
+    def __init__(self, path, world, keyframe_interval=KEYFRAME_INTERVAL):
+        self.world = world
+        self.keyframe_interval = keyframe_interval
+        self.file = open(path, "wb", buffering=1 << 20)
+        height, width = world.grid.shape
+        self.file.write(HEADER.pack(MAGIC, height, width, keyframe_interval))
+        self.names = {}
+        # agent id -> (kind, state index, box) as last recorded
+        self.recorded = {}
+        self.last_keyframe = None
+        self.journal = GridJournal()
+        world.journal = self.journal
+
+    def close(self):
+        if self.file is None:
+            return
+        if self.world.journal is self.journal:
+            self.world.journal = None
+        self.file.close()
+        self.file = None
+
+    def _write(self, record_type, payload):
+        self.file.write(RECORD.pack(record_type, len(payload)))
+        self.file.write(payload)
+
+    def _name(self, state):
+        if state is None:
+            return NO_STATE
+        index = self.names.get(state)
+        if index is None:
+            index = len(self.names)
+            self.names[state] = index
+            self._write(NAME, NAME_RECORD.pack(index) + str(state).encode("utf-8"))
+        return index
+
+    def _observe(self):
+        observed = {}
+        for agent in self.world.agents:
+            if agent.alive:
+                observed[agent.id] = (kind_of(agent), self._name(agent.get_state()), box_of(agent))
+        return observed
+
+    def record(self, tick):
+        observed = self._observe()
+        if self.last_keyframe is None or self.journal.replaced or tick - self.last_keyframe >= self.keyframe_interval:
+            self._keyframe(tick, observed)
+        else:
+            self._deltas(tick, observed)
+        self.recorded = observed
+        self.journal.clear()
+
+    def _keyframe(self, tick, observed):
+        world = self.world
+        agents = np.zeros(len(observed), dtype=AGENT_DTYPE)
+        for row, (agent_id, (kind, state, box)) in zip(agents, sorted(observed.items())):
+            row["id"], row["kind"], row["state"] = agent_id, kind, state
+            if box is not None:
+                row["has_box"], row["box"] = 1, box
+        grid = zlib.compress(np.ascontiguousarray(world.grid, dtype=np.uint8).tobytes(), 1)
+        occupied = zlib.compress(np.ascontiguousarray(world.occupied, dtype=np.uint64).tobytes(), 1)
+        self._write(KEYFRAME, KEYFRAME_RECORD.pack(tick, len(grid), len(occupied)) + grid + occupied + agents.tobytes())
+        self.last_keyframe = tick
+
+    def _deltas(self, tick, observed):
+        recorded = self.recorded
+        spawns = [(i, v[0]) for i, v in observed.items() if i not in recorded]
+        kills = [i for i in recorded if i not in observed]
+        states = [(i, v[1]) for i, v in observed.items() if i not in recorded or recorded[i][1] != v[1]]
+        boxes = [(i, v[2]) for i, v in observed.items()
+                 if v[2] is not None and (i not in recorded or recorded[i][2] != v[2])]
+        occupied = self._cells(self.journal.occupied, self.world.occupied)
+        food = self._cells(self.journal.food, self.world.grid)
+        if not (spawns or kills or states or boxes or len(occupied) or len(food)):
+            return
+        self._write(TICK, TICK_RECORD.pack(tick))
+        if spawns:
+            self._write(SPAWNS, np.array(spawns, dtype=SPAWN_DTYPE).tobytes())
+        if states:
+            self._write(STATES, np.array(states, dtype=STATE_DTYPE).tobytes())
+        if boxes:
+            self._write(BOXES, np.array(boxes, dtype=BOX_DTYPE).tobytes())
+        if kills:
+            self._write(KILLS, np.array(kills, dtype="<u4").tobytes())
+        if len(occupied):
+            self._write(OCCUPIED, occupied.tobytes())
+        if len(food):
+            self._write(FOOD, food.tobytes())
+
+    @staticmethod
+    def _cells(cells, grid):
+        if not cells:
+            return np.zeros(0, dtype=CELL_DTYPE)
+        xy = np.array(list(cells), dtype=np.int64)
+        result = np.zeros(len(xy), dtype=CELL_DTYPE)
+        result["x"], result["y"] = xy[:, 0], xy[:, 1]
+        result["value"] = grid[xy[:, 1], xy[:, 0]]
+        return result
+
+
+class ReplayState:
+    """
+    The world as recorded at one tick: the grids and, per agent id, [kind, state, box].
+    """
+
+    def __init__(self, tick, grid, occupied, agents):
+        self.tick = tick
+        self.grid = grid
+        self.occupied = occupied
+        self.agents = agents
+
+
+class EventLog:
+    """
+    Reads a log written by EventLogWriter and rebuilds the world at any tick.
+
+    Opening the log scans the record headers once to index the keyframes and ticks. state_at()
+    starts from the closest keyframe at or before the tick, or carries on from the last state
+    when scrubbing forward, and applies the deltas; no agent code runs.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.height, self.width, self.keyframe_interval = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an event log")
+        self.names = []
+        # (tick, offset) of every keyframe and tick record, in file order
+        self.keyframes = []
+        self.ticks = []
+        self._index()
+        self.state = None
+        self.offset = None
+
+    def close(self):
+        self.data.close()
+
+    def _records(self, offset):
+        data = self.data
+        end = len(data)
+        while offset + RECORD.size <= end:
+            record_type, length = RECORD.unpack_from(data, offset)
+            start = offset + RECORD.size
+            if start + length > end:
+                # Cut short while being written
+                return
+            yield offset, record_type, start, length
+            offset = start + length
+
+    def _index(self):
+        for offset, record_type, start, length in self._records(HEADER.size):
+            if record_type == NAME:
+                (index,) = NAME_RECORD.unpack_from(self.data, start)
+                name = bytes(self.data[start + NAME_RECORD.size:start + length]).decode("utf-8")
+                self.names.extend([None] * (index + 1 - len(self.names)))
+                self.names[index] = name
+            elif record_type == KEYFRAME:
+                tick = KEYFRAME_RECORD.unpack_from(self.data, start)[0]
+                self.keyframes.append((tick, offset))
+                self.ticks.append((tick, offset))
+            elif record_type == TICK:
+                self.ticks.append((TICK_RECORD.unpack_from(self.data, start)[0], offset))
+
+    def first_tick(self):
+        return self.ticks[0][0] if self.ticks else 0
+
+    def last_tick(self):
+        return self.ticks[-1][0] if self.ticks else 0
+
+    def state_at(self, tick):
+        """
+        ReplayState after every change recorded up to and including `tick`.
+        """
+        k = bisect.bisect_right(self.keyframes, (tick, float("inf"))) - 1
+        if k < 0:
+            raise ValueError(f"nothing recorded at or before tick {tick}")
+        keyframe_tick, keyframe_offset = self.keyframes[k]
+        if self.state is None or not keyframe_tick <= self.state.tick <= tick:
+            self.state = None
+            self.offset = keyframe_offset
+        for offset, record_type, start, length in self._records(self.offset):
+            if record_type in (TICK, KEYFRAME):
+                record_tick = struct.unpack_from("<I", self.data, start)[0]
+                if record_tick > tick:
+                    break
+                if record_type == KEYFRAME:
+                    self.state = self._keyframe(start, length)
+                else:
+                    self.state.tick = record_tick
+            elif self.state is not None:
+                self._apply(record_type, start, length)
+            self.offset = start + length
+        return self.state
+
+    def _keyframe(self, start, length):
+        tick, grid_length, occupied_length = KEYFRAME_RECORD.unpack_from(self.data, start)
+        offset = start + KEYFRAME_RECORD.size
+        shape = (self.height, self.width)
+        grid = np.frombuffer(zlib.decompress(self.data[offset:offset + grid_length]), dtype=np.uint8)
+        offset += grid_length
+        occupied = np.frombuffer(zlib.decompress(self.data[offset:offset + occupied_length]), dtype=np.uint64)
+        offset += occupied_length
+        rows = np.frombuffer(self.data, dtype=AGENT_DTYPE, count=(start + length - offset) // AGENT_DTYPE.itemsize,
+                             offset=offset)
+        agents = {}
+        for row in rows:
+            box = tuple(row["box"].tolist()) if row["has_box"] else None
+            agents[int(row["id"])] = [KINDS[row["kind"]], self._state_name(row["state"]), box]
+        return ReplayState(tick, grid.reshape(shape).copy(), occupied.reshape(shape).copy(), agents)
+
+    def _state_name(self, index):
+        return None if index == NO_STATE else self.names[index]
+
+    def _apply(self, record_type, start, length):
+        state = self.state
+        if record_type == SPAWNS:
+            for agent_id, kind in np.frombuffer(self.data, SPAWN_DTYPE, length // SPAWN_DTYPE.itemsize, start).tolist():
+                state.agents[agent_id] = [KINDS[kind], None, None]
+        elif record_type == KILLS:
+            for agent_id in np.frombuffer(self.data, "<u4", length // 4, start).tolist():
+                state.agents.pop(agent_id, None)
+        elif record_type == STATES:
+            for agent_id, index in np.frombuffer(self.data, STATE_DTYPE, length // STATE_DTYPE.itemsize, start).tolist():
+                state.agents[agent_id][1] = self._state_name(index)
+        elif record_type == BOXES:
+            for agent_id, box in np.frombuffer(self.data, BOX_DTYPE, length // BOX_DTYPE.itemsize, start).tolist():
+                state.agents[agent_id][2] = tuple(box)
+        elif record_type in (OCCUPIED, FOOD):
+            cells = np.frombuffer(self.data, CELL_DTYPE, length // CELL_DTYPE.itemsize, start)
+            grid = state.occupied if record_type == OCCUPIED else state.grid
+            grid[cells["y"], cells["x"]] = cells["value"]
@@ -1,104 +1,242 @@
-import itertools
+import numpy as np
+import shapely
+from shapely import STRtree
 
 from floor_plan_reader.model.line import Line
 
 
 class IntersectionSolver:
+    """
+    Builds lines, intersection nodes and edges from wall segments.
+
+    Extraction is incremental: a line is kept per segment together with the segment
+    version it was built from, and every call only re-intersects the lines whose
+    segment changed (see WallSegment.mark_dirty). Nodes are reference counted by the
+    pairs of lines that produced them, so stale lines take their nodes and edges
+    with them.
+    """
+
     def __init__(self, world):
         self.world = world
+        # segment id -> Line
         self.lines = {}
+        # (segment id, segment id) -> {"nodes": [...], "merges": [...]}
+        self._pairs = {}
+        # segment id -> set of pair keys the line takes part in
+        self._pairs_by_line = {}
+        # node -> number of pairs that produced it
+        self._node_refs = {}
+        # segment id -> Edge proposed for the line
+        self._edges = {}
 
     # line_id,seg,(x1, y1),(x2, y2),line_obj
     def create_line(self, id, seg, start_point, end_point, geometry):
         l = Line(start_point, end_point, id, seg, geometry)
-        if l in self.lines:
-            return self.lines.get(l.__hash__())
-        else:
-            self.lines[l.__hash__()] = l
-            return l
+        l.version = seg.version
+        self.lines[seg.id] = l
+        self._pairs_by_line[seg.id] = set()
+        return l
 
     def propose_edge(self, line):
         nodes = list(line.seg.nodes)
         if len(nodes) < 2:
+            self._remove_edge(line.seg.id)
             return  # not enough nodes to form an edge
 
-        # Find the pair of nodes with the maximum distance between them
-        max_dist = -1
-        node1, node2 = None, None
-
-        for a, b in itertools.combinations(nodes, 2):  # all pairs
-            ax, ay = a.point
-            bx, by = b.point
-            dist_sq = (ax - bx) ** 2 + (ay - by) ** 2  # squared distance (faster)
-            if dist_sq > max_dist:
-                max_dist = dist_sq
-                node1, node2 = a, b
+        # Nodes sit on the line, so the furthest-apart pair are the two extremes along it
+        (x1, y1), (x2, y2) = line.geometry.coords[0], line.geometry.coords[-1]
+        points = np.array([n.point for n in nodes], dtype=np.float64)
+        projections = points @ np.array((x2 - x1, y2 - y1), dtype=np.float64)
+        first, last = int(np.argmin(projections)), int(np.argmax(projections))
+        if first == last:
+            first, last = 0, 1
+        node1, node2 = nodes[min(first, last)], nodes[max(first, last)]
         # Create the edge between the furthest-apart nodes
-        self.world.create_edge(node1, node2, line)
+        self._edges[line.seg.id] = self.world.create_edge(node1, node2, line)
+
     def something(self, merge_candidates, intersections, lineA, lineB, intersection_coordinate):
         (x, y) = intersection_coordinate
 
         angle_dif = lineA.seg.collision_box.rotation - lineB.seg.collision_box.rotation
         if abs(angle_dif) < 30:
             merge_candidates.append({"a": lineA.id, "b": lineB.id})
+            return None
         else:
             node = self.world.create_node((x, y))
             node.lines = [lineA.id, lineB.id]
             intersections.add(node)
             lineA.seg.add_node(node)
             lineB.seg.add_node(node)
-            self.propose_edge(lineA)
-            self.propose_edge(lineB)
+            return node
+
+    def _is_stale(self, line, seg):
+        if seg is None or not seg.alive or seg.collision_box_extended is None:
+            return True
+        if line.version != seg.version:
+            return True
+        # Catches boxes replaced without mark_dirty()
+        x1, y1, x2, y2 = seg.collision_box_extended.get_center_line_string().bounds
+        return (line.start_point, line.end_point) != ((x1, y1), (x2, y2))
+
+    def _remove_edge(self, seg_id):
+        edge = self._edges.pop(seg_id, None)
+        if edge is not None:
+            self.world.remove_edge(edge)
+
+    def _remove_line(self, seg_id, touched, removed_nodes):
+        for key in self._pairs_by_line.pop(seg_id, set()):
+            pair = self._pairs.pop(key)
+            other = key[1] if key[0] == seg_id else key[0]
+            self._pairs_by_line[other].discard(key)
+            touched.add(other)
+            for node in pair["nodes"]:
+                self._node_refs[node] -= 1
+                if self._node_refs[node] == 0:
+                    del self._node_refs[node]
+                    self.world.remove_node(node)
+                    removed_nodes.add(node)
+        self._remove_edge(seg_id)
+        del self.lines[seg_id]
+
+    def _refresh_nodes(self, seg_id):
+        # The segment's nodes are exactly those of the pairs its line is part of
+        line = self.lines[seg_id]
+        line.seg.nodes = {n for key in self._pairs_by_line[seg_id] for n in self._pairs[key]["nodes"]}
 
     def build_lines_and_intersections(self, collision_boxes):
+        """
+        Bring lines, nodes and edges up to date with the given segments.
 
-        # STEP 1: Build list of lines
+        Returns:
+            dict with all current "lines", "intersections", "edges" and "merge_candidates",
+            plus the "dirty_lines" rebuilt by this call and the "removed_intersections".
+        """
+        segments = {seg.id: seg for seg in collision_boxes}
 
-        for i, seg in enumerate(collision_boxes):
+        # STEP 1: Drop the lines of removed, dead or changed segments
+        touched = set()
+        removed_nodes = set()
+        for seg_id, line in list(self.lines.items()):
+            if self._is_stale(line, segments.get(seg_id)):
+                self._remove_line(seg_id, touched, removed_nodes)
+
+        # STEP 2: Build lines for new and changed segments
+        dirty = []
+        for seg in collision_boxes:
             cb = seg.collision_box_extended
-            if cb is not None:
-                line_id = f"L{i + 1}"
-                seg_id = seg.id
+            if cb is not None and seg.alive and seg.id not in self.lines:
                 line_obj = cb.get_center_line_string()  # Shapely geometry
                 x1, y1, x2, y2 = line_obj.bounds
-                self.create_line(line_id, seg, (x1, y1), (x2, y2), line_obj)
+                dirty.append(self.create_line(f"L{seg.id}", seg, (x1, y1), (x2, y2), line_obj))
+
+        # STEP 3: Intersect the dirty lines against all lines
         merge_candidates = []
-        # STEP 2: Pairwise intersections
         intersections = set()
-        n = len(self.lines)
         line_list = list(self.lines.values())
-        for i in range(n):
-            for j in range(i + 1, n):
-                lineA = line_list[i]
-                lineB = line_list[j]
-
-                inter = lineA.geometry.intersection(lineB.geometry)
-                if inter.is_empty:
-                    continue
-
-                # Check intersection type
-                if inter.geom_type == "Point":
-                    # Single-point intersection
-                    ix, iy = inter.x, inter.y
-                    self.something(merge_candidates, intersections, lineA, lineB, (ix, iy))
-                elif inter.geom_type == "MultiPoint":
-                    # Possibly multiple intersection points
-                    for pt in inter.geoms:
-                        self.something(merge_candidates, intersections, lineA, lineB, (pt.x, pt.y))
-                elif inter.geom_type == "LineString":
-                    # Overlapping line segments
-                    # If you want just endpoints, can do something like:
-                    coords = list(inter.coords)
-                    # Example: store them or skip
-                    # We'll store each coordinate as a separate intersection:
-                    for (ix, iy) in coords:
-                        self.something(merge_candidates, intersections, lineA, lineB, (ix, iy))
-                # else: handle other geometry types if needed (Polygon, MultiLineString, etc.)
-            for line in self.lines.values():
-                self.propose_edge(line)
+        dirty_ids = {l.seg.id for l in dirty}
+        subset = [i for i, l in enumerate(line_list) if l.seg.id in dirty_ids]
+        for i, j, points in self.intersect_pairs(line_list, subset):
+            line_a, line_b = line_list[i], line_list[j]
+            pair = {"nodes": [], "merges": []}
+            for point in points:
+                node = self.something(pair["merges"], intersections, line_a, line_b, point)
+                if node is not None:
+                    pair["nodes"].append(node)
+                    self._node_refs[node] = self._node_refs.get(node, 0) + 1
+            key = (line_a.seg.id, line_b.seg.id)
+            self._pairs[key] = pair
+            self._pairs_by_line[line_a.seg.id].add(key)
+            self._pairs_by_line[line_b.seg.id].add(key)
+            touched.update(key)
+
+        # STEP 4: One edge proposal per line whose nodes changed
+        touched.update(dirty_ids)
+        for seg_id in touched:
+            if seg_id in self.lines:
+                self._refresh_nodes(seg_id)
+                self.propose_edge(self.lines[seg_id])
+
+        for pair in self._pairs.values():
+            merge_candidates.extend(pair["merges"])
         return {
             "lines": line_list,
-            "intersections": list(intersections),
+            "intersections": list(self._node_refs),
             "edges": list(self.world.get_edges()),
-            "merge_candidates": merge_candidates
+            "merge_candidates": merge_candidates,
+            "dirty_lines": dirty,
+            "removed_intersections": list(removed_nodes - set(self._node_refs)),
         }
+
+    @staticmethod
+    def intersect_pairs(line_list, subset=None):
+        """
+        Intersection points of every pair of intersecting lines, in (i, j) order with i < j.
+        With `subset` (indices into line_list) only pairs involving at least one of those lines are returned.
+
+        An STRtree query with the "intersects" predicate finds the pairs. Crossing
+        segments are solved in one vectorized pass; the parallel (overlapping) ones go
+        through shapely, which returns their shared end points.
+
+        Returns:
+            list of (i, j, [(x, y), ...]).
+        """
+        if len(line_list) < 2:
+            return []
+        geometries = np.array([l.geometry for l in line_list], dtype=object)
+        tree = STRtree(geometries)
+        if subset is None:
+            a, b = tree.query(geometries, predicate="intersects")
+            keep = a < b
+        else:
+            subset = np.asarray(subset, dtype=np.int64)
+            if len(subset) == 0:
+                return []
+            a, b = tree.query(geometries[subset], predicate="intersects")
+            a = subset[a]
+            in_subset = np.zeros(len(line_list), dtype=bool)
+            in_subset[subset] = True
+            # Pairs inside the subset are found from both ends, keep one of them
+            keep = (a != b) & (~in_subset[b] | (a < b))
+            a, b = np.minimum(a, b), np.maximum(a, b)
+        a, b = a[keep], b[keep]
+        order = np.lexsort((b, a))
+        a, b = a[order], b[order]
+
+        coords = np.array([(l.geometry.coords[0], l.geometry.coords[-1]) for l in line_list], dtype=np.float64)
+        p, r = coords[a, 0], coords[a, 1] - coords[a, 0]
+        q, s = coords[b, 0], coords[b, 1] - coords[b, 0]
+        denom = r[:, 0] * s[:, 1] - r[:, 1] * s[:, 0]
+        crossing = denom != 0
+        qp = q - p
+        t = np.zeros(len(a))
+        t[crossing] = (qp[crossing, 0] * s[crossing, 1] - qp[crossing, 1] * s[crossing, 0]) / denom[crossing]
+        points = p + t[:, None] * r
+
+        overlapping = np.flatnonzero(~crossing)
+        shared = {}
+        if len(overlapping):
+            inter = shapely.intersection(geometries[a[overlapping]], geometries[b[overlapping]])
+            for k, geometry in zip(overlapping, inter):
+                shared[k] = IntersectionSolver._points_of(geometry)
+
+        result = []
+        for k in range(len(a)):
+            if crossing[k]:
+                result.append((int(a[k]), int(b[k]), [tuple(points[k].tolist())]))
+            else:
+                result.append((int(a[k]), int(b[k]), shared[k]))
+        return result
+
+    @staticmethod
+    def _points_of(geometry):
+        if geometry.is_empty:
+            return []
+        if geometry.geom_type == "Point":
+            return [(geometry.x, geometry.y)]
+        if geometry.geom_type == "MultiPoint":
+            return [(pt.x, pt.y) for pt in geometry.geoms]
+        if geometry.geom_type == "LineString":
+            # Overlapping line segments: keep each coordinate as a separate intersection
+            return list(geometry.coords)
+        # other geometry types are not handled (Polygon, MultiLineString, etc.)
+        return []
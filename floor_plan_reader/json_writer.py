@@ -1,28 +1,104 @@
 import json
 import logging
+import os
+import tempfile
 import threading
+import time
+
+from floor_plan_reader.model import columnar_plan
+from floor_plan_reader.model.columnar_plan import ColumnarPlan
+
+# Mode open() would give a new file, mkstemp() creates its files 0600
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
 
 
 class JsonWriter:
-    def __init__(self):
-        pass
+    """
+    Writes floorplan dicts to disk.
+
+    Asynchronous saves go through one long-lived writer thread that keeps only the newest
+    pending payload per file, so a slow write is never queued behind stale ones. Files are
+    written compact to a temp file next to the target and renamed over it, readers never
+    see a partial file.
+    """
+
+    def __init__(self, sidecar=False):
+        # Also write the plan in the columnar format next to the JSON
+        self.sidecar = sidecar
+        self._pending = {}
+        self._busy = False
+        self._condition = threading.Condition()
+        self._thread = None
+        # Seconds spent on the last write, and the number of writes done
+        self.last_latency = None
+        self.write_count = 0
 
     def save_floorplan_json(self, filename, floorplan_dict):
         """
         Write the final floorplan dict to a JSON file.
         """
-        with open(filename, "w") as f:
-            json.dump(floorplan_dict, f, indent=2)
-        logging.info(f"JSON saved to {filename}")
+        start = time.perf_counter()
+        self._replace(filename, "w", lambda f: json.dump(floorplan_dict, f, separators=(",", ":")))
+        if self.sidecar:
+            self.save_floorplan_sidecar(os.path.splitext(filename)[0] + columnar_plan.SUFFIX, floorplan_dict)
+        self.last_latency = time.perf_counter() - start
+        self.write_count += 1
+        logging.info(f"JSON saved to {filename} in {self.last_latency * 1000:.1f} ms")
+
+    def save_floorplan_sidecar(self, directory, floorplan_dict):
+        """
+        Write the floorplan as a ColumnarPlan, which the generator memory maps instead of parsing JSON.
+        """
+        ColumnarPlan.from_floorplan_dict(floorplan_dict).save(directory)
+
+    def _replace(self, filename, mode, write):
+        directory = os.path.dirname(os.path.abspath(filename))
+        fd, tmp = tempfile.mkstemp(prefix=".tmp_", dir=directory)
+        try:
+            with os.fdopen(fd, mode) as f:
+                write(f)
+            os.chmod(tmp, FILE_MODE)
+            os.replace(tmp, filename)
+        except BaseException:
+            os.remove(tmp)
+            raise
 
     def save_floorplan_async(self, filename, data):
         """
-        Spawns a new thread to save the floorplan without blocking the main thread.
+        Hand the floorplan to the writer thread without blocking the caller.
+
+        A payload for the same file that is still waiting is replaced.
+        """
+        with self._condition:
+            self._pending[filename] = data
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def flush(self):
+        """
+        Block until every pending payload is on disk.
         """
-        thread = threading.Thread(target=self.save_floorplan_json,
-                                  args=(filename, data),
-                                  daemon=True)
-        thread.start()
+        with self._condition:
+            self._condition.wait_for(lambda: not self._pending and not self._busy)
+
+    def _work(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending)
+                filename, data = self._pending.popitem()
+                self._busy = True
+            try:
+                self.save_floorplan_json(filename, data)
+            except Exception:
+                logging.exception(f"could not save {filename}")
+            finally:
+                with self._condition:
+                    self._busy = False
+                    self._condition.notify_all()
 
     def build_floorplan_json(self, result_info, walls, furnitures=None):
         """
@@ -1,3 +1,6 @@
+from floor_plan_reader.math.snap_index import SnapIndex
+
+
 class LineToGraph:
     ############################################################
     # STEP 3A: Generate Graph & JSON
@@ -8,17 +11,22 @@ class LineToGraph:
         We'll label each unique (x, y) as a node. We'll guess 'exterior' if width >= 10, else 'interior'.
         We'll store them in the requested format.
         """
-        nodes_dict = {}
+        # Points closer than the old 3 decimal rounding share a node
+        nodes_index = SnapIndex(1e-3)
         node_list = []
 
         def register_point(px, py):
-            # Round to e.g. 3 decimals
             # Create new ID if we haven't encountered it
-            key = (round(px, 3), round(py, 3))
-            if key not in nodes_dict:
-                nid = f"N{len(nodes_dict)+1}"
-                nodes_dict[key] = nid
-            return nodes_dict[key]
+            def create():
+                nid = f"N{len(node_list) + 1}"
+                node_list.append({
+                    "id": nid,
+                    "x": round(px, 3),
+                    "y": round(py, 3)
+                })
+                return nid
+
+            return nodes_index.find_or_add(px, py, create)
 
         edges_list = []
         for i, wall in enumerate(walls, start=1):
@@ -46,20 +54,6 @@ class LineToGraph:
                 "openings": []
             })
 
-        # build node_list
-        for (x, y), nid in nodes_dict.items():
-            node_list.append({
-                "id": nid,
-                "x": x,
-                "y": y
-            })
-
-        # sort nodes by numeric part of ID
-        def node_sort_key(item):
-            return int(item["id"].strip("N"))
-
-        node_list.sort(key=node_sort_key)
-
         graph = {
             "nodes": node_list,
             "edges": edges_list
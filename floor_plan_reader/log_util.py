@@ -0,0 +1,47 @@
+import logging
+import sys
+
+
+class Log:
+    """
+    Logger for hot paths, one per module: `log = Log(__name__)`.
+
+    Messages are %-style with their arguments passed separately, so nothing is formatted
+    unless the level is enabled; the level check is the logger's own isEnabledFor(), which
+    the logging module caches per logger until a level changes. `every=N` keeps one call in
+    N per call site, for messages raised per cell or per tick. Work done only to build a
+    message belongs under is_enabled().
+    """
+
+    def __init__(self, name):
+        self.logger = logging.getLogger(name)
+        # (code, line) of a sampled call site -> calls so far
+        self.calls = {}
+
+    def is_enabled(self, level=logging.DEBUG):
+        return self.logger.isEnabledFor(level)
+
+    def debug(self, msg, *args, every=1):
+        self._log(logging.DEBUG, msg, args, every)
+
+    def info(self, msg, *args, every=1):
+        self._log(logging.INFO, msg, args, every)
+
+    def warning(self, msg, *args, every=1):
+        self._log(logging.WARNING, msg, args, every)
+
+    def error(self, msg, *args, every=1):
+        self._log(logging.ERROR, msg, args, every)
+
+    def _log(self, level, msg, args, every):
+        if not self.logger.isEnabledFor(level):
+            return
+        if every > 1:
+            caller = sys._getframe(2)
+            site = (caller.f_code, caller.f_lineno)
+            calls = self.calls.get(site, 0)
+            self.calls[site] = calls + 1
+            if calls % every:
+                return
+        # Attribute the record to the caller of debug()/info()/..., not to this module
+        self.logger.log(level, msg, *args, stacklevel=3)
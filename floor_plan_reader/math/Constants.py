@@ -3,6 +3,12 @@ from math import sqrt
 from floor_plan_reader.math.vector import Vector
 
 
+def _unit_tuple(v):
+    # Same floats Vector.normalize() yields: the diagonals are divided by hypot(1, 1)
+    length = sqrt(v[0] * v[0] + v[1] * v[1])
+    return v[0] / length, v[1] / length
+
+
 class Constants:
     SQRT2_OVER_2 = sqrt(2) / 2
     raw_directions = {
@@ -16,18 +22,24 @@ class Constants:
         315: (1, -1),
     }
 
-    DIRECTIONS_8 = {angle: Vector(v).normalize() for angle, v in raw_directions.items()}
+    # Unit directions as plain floats, computed once at import
+    DIRECTION_TUPLES_8 = {angle: _unit_tuple(v) for angle, v in raw_directions.items()}
 
+    DIRECTIONS_8 = {angle: Vector(v) for angle, v in DIRECTION_TUPLES_8.items()}
 
-    # Reverse mapping: normalized vector (as tuple) -> angle
-    VECTOR_TO_ANGLE = {
-        (round(v.dx(), 6), round(v.dy(), 6)): angle
-        for angle, v in DIRECTIONS_8.items()
+    # Reverse mapping: exact unit tuple -> angle
+    VECTOR_TO_ANGLE = {v: angle for angle, v in DIRECTION_TUPLES_8.items()}
+
+    # Rounded mapping, only used for vectors that are not one of the 8 exact directions
+    ROUNDED_VECTOR_TO_ANGLE = {
+        (round(v[0], 6), round(v[1], 6)): angle
+        for angle, v in DIRECTION_TUPLES_8.items()
     }
 
     @staticmethod
     def get_key(vector):
         return (round(vector.dx(), 6), round(vector.dy(), 6))
+
     @staticmethod
     def angle_to_vector(angle):
         """Convert angle (0, 45, ..., 315) to normalized Vector."""
@@ -36,5 +48,19 @@ class Constants:
     @staticmethod
     def vector_to_angle(vector):
         """Convert normalized Vector to closest matching angle."""
-        key = Constants.get_key(vector)
-        return Constants.VECTOR_TO_ANGLE.get(key, None)
\ No newline at end of file
+        angle = Constants.VECTOR_TO_ANGLE.get(vector.direction)
+        if angle is None:
+            angle = Constants.ROUNDED_VECTOR_TO_ANGLE.get(Constants.get_key(vector))
+        return angle
+
+
+def _link_directions():
+    # Normal and opposite of each direction are themselves in the table: share the instances
+    directions = Constants.DIRECTIONS_8
+    for angle, v in directions.items():
+        v.normalize()
+        Vector._normal.__set__(v, directions[(angle + 90) % 360])
+        Vector._opposite.__set__(v, directions[(angle + 180) % 360])
+
+
+_link_directions()
@@ -1,8 +1,10 @@
-import logging
-
 import pygame
 from shapely import Polygon, LineString
 
+from floor_plan_reader.log_util import Log
+
+log = Log(__name__)
+
 
 class BoundingBox:
     def __init__(self, min_x, min_y, max_x, max_y):
@@ -43,9 +45,8 @@ class BoundingBox:
         return self.rect
 
     def collidepoint(self, x, y):
-        rect = self.getRect()
-        # Use Pygame's built-in collision check
-        return rect.collidepoint(x, y)
+        # Same half-open test as pygame.Rect.collidepoint, without building a Rect
+        return self.min_x <= x < self.max_x and self.min_y <= y < self.max_y
 
     def collide_line(self, x1, y1, x2, y2):
         # A rectangle can be represented as a polygon
@@ -53,9 +54,9 @@ class BoundingBox:
         line = LineString([(x1, y1), (x2, y2)])
         # Check intersection
         if self.get_poly().intersects(line):
-            logging.debug("Line intersects the rectangle!")
+            log.debug("Line intersects the rectangle!")
         else:
-            logging.debug("No intersection.")
+            log.debug("No intersection.")
 
     def get_center(self):
         x = (self.min_x + self.max_x) / 2
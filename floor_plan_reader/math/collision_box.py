@@ -1,28 +1,90 @@
-import logging
 import math
 from decimal import Decimal
+from functools import lru_cache
 
 from shapely import Polygon, LineString, Point
 
+from floor_plan_reader.log_util import Log
 from floor_plan_reader.math.Constants import Constants
-from floor_plan_reader.math.math_segments import combine_segments_decimal
+from floor_plan_reader.math.collision_box_array import CollisionBoxArray, CENTER_X, CENTER_Y, HALF_WIDTH, \
+    HALF_LENGTH, ROTATION, corners_from_row, direction_for, parallel_overlap, quad_contains, quad_orientation
+from floor_plan_reader.math.math_segments import combine_segments, fold_merge_corners, merge_corners
 from floor_plan_reader.math.vector import Vector
 
+log = Log(__name__)
+
+
+@lru_cache(maxsize=None)
+def _direction_vector(rotation):
+    return Vector(direction_for(rotation))
+
+
+# Geometry attributes of a CollisionBox and how assigned values are converted
+_GEOMETRY = {"center_x": None, "center_y": None, "width": float, "length": float, "rotation": int}
+# Values derived from the geometry, dropped whenever it changes
+_DERIVED = {"corners": None, "center_line": None, "points_forward": None, "points_backward": None, "polygon": None}
+
 
 class CollisionBox:
+    """
+    Oriented box used by agents. A standalone box keeps its geometry in plain attributes;
+    once bound to a row of a CollisionBoxArray (see attach() and view()) it reads and
+    writes that row instead, so batch queries on the array see it without copying.
+    """
+
     def __init__(self, center_x, center_y, width, length, rotation):
-        self.center_x = center_x
-        self.center_y = center_y
-        self.width = float(width)
-        self.length = float(length)
-        self.rotation = int(rotation)
-        self.default_direction = (1, 0)
-        self.corners = None
+        # Straight into __dict__: nothing is cached yet, see __setattr__
+        attributes = self.__dict__
+        attributes["center_x"] = center_x
+        attributes["center_y"] = center_y
+        attributes["width"] = float(width)
+        attributes["length"] = float(length)
+        attributes["rotation"] = int(rotation)
+        attributes["default_direction"] = (1, 0)
+        attributes["_direction"] = None
+        attributes["_store"] = None
+        attributes["_index"] = None
+        attributes.update(_DERIVED)
+
+    def __setattr__(self, name, value):
+        if name not in _GEOMETRY:
+            self.__dict__[name] = value
+            return
+        convert = _GEOMETRY[name]
+        attributes = self.__dict__
+        attributes[name] = value if convert is None else convert(value)
+        attributes.update(_DERIVED)
+        if name == "rotation":
+            attributes["_direction"] = None
+
+    @classmethod
+    def from_store(cls, store, index):
+        box = cls(0, 0, 0, 0, 0)
+        box.bind(store, index)
+        return box
+
+    def bind(self, store, index):
+        """
+        Re-point this box to a row of `store` (used by CollisionBoxArray.attach and view).
+        """
+        for name in _GEOMETRY:
+            self.__dict__.pop(name, None)
+        object.__setattr__(self, "__class__", _RowCollisionBox)
+        self._store = store
+        self._index = index
         self._direction = None
-        self.center_line = None
-        self.points_forward = None
-        self.points_backward = None
-        self.polygon = None
+        self.reset_cache()
+
+    @property
+    def store(self):
+        return self._store
+
+    @property
+    def index(self):
+        return self._index
+
+    def __deepcopy__(self, memo):
+        return self.copy()
 
     def __eq__(self, other):
         if not isinstance(other, CollisionBox):
@@ -34,25 +96,16 @@ class CollisionBox:
         return hash((self.center_x, self.center_y, self.width, self.length, self.rotation))
 
     def set_width(self, width):
-        self.width = float(width)
-        self.reset_cache()
+        self.width = width
 
     def set_length(self, length):
-        self.length = float(length)
-        self.reset_cache()
+        self.length = length
 
     def copy(self):
         """
         Return a new CollisionBox that is a copy of this one.
         """
-        new_box = CollisionBox(
-            center_x=self.center_x,
-            center_y=self.center_y,
-            width=self.width,
-            length=self.length,
-            rotation=self.rotation
-        )
-        return new_box
+        return CollisionBox(self.center_x, self.center_y, self.width, self.length, self.rotation)
 
     def get_area(self):
         return self.width * self.length
@@ -60,9 +113,8 @@ class CollisionBox:
     def get_direction(self):
         if self._direction is None:
             angle_deg = round(self.rotation / 45.0) * 45 % 360
-            direction = Constants.DIRECTIONS_8.get(angle_deg)
-            self._direction = direction.normalize()
-        return self._direction.copy()
+            self._direction = Constants.DIRECTIONS_8.get(angle_deg)
+        return self._direction
 
     def get_vector(self):
         dir = self.get_direction()
@@ -85,13 +137,21 @@ class CollisionBox:
         return self.polygon
 
     def is_point_inside(self, x, y):
-        poly = self.get_polygon()
-        minx, miny, maxx, maxy = poly.bounds
-        if x < minx or x > maxx or y < miny or y > maxy:
+        corners = self.calculate_corners()
+        xs = [c[0] for c in corners]
+        ys = [c[1] for c in corners]
+        if x < min(xs) or x > max(xs) or y < min(ys) or y > max(ys):
             return False
-        point = Point(x, y)
-        poly = self.get_polygon()
-        return poly.contains(point)
+        orientation = quad_orientation(corners)
+        if orientation is None:
+            return self.get_polygon().contains(Point(x, y))
+        return quad_contains(corners, orientation, x, y)
+
+    def points_inside(self, points):
+        """
+        Vectorized is_point_inside over an (N, 2) sequence of points, returns a boolean array.
+        """
+        return CollisionBoxArray.from_boxes([self]).contains_points(points, [0], include_boundary=False)[0]
 
     def line_equation(self, p1, p2, tol=1e-9):
         """
@@ -242,10 +302,8 @@ class CollisionBox:
         return left_side_points, right_side_points
 
     def derive_direction_and_normal(self):
-        angle_rad = math.radians(self.rotation)
-
-        # Direction vector (rotated from default direction (1,0))
-        direction = Vector((math.cos(angle_rad), math.sin(angle_rad)))
+        # Direction vector (rotated from default direction (1,0)), shared per rotation
+        direction = _direction_vector(self.rotation)
 
         # Normal vector (rotated 90 degrees from direction)
         normal = direction.get_normal()
@@ -287,19 +345,16 @@ class CollisionBox:
         return points
 
     def move_forward(self, length):
-        dir_ = self.get_direction()
-        dir_.scale(length)
+        dir_ = self.get_direction().scale(length)
         self.move(dir_)
 
     def move_backward(self, length):
-        dir_ = self.get_direction().opposite()
-        dir_.scale(length)
+        dir_ = self.get_direction().opposite().scale(length)
         self.move(dir_)
 
     def move(self, dir_):
-        c = self.get_center_as_vector()
-        new_c = c + dir_
-        self.set_position(new_c.dx(), new_c.dy())
+        x, y = Vector.add_t(self.get_center(), dir_.direction)
+        self.set_position(x, y)
 
     @staticmethod
     def create_from_line(line, width):
@@ -360,16 +415,13 @@ class CollisionBox:
         return self.points_forward, self.points_backward
 
     def set_position(self, x, y):
-        self.center_x = x
-        self.center_y = y
-        self.reset_cache()
+        attributes = self.__dict__
+        attributes["center_x"] = x
+        attributes["center_y"] = y
+        attributes.update(_DERIVED)
 
     def reset_cache(self):
-        self.corners = None
-        self.points_forward = None
-        self.points_backward = None
-        self.polygon = None
-        self.center_line = None
+        self.__dict__.update(_DERIVED)
 
     def calculate_overlap_ratio(self, other):
         overlap = self.calculate_overlap(other)
@@ -381,6 +433,11 @@ class CollisionBox:
         corners_self = self.calculate_corners()
         corners_other = other.calculate_corners()
 
+        if self.is_parallel_to(other):
+            overlap = parallel_overlap(corners_self, corners_other, direction_for(self.rotation))
+            if overlap is not None:
+                return overlap
+
         # Create Polygon objects for both boxes
         polygon_self = Polygon(corners_self)
         polygon_other = Polygon(corners_other)
@@ -394,51 +451,11 @@ class CollisionBox:
         return intersection.area
 
     def calculate_corners(self):
-        if self.corners is not None:
-            return self.corners
         """Get OBB corner points in world coordinates"""
-        half_length = self.length / 2 - .5
-        half_width = self.width / 2 - .5
-        direction, normal = self.derive_direction_and_normal()
-
-        back = direction.opposite()
-        back.scale(half_length)
-        front = direction.copy()
-        front.scale(half_length)
-        left = normal.copy()
-        left.scale(half_width)
-        position = Vector((self.center_x, self.center_y))
-        to_left = position + left + back
-        top_right = position - left + back
-        bottom_left = position + front + left
-        bottom_right = position + front - left
-
-        # Calculate corners without offsets
-        top_left = (
-            to_left.direction[0],
-            to_left.direction[1]  # Y-down adjustment
-        )
-        bottom_right = (
-            bottom_right.direction[0],
-            bottom_right.direction[1]  # Y-down adjustment
-        )
-
-        # Other corners for completeness
-        top_right = (
-            top_right.direction[0],
-            top_right.direction[1]  # Y-down adjustment
-        )
-        bottom_left = (
-            bottom_left.direction[0],
-            bottom_left.direction[1]  # Y-down adjustment
-        )
-
-        # Order: [top-left, bottom-left, top-right, bottom-right]
-        corners = [top_left, top_right, bottom_right, bottom_left]
-
-        # Apply pixel alignment (rounding) once at the end
-        self.corners = [(int(round(x)), int(round(y))) for x, y in corners]
-
+        if self.corners is None:
+            # Order: [top-left, top-right, bottom-right, bottom-left], pixel aligned
+            self.corners = corners_from_row(self.center_x, self.center_y, self.length / 2.0, self.width / 2.0,
+                                            self.rotation)
         return self.corners
 
     def iterate_covered_pixels(self):
@@ -481,7 +498,7 @@ class CollisionBox:
         return self.get_center(), self.get_direction(), self.length
 
     def merge_aligned2(self, other):
-        new_cx, new_cy, dirx, diry, new_length = combine_segments_decimal(
+        new_cx, new_cy, dirx, diry, new_length = combine_segments(
             self, other)
         merged_box = CollisionBox(
             center_x=float(new_cx),
@@ -498,69 +515,58 @@ class CollisionBox:
         a larger bounding box that encloses them both.
 
         Returns:
-            CollisionBox: A new box encompassing both.
-        Raises:
-            ValueError: If boxes are not parallel (cannot be merged this way).
+            CollisionBox: A new box encompassing both, or False if the boxes are not parallel.
         """
-        rounder = lambda val: round(val, decimal_precision)
-        # 1) Check parallel (same rotation or differs by 180)
-        if not self.is_parallel_to(other):
-            return False
-            # raise ValueError("Boxes are not aligned (not parallel) and cannot be merged.")
+        return CollisionBox.merge_all_aligned([self, other])
 
-        # 2) Get this box's direction and normal (they're valid for both if parallel)
-        direction, normal = self.derive_direction_and_normal()
-        direction = self.to_decimal(direction.direction)
-        normal = self.to_decimal(normal.direction)
+    @staticmethod
+    def merge_all_aligned(boxes):
+        """
+        Merge parallel boxes into the smallest box along the first box's axes that
+        encloses the corners of all of them, projecting every corner in one pass.
 
-        # 3) Gather corners from both boxes
-        corners_self = self.calculate_corners()
-        corners_other = other.calculate_corners()
-        all_corners = corners_self + corners_other
-
-        def dot(px, py, qx, qy):
-            """Dot product of 2D vectors (px, py) · (qx, qy)."""
-            return px * qx + py * qy
-
-        # 4) Project corners onto direction and normal to find combined min/max
-        dir_values = []
-        norm_values = []
-
-        for (cx, cy) in all_corners:
-            dir_val = dot(cx, cy, direction[0], direction[1])
-            norm_val = dot(cx, cy, normal[0], normal[1])
-            dir_values.append(dir_val)
-            norm_values.append(norm_val)
-
-        min_dir, max_dir = min(dir_values), max(dir_values)
-        min_norm, max_norm = min(norm_values), max(norm_values)
-        min_dir = Decimal(min_dir)
-        max_dir = Decimal(max_dir)
-        min_norm = Decimal(min_norm)
-        max_norm = Decimal(max_norm)
-        # 5) The new box length/width spans from min->max along direction/normal
-        new_length = max_dir - min_dir
-        new_width = max_norm - min_norm
-        half = Decimal(0.5)
-        # 6) Compute the center by taking midpoint in direction & normal space
-        center_dir = half * (min_dir + max_dir)
-        center_norm = half * (min_norm + max_norm)
-
-        # 7) Convert that (center_dir, center_norm) back to world coordinates
-        #    using direction and normal as a 2D basis
-
-        center_x = center_dir * direction[0] + center_norm * normal[0]
-        center_y = center_dir * direction[1] + center_norm * normal[1]
-
-        # 8) Create a new bounding box
-        merged_box = CollisionBox(
-            center_x=float(center_x),
-            center_y=float(center_y),
-            width=float(new_width),
-            length=float(new_length),
-            rotation=self.rotation  # same as 'other' since they are parallel
+        Returns:
+            CollisionBox: the merged box, or False if any box is not parallel to the first.
+        """
+        first = boxes[0]
+        for b in boxes[1:]:
+            if not first.is_parallel_to(b):
+                return False
+        direction, normal = first.derive_direction_and_normal()
+        corners = [c for b in boxes for c in b.calculate_corners()]
+        center_x, center_y, width, length = merge_corners(corners, direction.direction, normal.direction)
+        return CollisionBox(
+            center_x=center_x,
+            center_y=center_y,
+            width=width,
+            length=length,
+            rotation=first.rotation
+        )
+
+    @staticmethod
+    def fold_aligned(boxes):
+        """
+        The box merge_aligned gives when merging `boxes` one after the other, without building
+        the boxes in between (see math_segments.fold_merge_corners).
+
+        Returns:
+            CollisionBox: the merged box, or False if any box is not parallel to the first.
+        """
+        first = boxes[0]
+        for b in boxes[1:]:
+            if not first.is_parallel_to(b):
+                return False
+        direction, normal = first.derive_direction_and_normal()
+        corners = [b.calculate_corners() for b in boxes[1:]]
+        center_x, center_y, width, length = fold_merge_corners(first.calculate_corners(), corners, direction.direction,
+                                                               normal.direction, first.rotation)
+        return CollisionBox(
+            center_x=center_x,
+            center_y=center_y,
+            width=width,
+            length=length,
+            rotation=first.rotation
         )
-        return merged_box
 
     def calculate_rotation_from_direction(self, dx, dy):
         angle_rad = math.atan2(dy, dx)
@@ -580,5 +586,74 @@ class CollisionBox:
     def distance_from_center_line(self, point):
         line = self.get_center_line_string()
         p = Point(point.x, point.y)
-        logging.debug(f"{p.x}")
+        log.debug("%s", p.x, every=100)
         return p.distance(line)
+
+
+class _RowCollisionBox(CollisionBox):
+    """
+    CollisionBox bound to one row of a CollisionBoxArray: the geometry is read from and
+    written to that row, so batch queries on the array always see the current box.
+    """
+
+    __setattr__ = object.__setattr__
+
+    @property
+    def center_x(self):
+        return self._store.get(self._index, CENTER_X)
+
+    @center_x.setter
+    def center_x(self, value):
+        self._store.set(self._index, CENTER_X, value)
+        self.reset_cache()
+
+    @property
+    def center_y(self):
+        return self._store.get(self._index, CENTER_Y)
+
+    @center_y.setter
+    def center_y(self, value):
+        self._store.set(self._index, CENTER_Y, value)
+        self.reset_cache()
+
+    @property
+    def width(self):
+        return 2.0 * self._store.get(self._index, HALF_WIDTH)
+
+    @width.setter
+    def width(self, value):
+        self._store.set(self._index, HALF_WIDTH, float(value) / 2.0)
+        self.reset_cache()
+
+    @property
+    def length(self):
+        return 2.0 * self._store.get(self._index, HALF_LENGTH)
+
+    @length.setter
+    def length(self, value):
+        self._store.set(self._index, HALF_LENGTH, float(value) / 2.0)
+        self.reset_cache()
+
+    @property
+    def rotation(self):
+        return int(self._store.get(self._index, ROTATION))
+
+    @rotation.setter
+    def rotation(self, value):
+        self._store.set(self._index, ROTATION, int(value))
+        self._direction = None
+        self.reset_cache()
+
+    def set_position(self, x, y):
+        self._store.set(self._index, CENTER_X, x)
+        self._store.set(self._index, CENTER_Y, y)
+        self.reset_cache()
+
+    def points_inside(self, points):
+        return self._store.contains_points(points, [self._index], include_boundary=False)[0]
+
+    def calculate_corners(self):
+        if self.corners is None:
+            cx, cy, half_length, half_width, rotation = self._store.get_row(self._index)
+            self.corners = corners_from_row(cx, cy, half_length, half_width, rotation)
+        return self.corners
@@ -0,0 +1,38 @@
+import numpy as np
+
+
+def merge_intervals(starts, ends, tolerance=0.0):
+    """
+    Merge 1D intervals [start, end] that overlap or are at most `tolerance` apart.
+
+    Args:
+        starts, ends: sequences of equal length, start <= end for each interval.
+        tolerance: largest gap that is still bridged.
+
+    Returns:
+        (starts, ends) arrays of the merged intervals, sorted by start.
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    if len(starts) == 0:
+        return starts, ends
+    order = np.argsort(starts, kind="stable")
+    starts = starts[order]
+    ends = np.maximum.accumulate(ends[order])
+    # A new group starts wherever an interval begins past everything before it
+    breaks = np.flatnonzero(starts[1:] > ends[:-1] + tolerance) + 1
+    first = np.concatenate(([0], breaks))
+    last = np.concatenate((breaks - 1, [len(starts) - 1]))
+    return starts[first], ends[last]
+
+
+def gaps_between(starts, ends):
+    """
+    Gaps between merged, sorted intervals.
+
+    Returns:
+        (starts, ends) arrays of the uncovered ranges between consecutive intervals.
+    """
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+    return ends[:-1], starts[1:]
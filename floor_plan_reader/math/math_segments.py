@@ -1,5 +1,16 @@
+import math
 from decimal import Decimal
 
+import numpy as np
+
+from floor_plan_reader.math.collision_box_array import corners_from_row
+
+# The float helpers below agree with their Decimal counterparts to within MERGE_EPSILON
+# pixels. Inputs are doubles either way (Decimal(float) is exact), so the float path only
+# differs by the rounding of a few products and sums of coordinates below ~1e4 px, which
+# stays many orders of magnitude under this bound.
+MERGE_EPSILON = 1e-6
+
 
 def decimal_dot(ax, ay, bx, by):
     """
@@ -109,4 +120,149 @@ def combine_segments_decimal(a,
     new_cx = mid_1d * dirx
     new_cy = mid_1d * diry
 
-    return (new_cx, new_cy, dirx, diry, new_length)
\ No newline at end of file
+    return (new_cx, new_cy, dirx, diry, new_length)
+
+
+def combine_segments(a, b, eps=1e-9):
+    """
+    Float version of combine_segments_decimal, same steps and same return layout.
+    """
+    a_c, a_d, a_l = a.get_definition()
+    b_c, b_d, b_l = b.get_definition()
+    cx1, cy1 = a_c
+    cx2, cy2 = b_c
+    dx1, dy1 = a_d[0], a_d[1]
+    dx2, dy2 = b_d[0], b_d[1]
+
+    if abs(dx1 * dy2 - dy1 * dx2) > eps:
+        raise ValueError("Segments not parallel => cannot combine on the same axis.")
+
+    mag1 = math.hypot(dx1, dy1)
+    if mag1 < eps:
+        raise ValueError("Degenerate direction for first segment.")
+    dirx = dx1 / mag1
+    diry = dy1 / mag1
+
+    # Projections of the start/end points onto dir
+    c1 = cx1 * dirx + cy1 * diry
+    c2 = cx2 * dirx + cy2 * diry
+    min_s = min(c1 - a_l / 2, c2 - b_l / 2)
+    max_e = max(c1 + a_l / 2, c2 + b_l / 2)
+
+    new_length = max_e - min_s
+    if new_length < 0:
+        raise ValueError("Calculated negative length => segments must not overlap or data invalid.")
+
+    mid_1d = (min_s + max_e) / 2
+    return mid_1d * dirx, mid_1d * diry, dirx, diry, new_length
+
+
+def merge_corners(corners, direction, normal):
+    """
+    Smallest box along (direction, normal) enclosing all corners, in one NumPy pass.
+
+    Args:
+        corners: (N, 2) corner points of every box being merged.
+        direction, normal: unit axes of the merged box as (x, y) tuples.
+
+    Returns:
+        (center_x, center_y, width, length) as floats.
+    """
+    corners = np.asarray(corners, dtype=np.float64).reshape(-1, 2)
+    (dx, dy), (nx, ny) = direction, normal
+    # Element-wise rather than a matrix product, so every projection rounds like x * dx + y * dy
+    along = corners[:, 0] * dx + corners[:, 1] * dy
+    across = corners[:, 0] * nx + corners[:, 1] * ny
+    return _box_from_extent(float(along.min()), float(along.max()), float(across.min()), float(across.max()),
+                            direction, normal)
+
+
+def _box_from_extent(min_dir, max_dir, min_norm, max_norm, direction, normal):
+    center_dir = 0.5 * (min_dir + max_dir)
+    center_norm = 0.5 * (min_norm + max_norm)
+    (dx, dy), (nx, ny) = direction, normal
+    return center_dir * dx + center_norm * nx, center_dir * dy + center_norm * ny, max_norm - min_norm, max_dir - min_dir
+
+
+def fold_merge_corners(first, corners, direction, normal, rotation):
+    """
+    merge_corners folded pairwise, as merging one box after the other into a running box does:
+    the running box's corners are pixel aligned again (corners_from_row) before every step.
+
+    Args:
+        first: (4, 2) corners of the first box.
+        corners: (N, 4, 2) corners of the boxes merged into it, in order.
+        direction, normal: unit axes of the merged box as (x, y) tuples.
+        rotation: rotation of the merged box.
+
+    Returns:
+        (center_x, center_y, width, length) as floats.
+    """
+    corners = np.asarray(corners, dtype=np.float64).reshape(-1, 4, 2)
+    (dx, dy), (nx, ny) = direction, normal
+    # The boxes' own extents do not depend on the running box: one pass for all of them
+    along = corners[:, :, 0] * dx + corners[:, :, 1] * dy
+    across = corners[:, :, 0] * nx + corners[:, :, 1] * ny
+    extents = zip(along.min(axis=1).tolist(), along.max(axis=1).tolist(),
+                  across.min(axis=1).tolist(), across.max(axis=1).tolist())
+    running = first
+    box = None
+    for min_dir, max_dir, min_norm, max_norm in extents:
+        if box is not None:
+            center_x, center_y, width, length = box
+            running = corners_from_row(center_x, center_y, length / 2.0, width / 2.0, rotation)
+        for x, y in running:
+            d = x * dx + y * dy
+            n = x * nx + y * ny
+            min_dir, max_dir = min(min_dir, d), max(max_dir, d)
+            min_norm, max_norm = min(min_norm, n), max(max_norm, n)
+        box = _box_from_extent(min_dir, max_dir, min_norm, max_norm, direction, normal)
+    return box
+
+
+def merge_corners_decimal(corners, direction, normal):
+    """
+    Decimal reference for merge_corners (the arithmetic CollisionBox.merge_aligned used to do).
+    """
+    dx, dy = Decimal(direction[0]), Decimal(direction[1])
+    nx, ny = Decimal(normal[0]), Decimal(normal[1])
+    dir_values = [decimal_dot(Decimal(x), Decimal(y), dx, dy) for x, y in corners]
+    norm_values = [decimal_dot(Decimal(x), Decimal(y), nx, ny) for x, y in corners]
+    min_dir, max_dir = min(dir_values), max(dir_values)
+    min_norm, max_norm = min(norm_values), max(norm_values)
+    half = Decimal(0.5)
+    center_dir = half * (min_dir + max_dir)
+    center_norm = half * (min_norm + max_norm)
+    center_x = center_dir * dx + center_norm * nx
+    center_y = center_dir * dy + center_norm * ny
+    return float(center_x), float(center_y), float(max_norm - min_norm), float(max_dir - min_dir)
+
+
+def snap_to_axis(centers, direction, normal, anchor):
+    """
+    Move every center onto the line through `anchor` along `direction`, keeping its
+    position along the direction.
+
+    Returns:
+        (N, 2) array of new centers.
+    """
+    centers = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    direction = np.asarray(direction, dtype=np.float64)
+    normal = np.asarray(normal, dtype=np.float64)
+    along = centers @ direction
+    offset = float(np.dot(np.asarray(anchor, dtype=np.float64), normal))
+    return along[:, None] * direction + offset * normal
+
+
+def snap_to_axis_decimal(centers, direction, normal, anchor):
+    """
+    Decimal reference for snap_to_axis (the arithmetic WallSegment.normalize used to do).
+    """
+    dx, dy = Decimal(direction[0]), Decimal(direction[1])
+    nx, ny = Decimal(normal[0]), Decimal(normal[1])
+    offset = decimal_dot(Decimal(float(anchor[0])), Decimal(float(anchor[1])), nx, ny)
+    result = []
+    for x, y in centers:
+        along = decimal_dot(Decimal(float(x)), Decimal(float(y)), dx, dy)
+        result.append((float(along * dx + offset * nx), float(along * dy + offset * ny)))
+    return result
@@ -0,0 +1,112 @@
+import heapq
+import math
+from itertools import count
+
+
+class SnapIndex:
+    """
+    Grid hash of 2D points for snapping and nearest neighbour queries.
+
+    Buckets are `tolerance` wide, so every point within tolerance of a query sits in the
+    query's bucket or one of its 8 neighbours: find() and find_or_add() look at 9 buckets,
+    O(1) on average. nearest() searches rings of buckets outwards.
+    """
+
+    def __init__(self, tolerance):
+        if tolerance <= 0:
+            raise ValueError("tolerance must be positive")
+        self.tolerance = tolerance
+        # (column, row) -> [(x, y, sequence, value)]
+        self._buckets = {}
+        self._seq = count()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _bucket(self, x, y):
+        return math.floor(x / self.tolerance), math.floor(y / self.tolerance)
+
+    def _ring(self, bx, by, r):
+        """Buckets at Chebyshev distance r from (bx, by)."""
+        if r == 0:
+            yield bx, by
+            return
+        for i in range(-r, r + 1):
+            yield bx + i, by - r
+            yield bx + i, by + r
+        for j in range(-r + 1, r):
+            yield bx - r, by + j
+            yield bx + r, by + j
+
+    def add(self, x, y, value):
+        self._buckets.setdefault(self._bucket(x, y), []).append((x, y, next(self._seq), value))
+        self._size += 1
+        return value
+
+    def remove(self, x, y, value):
+        key = self._bucket(x, y)
+        entries = self._buckets.get(key, [])
+        for i, entry in enumerate(entries):
+            if entry[3] is value:
+                del entries[i]
+                self._size -= 1
+                if not entries:
+                    del self._buckets[key]
+                return True
+        return False
+
+    def find(self, x, y):
+        """
+        The value stored closest to (x, y) among those less than `tolerance` away on both axes, or None.
+        """
+        bx, by = self._bucket(x, y)
+        best = None
+        for i in (-1, 0, 1):
+            for j in (-1, 0, 1):
+                for px, py, seq, value in self._buckets.get((bx + i, by + j), ()):
+                    dx, dy = abs(px - x), abs(py - y)
+                    if dx < self.tolerance and dy < self.tolerance:
+                        candidate = (dx * dx + dy * dy, seq, value)
+                        if best is None or candidate[:2] < best[:2]:
+                            best = candidate
+        return None if best is None else best[2]
+
+    def find_or_add(self, x, y, create):
+        """
+        The value snapped to (x, y), or `create()` stored at (x, y) when there is none.
+        """
+        value = self.find(x, y)
+        if value is None:
+            value = self.add(x, y, create())
+        return value
+
+    def nearest(self, x, y, k=1):
+        """
+        The k stored values closest to (x, y), closest first, ties in insertion order.
+
+        Returns:
+            list of (distance, value).
+        """
+        if k <= 0 or self._size == 0:
+            return []
+        k = min(k, self._size)
+        bx, by = self._bucket(x, y)
+        found = []
+        seen = 0
+        r = 0
+        while seen < self._size:
+            if 8 * r > len(self._buckets):
+                # Rings now hold more empty buckets than there are filled ones: scan those instead
+                found = [(math.hypot(px - x, py - y), seq, value)
+                         for entries in self._buckets.values() for px, py, seq, value in entries]
+                break
+            for key in self._ring(bx, by, r):
+                for px, py, seq, value in self._buckets.get(key, ()):
+                    found.append((math.hypot(px - x, py - y), seq, value))
+                    seen += 1
+            # Points outside the rings searched so far are at least r buckets away
+            if len(found) >= k and heapq.nsmallest(k, found)[-1][0] <= r * self.tolerance:
+                break
+            r += 1
+        return [(d, value) for d, _, value in heapq.nsmallest(k, found)]
@@ -0,0 +1,215 @@
+import numpy as np
+
+_EPSILON = 1e-9
+
+
+class TiledSummedArea:
+    """
+    Summed-area table (integral image) of a 0/1 layer, kept up to date tile by tile.
+
+    Every tile holds its own local integral image. On top of those sit the prefix sums of
+    the tiles' bottom rows down each tile column, of their right columns along each tile
+    row and of the tile totals, so the sum over any rectangle is read from four corner
+    prefixes in O(1). Writes only mark their tile dirty. The next query rebuilds the dirty
+    tiles from `cells` and adds the change of their edges to the prefix sums after them.
+    """
+
+    def __init__(self, shape, cells, tile=64):
+        """
+        Args:
+            shape: (height, width) of the layer.
+            cells: cells(y0, y1, x0, x1) returns the layer values of that window as an array.
+            tile: edge length of a tile in cells.
+        """
+        self.height, self.width = shape
+        self.cells = cells
+        self.tile = tile
+        self.tiles_y = max(1, -(-self.height // tile))
+        self.tiles_x = max(1, -(-self.width // tile))
+        self.local = np.zeros((self.tiles_y, self.tiles_x, tile + 1, tile + 1), dtype=np.int32)
+        # (tile row, tile column) of the tiles written since the last refresh
+        self.dirty = set()
+        self._stale = True
+        self._down = None
+        self._across = None
+        self._totals = None
+
+    def mark_dirty(self, x, y):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            self.dirty.add((y // self.tile, x // self.tile))
+
+    def mark_all_dirty(self):
+        self._stale = True
+
+    def refresh(self):
+        if self._stale or self._totals is None:
+            self._rebuild()
+        else:
+            for ty, tx in self.dirty:
+                self._refresh_tile(ty, tx)
+        self.dirty.clear()
+        self._stale = False
+
+    def _rebuild(self):
+        t = self.tile
+        padded = np.zeros((self.tiles_y * t, self.tiles_x * t), dtype=np.int32)
+        padded[:self.height, :self.width] = self.cells(0, self.height, 0, self.width)
+        # (tile row, tile column, row in tile, column in tile)
+        blocks = padded.reshape(self.tiles_y, t, self.tiles_x, t).transpose(0, 2, 1, 3)
+        inner = self.local[:, :, 1:, 1:]
+        np.cumsum(blocks, axis=2, dtype=np.int32, out=inner)
+        np.cumsum(inner, axis=3, out=inner)
+        # Tile column tx, rows above tile ty: sum of the bottom rows of the tiles (j < ty, tx)
+        self._down = np.zeros((self.tiles_y + 1, self.tiles_x, t + 1), dtype=np.int64)
+        self._down[1:] = self.local[:, :, t, :].cumsum(axis=0)
+        # Tile row ty, columns left of tile tx: sum of the right columns of the tiles (ty, i < tx)
+        self._across = np.zeros((self.tiles_y, self.tiles_x + 1, t + 1), dtype=np.int64)
+        self._across[:, 1:] = self.local[:, :, :, t].cumsum(axis=1)
+        self._totals = np.zeros((self.tiles_y + 1, self.tiles_x + 1), dtype=np.int64)
+        self._totals[1:, 1:] = self.local[:, :, t, t].cumsum(axis=0).cumsum(axis=1)
+
+    def _refresh_tile(self, ty, tx):
+        t = self.tile
+        local = self.local[ty, tx]
+        bottom, right = local[t, :].copy(), local[:, t].copy()
+        y0, x0 = ty * t, tx * t
+        y1, x1 = min(y0 + t, self.height), min(x0 + t, self.width)
+        block = np.zeros((t, t), dtype=np.int32)
+        block[:y1 - y0, :x1 - x0] = self.cells(y0, y1, x0, x1)
+        inner = local[1:, 1:]
+        np.cumsum(block, axis=0, out=inner)
+        np.cumsum(inner, axis=1, out=inner)
+        # Only the prefix sums past this tile include it
+        self._down[ty + 1:, tx] += local[t, :] - bottom
+        self._across[ty, tx + 1:] += local[:, t] - right
+        self._totals[ty + 1:, tx + 1:] += int(local[t, t]) - int(bottom[t])
+
+    def prefix(self, x, y):
+        """
+        Sum over the cells with column < x and row < y, x and y clamped to the layer.
+        """
+        x = min(max(int(x), 0), self.width)
+        y = min(max(int(y), 0), self.height)
+        tx, rx = divmod(x, self.tile)
+        ty, ry = divmod(y, self.tile)
+        if tx == self.tiles_x:
+            tx, rx = tx - 1, self.tile
+        if ty == self.tiles_y:
+            ty, ry = ty - 1, self.tile
+        return int(self._totals[ty, tx] + self._down[ty, tx, rx] + self._across[ty, tx, ry]
+                   + self.local[ty, tx, ry, rx])
+
+    def sum(self, x0, y0, x1, y1):
+        """
+        Sum over the inclusive cell rectangle [x0, x1] x [y0, y1], clipped to the layer.
+        """
+        if x1 < x0 or y1 < y0:
+            return 0
+        if self._stale or self.dirty:
+            self.refresh()
+        x1, y1 = x1 + 1, y1 + 1
+        return self.prefix(x1, y1) - self.prefix(x0, y1) - self.prefix(x1, y0) + self.prefix(x0, y0)
+
+
+class LayerCoverage:
+    """
+    Cell counts of one 0/1 layer inside collision boxes.
+
+    Axis aligned boxes are read from a TiledSummedArea over the layer. Boxes at other
+    rotations are small: their cells are counted directly in the window around them.
+    """
+
+    def __init__(self, shape, cells, tile=64):
+        self.height, self.width = shape
+        self.cells = cells
+        self.tile = tile
+        self.straight = TiledSummedArea(shape, cells, tile)
+
+    def mark_dirty(self, x, y):
+        self.straight.mark_dirty(x, y)
+
+    def mark_all_dirty(self):
+        self.straight.mark_all_dirty()
+
+    def count_rect(self, x0, y0, x1, y1):
+        """
+        Layer cells in the inclusive rectangle [x0, x1] x [y0, y1].
+        """
+        return self.straight.sum(x0, y0, x1, y1)
+
+    def count_diamond(self, u0, v0, u1, v1):
+        """
+        Layer cells with x + y in [u0, u1] and x - y in [v0, v1].
+        """
+        x0, x1 = max(-(-(u0 + v0) // 2), 0), min((u1 + v1) // 2, self.width - 1)
+        y0, y1 = max(-(-(u0 - v1) // 2), 0), min((u1 - v0) // 2, self.height - 1)
+        if x1 < x0 or y1 < y0:
+            return 0
+        ys, xs = np.mgrid[y0:y1 + 1, x0:x1 + 1]
+        inside = (xs + ys >= u0) & (xs + ys <= u1) & (xs - ys >= v0) & (xs - ys <= v1)
+        return int(np.count_nonzero(self.cells(y0, y1 + 1, x0, x1 + 1)[inside]))
+
+    def count_line(self, start, end):
+        """
+        Layer cells on the pixel line from cell `start` to cell `end`, both included.
+
+        Returns:
+            the count, or None when the line is neither axis aligned nor diagonal.
+        """
+        (x0, y0), (x1, y1) = start, end
+        if x0 == x1 or y0 == y1:
+            return self.count_rect(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1))
+        if abs(x1 - x0) == abs(y1 - y0):
+            return self._count_diagonal(start, end)
+        return None
+
+    def _count_diagonal(self, start, end):
+        if start[0] > end[0]:
+            start, end = end, start
+        (x0, y0), (x1, y1) = start, end
+        step = 1 if y1 >= y0 else -1
+        count = 0
+        # One window of at most tile x tile cells per tile-long piece of the line
+        for first in range(0, x1 - x0 + 1, self.tile):
+            i = np.arange(first, min(first + self.tile, x1 - x0 + 1))
+            xs, ys = x0 + i, y0 + step * i
+            valid = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+            if not valid.any():
+                continue
+            xs, ys = xs[valid], ys[valid]
+            wx, wy = int(xs.min()), int(ys.min())
+            window = self.cells(wy, int(ys.max()) + 1, wx, int(xs.max()) + 1)
+            count += int(np.count_nonzero(window[ys - wy, xs - wx]))
+        return count
+
+    def count_box(self, corners, direction):
+        """
+        Layer cells inside the box with the given pixel aligned corners and axis direction.
+        """
+        dx, dy = direction
+        xs = [c[0] for c in corners]
+        ys = [c[1] for c in corners]
+        if abs(dx) < _EPSILON or abs(dy) < _EPSILON:
+            return self.count_rect(min(xs), min(ys), max(xs), max(ys))
+        if abs(abs(dx) - abs(dy)) < _EPSILON:
+            us = [x + y for x, y in corners]
+            vs = [x - y for x, y in corners]
+            return self.count_diamond(min(us), min(vs), max(us), max(vs))
+        return self._count_quad(corners, min(xs), min(ys), max(xs), max(ys))
+
+    def _count_quad(self, corners, x0, y0, x1, y1):
+        x0, y0 = max(x0, 0), max(y0, 0)
+        x1, y1 = min(x1, self.width - 1), min(y1, self.height - 1)
+        if x1 < x0 or y1 < y0:
+            return 0
+        ys, xs = np.mgrid[y0:y1 + 1, x0:x1 + 1]
+        positive = np.ones(xs.shape, dtype=bool)
+        negative = np.ones(xs.shape, dtype=bool)
+        for i in range(4):
+            ax, ay = corners[i - 1]
+            bx, by = corners[i]
+            cross = (bx - ax) * (ys - ay) - (by - ay) * (xs - ax)
+            positive &= cross >= 0
+            negative &= cross <= 0
+        inside = positive | negative
+        return int(np.count_nonzero(self.cells(y0, y1 + 1, x0, x1 + 1)[inside]))
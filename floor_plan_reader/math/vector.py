@@ -2,17 +2,32 @@ import math
 
 
 class Vector:
+    """
+    Immutable 2D vector. The (dx, dy) tuple lives in `direction`; the normalized,
+    normal and opposite forms are computed once and cached on the instance.
+    Operations return new vectors; the static *_t helpers work on plain tuples for
+    hot paths that do not need a Vector at all.
+    """
+    __slots__ = ("direction", "_unit", "_normal", "_opposite")
+
+    # Kept for compatibility with code reading vector.length
+    length = 1
 
     def __init__(self, direction):
-        self.direction = direction
-        self.length = 1
+        _set_direction(self, (direction[0], direction[1]))
+
+    def __setattr__(self, key, value):
+        raise AttributeError("Vector is immutable")
+
+    def __reduce__(self):
+        return Vector, (self.direction,)
 
     @staticmethod
     def make_from(other):
-        return Vector(other.direction)
+        return other
 
     def copy(self):
-        return Vector(self.direction)
+        return self
 
     def __hash__(self):
         """Hash the vector based on its direction."""
@@ -24,39 +39,53 @@ class Vector:
             return self.direction == other.direction
         return False
 
-    def __repr__(self):
-        """String representation of the vector."""
-        return f"Vector(direction={self.direction}, length={self.length})"
+    def __getitem__(self, item):
+        return self.direction[item]
+
+    def __iter__(self):
+        return iter(self.direction)
+
+    def __len__(self):
+        return 2
 
     def calculate_length(self):
         """Calculate the length (magnitude) of the vector."""
         return math.sqrt(self.direction[0] ** 2 + self.direction[1] ** 2)
 
     def get_normal(self):
-        """Get the normal (perpendicular) vector."""
+        """Get the normal (perpendicular) vector, cached."""
+        try:
+            return self._normal
+        except AttributeError:
+            pass
         direction = self.direction
-        length = math.hypot(direction[0], direction[1])
-        if length == 0:
-            return None
-
-        # nx /= length  # Make it unit length
-        # ny /= length
-        return Vector((-direction[1], direction[0]))
+        if math.hypot(direction[0], direction[1]) == 0:
+            normal = None
+        else:
+            normal = Vector((-direction[1], direction[0]))
+        _set_normal(self, normal)
+        return normal
 
     def normalize(self):
-        """Normalize the vector to have a length of 1."""
+        """Return this vector with a length of 1, cached."""
+        try:
+            return self._unit
+        except AttributeError:
+            pass
         length = math.hypot(self.direction[0], self.direction[1])
         if length < 1e-8:
             raise ValueError("Cannot normalize a vector with near-zero length.")
-
-        self.direction = (self.direction[0] / length, self.direction[1] / length)
-        self.length = 1
-        return self
+        if length == 1.0:
+            unit = self
+        else:
+            unit = Vector((self.direction[0] / length, self.direction[1] / length))
+            _set_unit(unit, unit)
+        _set_unit(self, unit)
+        return unit
 
     def scale(self, scalar):
-        """Scale the vector by a scalar."""
-        self.direction = (self.direction[0] * scalar, self.direction[1] * scalar)
-        self.length = 1
+        """Return the vector scaled by a scalar."""
+        return Vector((self.direction[0] * scalar, self.direction[1] * scalar))
 
     def dot_product(self, other):
         """Calculate the dot product with another vector."""
@@ -84,11 +113,19 @@ class Vector:
         vx = point[0] - origin[0]
         vy = point[1] - origin[1]
         # Dot product with the direction (dx, dy)
-        return vx * direction.dx() + vy * direction.dy()
+        dx, dy = direction.direction
+        return vx * dx + vy * dy
 
     def opposite(self):
-        """Return a new vector in the opposite direction without modifying the original."""
-        return Vector((-self.direction[0], -self.direction[1]))
+        """Return the vector in the opposite direction, cached."""
+        try:
+            return self._opposite
+        except AttributeError:
+            pass
+        opposite = Vector((-self.direction[0], -self.direction[1]))
+        _set_opposite(opposite, self)
+        _set_opposite(self, opposite)
+        return opposite
 
     def dx(self):
         return self.direction[0]
@@ -106,20 +143,8 @@ class Vector:
             return math.hypot(point[0] - line_point[0],
                               point[1] - line_point[1])
 
-        # Get normal vector
-        normal = self.get_normal()
-        if normal is None:
-            return math.hypot(point[0] - line_point[0],
-                              point[1] - line_point[1])
-
-        # Normalize the normal vector
-        normal_length = normal.calculate_length()
-        if normal_length == 0:
-            return math.hypot(point[0] - line_point[0],
-                              point[1] - line_point[1])
-
-        normal.direction = (normal.direction[0] / normal_length,
-                            normal.direction[1] / normal_length)
+        # Unit normal of the line
+        normal = self.get_normal().normalize()
 
         # Vector from line_point to our point
         vx = point[0] - line_point[0]
@@ -129,21 +154,20 @@ class Vector:
         return abs(vx * normal.direction[0] + vy * normal.direction[1])
 
     def distance_from_point_on_normal(self, point):
-        point = Vector((point.x, point.y))
         """
         Computes the perpendicular distance from a given `point` (Vector)
         to the line passing through `self` in the direction of this vector.
 
         This uses projection onto the normal of the vector's direction.
         """
+        point = Vector((point.x, point.y))
         # Step 1: Get the normal of this vector
         normal = self.get_normal()
         if normal is None:
             raise ValueError("Cannot compute normal for zero-length vector.")
 
         # Step 2: Normalize the normal vector
-        normal.length = normal.calculate_length()
-        normal.normalize()
+        normal = normal.normalize()
 
         # Step 3: Vector from self to point
         to_point = point - self
@@ -172,6 +196,49 @@ class Vector:
             raise ValueError("Cannot divide by zero.")
         return Vector((self.direction[0] / scalar, self.direction[1] / scalar))
 
+    def __neg__(self):
+        return self.opposite()
+
     def __repr__(self):
         """String representation of the vector."""
         return f"Vector(direction={self.direction}, length={self.length})"
+
+    # ------------------------------------------------------------------
+    # Tuple helpers: no Vector allocation, for hot paths
+    # ------------------------------------------------------------------
+    @staticmethod
+    def add_t(a, b):
+        return a[0] + b[0], a[1] + b[1]
+
+    @staticmethod
+    def sub_t(a, b):
+        return a[0] - b[0], a[1] - b[1]
+
+    @staticmethod
+    def scale_t(a, scalar):
+        return a[0] * scalar, a[1] * scalar
+
+    @staticmethod
+    def normal_t(a):
+        return -a[1], a[0]
+
+    @staticmethod
+    def madd_t(point, direction, scalar):
+        """point + direction * scalar"""
+        return point[0] + direction[0] * scalar, point[1] + direction[1] * scalar
+
+    # ------------------------------------------------------------------
+    # In-place helpers: write into a caller owned 2 element list
+    # ------------------------------------------------------------------
+    @staticmethod
+    def madd_into(out, direction, scalar):
+        """out += direction * scalar, in place."""
+        out[0] += direction[0] * scalar
+        out[1] += direction[1] * scalar
+        return out
+
+
+_set_direction = Vector.direction.__set__
+_set_unit = Vector._unit.__set__
+_set_normal = Vector._normal.__set__
+_set_opposite = Vector._opposite.__set__
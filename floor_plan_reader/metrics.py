@@ -0,0 +1,115 @@
+import json
+import os
+import time
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def rss_mb():
+    """
+    Resident set size of this process in MB, None where it cannot be read.
+    """
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2 ** 20
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class JsonlSink:
+    """
+    Appends every sample as one JSON line, for graphing a whole run afterwards.
+    """
+
+    def __init__(self, path):
+        self.file = open(path, "w")
+
+    def write(self, sample):
+        self.file.write(json.dumps(sample, separators=(",", ":")) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class MetricsRegistry:
+    """
+    Named metrics sampled together every SAMPLE_INTERVAL seconds.
+
+    A gauge is read from its source as is, numbers or dicts of numbers. A rate is the change
+    of its source since the previous sample, per second, or per change of `per` when given
+    (writes per tick rather than per second). tick() is cheap enough to call every tick, it
+    only reads the clock until a sample is due. The latest sample is a new dict each time,
+    never changed afterwards, so other threads can read it as is; every sink gets it too.
+    """
+    SAMPLE_INTERVAL = 1.0
+
+    def __init__(self, clock=time.monotonic):
+        """
+        Args:
+            clock: returns seconds, paces the samples and divides the rates.
+        """
+        self.clock = clock
+        self.gauges = {}
+        self.rates = {}
+        self.sinks = []
+        self.latest = {}
+        self.last_time = None
+        # rate name -> (source value, per value) at the previous sample
+        self.previous = {}
+
+    def register(self, name, source):
+        self.gauges[name] = source
+
+    def register_rate(self, name, source, per=None):
+        self.rates[name] = (source, per)
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+        self.sinks = []
+
+    def tick(self):
+        now = self.clock()
+        if self.last_time is None:
+            self._sample_rates(now)
+            return
+        if now - self.last_time >= self.SAMPLE_INTERVAL:
+            self.sample(now)
+
+    def sample(self, now=None):
+        """
+        Read every metric now, publish the sample as `latest` and hand it to the sinks.
+        """
+        if now is None:
+            now = self.clock()
+        sample = {"time": time.time()}
+        for name, source in self.gauges.items():
+            sample[name] = source()
+        sample.update(self._sample_rates(now))
+        self.latest = sample
+        for sink in self.sinks:
+            sink.write(sample)
+        return sample
+
+    def _sample_rates(self, now):
+        rates = {}
+        elapsed = None if self.last_time is None else now - self.last_time
+        for name, (source, per) in self.rates.items():
+            value = source()
+            per_value = per() if per is not None else now
+            if name in self.previous and elapsed:
+                last_value, last_per = self.previous[name]
+                span = per_value - last_per
+                rates[name] = (value - last_value) / span if span else 0.0
+            self.previous[name] = (value, per_value)
+        self.last_time = now
+        return rates
@@ -0,0 +1,183 @@
+import json
+import os
+
+import numpy as np
+
+FORMAT_NAME = "columnar_plan"
+FORMAT_VERSION = 2
+META_FILE = "meta.json"
+# Directory suffix used next to a floorplan JSON
+SUFFIX = ".columnar"
+
+NODE_COLUMNS = ("node_ids", "node_xy")
+EDGE_COLUMNS = ("edge_ids", "edge_nodes", "edge_wall_type", "edge_stud_type", "edge_height")
+OPENING_COLUMNS = ("opening_edge", "opening_type", "opening_sub_type", "opening_center_x", "opening_bottom_z",
+                   "opening_width", "opening_height")
+COLUMNS = NODE_COLUMNS + EDGE_COLUMNS + OPENING_COLUMNS
+
+
+class ColumnarPlan:
+    """
+    Floorplan as flat arrays, the interchange format between the reader and the Blender generator.
+
+    Nodes are rows of node_ids/node_xy, edges refer to them by row in edge_nodes, and
+    openings refer to their edge by row in opening_edge (sorted, so the openings of an edge
+    are contiguous). On disk every column is a .npy file in one directory next to a
+    meta.json holding the format version and the non-columnar keys (furnitures), so
+    load() can memory map the columns instead of parsing them.
+    """
+
+    def __init__(self, columns, extra=None):
+        for name in COLUMNS:
+            setattr(self, name, columns[name])
+        self.extra = extra if extra is not None else {}
+
+    @staticmethod
+    def from_floorplan_dict(data):
+        """
+        Build from the nested dict written by JsonWriter.build_floorplan_json.
+        """
+        nodes = data.get("nodes", [])
+        edges = data.get("edges", [])
+        index = {n["id"]: i for i, n in enumerate(nodes)}
+        openings = [(i, o) for i, e in enumerate(edges) for o in e.get("openings", [])]
+        columns = {
+            "node_ids": np.array([n["id"] for n in nodes], dtype=str),
+            "node_xy": np.array([(n["x"], n["y"]) for n in nodes], dtype=np.float64).reshape(-1, 2),
+            "edge_ids": np.array([e.get("id", "N/A") for e in edges], dtype=str),
+            "edge_nodes": np.array([(index[e["start_node"]], index[e["end_node"]]) for e in edges],
+                                   dtype=np.int64).reshape(-1, 2),
+            # Defaults are the ones NodeRender falls back to
+            "edge_wall_type": np.array([e.get("wall_type", "interior") for e in edges], dtype=str),
+            "edge_stud_type": np.array([e.get("stud_type", "2x4") for e in edges], dtype=str),
+            "edge_height": np.array([e.get("height", 2.4) for e in edges], dtype=np.float64),
+            "opening_edge": np.array([i for i, _ in openings], dtype=np.int64),
+            "opening_type": np.array([o.get("type", "window") for _, o in openings], dtype=str),
+            # Door kind, empty for openings without one
+            "opening_sub_type": np.array([o.get("sub_type", "") for _, o in openings], dtype=str),
+            "opening_center_x": np.array([o["center_x"] for _, o in openings], dtype=np.float64),
+            "opening_bottom_z": np.array([o.get("bottom_z", 1) for _, o in openings], dtype=np.float64),
+            "opening_width": np.array([o["width"] for _, o in openings], dtype=np.float64),
+            "opening_height": np.array([o.get("height", 1.3) for _, o in openings], dtype=np.float64),
+        }
+        extra = {k: v for k, v in data.items() if k not in ("nodes", "edges")}
+        return ColumnarPlan(columns, extra)
+
+    def columns(self):
+        return {name: getattr(self, name) for name in COLUMNS}
+
+    def openings_of(self, edge_index):
+        """
+        Row range of the openings of one edge.
+        """
+        start, end = np.searchsorted(self.opening_edge, [edge_index, edge_index + 1])
+        return range(int(start), int(end))
+
+    def opening_dicts(self, rows=None):
+        """
+        Openings as the dicts of build_floorplan_json, all of them or the given rows (see openings_of).
+        """
+        if rows is None:
+            rows = range(len(self.opening_edge))
+        rows = slice(rows.start, rows.stop)
+        openings = []
+        for t, s, c, z, w, h in zip(self.opening_type[rows].tolist(), self.opening_sub_type[rows].tolist(),
+                                    self.opening_center_x[rows].tolist(), self.opening_bottom_z[rows].tolist(),
+                                    self.opening_width[rows].tolist(), self.opening_height[rows].tolist()):
+            opening = {"type": t, "center_x": c, "bottom_z": z, "width": w, "height": h}
+            if s:
+                opening["sub_type"] = s
+            openings.append(opening)
+        return openings
+
+    def to_floorplan_dict(self):
+        """
+        The nested dict layout of build_floorplan_json, for consumers that want dicts.
+        """
+        node_ids = self.node_ids.tolist()
+        nodes = [{"id": node_id, "x": x, "y": y} for node_id, (x, y) in zip(node_ids, self.node_xy.tolist())]
+        openings = self.opening_dicts()
+        edges = []
+        rows = zip(self.edge_ids.tolist(), self.edge_nodes.tolist(), self.edge_wall_type.tolist(),
+                   self.edge_stud_type.tolist(), self.edge_height.tolist())
+        for i, (edge_id, (a, b), wall_type, stud_type, height) in enumerate(rows):
+            edges.append({"id": edge_id,
+                          "start_node": node_ids[a], "end_node": node_ids[b],
+                          "wall_type": wall_type,
+                          "stud_type": stud_type,
+                          "height": height,
+                          "openings": [openings[k] for k in self.openings_of(i)]})
+        data = {"nodes": nodes, "edges": edges}
+        data.update(self.extra)
+        return data
+
+    def transformed(self, scale, offset=(0.0, 0.0), flip_x=False, flip_y=False):
+        """
+        Scale (e.g. meter per pixel), mirror and shift the plan in one pass.
+
+        Node coordinates become xy * scale (negated on flipped axes) + offset. Opening
+        center_x and width are lengths along the wall, they are only scaled.
+
+        Returns:
+            a new ColumnarPlan; this one is left untouched.
+        """
+        factors = np.array((-scale if flip_x else scale, -scale if flip_y else scale), dtype=np.float64)
+        columns = self.columns()
+        columns["node_xy"] = self.node_xy * factors + np.asarray(offset, dtype=np.float64)
+        columns["opening_center_x"] = self.opening_center_x * scale
+        columns["opening_width"] = self.opening_width * scale
+        return ColumnarPlan(columns, self.extra)
+
+    def save(self, directory):
+        """
+        Write one .npy per column into `directory`. meta.json goes last, a directory without
+        it is an incomplete write. Files are replaced rather than overwritten, so plans already
+        memory mapped by a reader keep their old contents.
+        """
+        os.makedirs(directory, exist_ok=True)
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        for name in COLUMNS:
+            path = os.path.join(directory, name + ".npy")
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, np.ascontiguousarray(getattr(self, name)))
+            os.replace(path + ".tmp", path)
+        meta = {"format": FORMAT_NAME, "version": FORMAT_VERSION, "columns": list(COLUMNS), "extra": self.extra}
+        tmp = meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(meta, f)
+        os.replace(tmp, meta_path)
+
+    @staticmethod
+    def load(directory, mmap=True):
+        """
+        Load a plan written by save(). With mmap the columns are read-only memory maps.
+        """
+        with open(os.path.join(directory, META_FILE), "r") as f:
+            meta = json.load(f)
+        if meta.get("format") != FORMAT_NAME:
+            raise ValueError(f"{directory} is not a {FORMAT_NAME}")
+        if meta.get("version", 0) > FORMAT_VERSION:
+            raise ValueError(f"{directory} has format version {meta['version']}, "
+                             f"newest supported is {FORMAT_VERSION}")
+        mmap_mode = "r" if mmap else None
+        columns = {name: np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode)
+                   for name in meta.get("columns", COLUMNS)}
+        if "opening_sub_type" not in columns:
+            # Version 1 had no door kinds
+            columns["opening_sub_type"] = np.full(len(columns["opening_edge"]), "", dtype=str)
+        return ColumnarPlan(columns, meta.get("extra"))
+
+    @staticmethod
+    def is_up_to_date(directory, source):
+        """
+        True when `directory` holds a complete plan written after `source` (the JSON it sits
+        next to) last changed, or `source` is gone.
+        """
+        meta_path = os.path.join(directory, META_FILE)
+        if not os.path.exists(meta_path):
+            return False
+        if not os.path.exists(source):
+            return True
+        return os.path.getmtime(meta_path) >= os.path.getmtime(source)
@@ -1,26 +1,47 @@
 class Edge:
-    def __init__(self, node_a, node_b, line):
+    def __init__(self, node_a, node_b, line, seg_id=None):
         self.node_a = node_a
         self.node_b = node_b
         self.opening = set()
+        # Segment openings version self.opening was copied from
+        self.opening_version = None
         self.line = line
         self.wall_height = 2.7432
         self.stud_type = "2x6"
+        # Edges are keyed by their segment, also once detached from it
+        self.seg_id = line.seg.id if seg_id is None else seg_id
 
     def copy(self):
         e = Edge(self.node_a, self.node_b, self.line)
-        for o in self.line.seg.openings:
+        for o in self.line.seg.get_openings():
             e.opening.add(o.copy())
+        e.opening_version = self.line.seg.openings_version
+        return e
+
+    def detached(self, node_a, node_b, line):
+        """
+        Copy over detached copies of the nodes and the line, with its own openings.
+        """
+        e = Edge(node_a, node_b, line, self.seg_id)
+        e.opening = {o.copy() for o in self.opening}
+        e.opening_version = self.opening_version
+        e.wall_height = self.wall_height
+        e.stud_type = self.stud_type
         return e
 
     def calculate_opening(self):
+        """
+        Copy the segment's cached openings, only when they changed since the last copy.
+        """
+        seg = self.line.seg
+        if self.opening_version is not None and self.opening_version == seg.openings_version:
+            return
         self.opening = set()
-        for o in self.line.seg.openings:
+        for o in seg.get_openings():
             self.opening.add(o.copy())
+        self.opening_version = seg.openings_version
 
     def convert_to_scale(self, meter_per_pixel):
-        if len(self.line.seg.parts) > 1:
-            self.line.seg.calculate_openings()
         e = self.copy()
         openings = []
         for o in e.opening:
@@ -32,8 +53,6 @@ class Edge:
         return e
 
     def get_json(self):
-        if len(self.line.seg.parts) > 1:
-            self.line.seg.calculate_openings()
         str_value = {"id": f"Ext_{self.node_a.id}_{self.node_b.id}",
                      "start_node": self.node_a.id, "end_node": self.node_b.id,
                      "wall_type": "exterior",
@@ -44,7 +63,7 @@ class Edge:
         return str_value
 
     def __hash__(self):
-        return hash(self.line.seg.id)
+        return hash(self.seg_id)
 
     def __eq__(self, other):
         return self.__hash__() == other.__hash__()
@@ -6,6 +6,12 @@ class Line:
         self.seg = seg
         self.geometry = geometry
 
+    def detached(self):
+        """
+        Copy without the segment, to hand over to another thread. The shapely geometry is immutable and shared.
+        """
+        return Line(self.start_point, self.end_point, self.id, None, self.geometry)
+
     def __hash__(self):
         return hash((self.start_point, self.end_point))
 
@@ -1,6 +1,7 @@
 import logging
 from itertools import count
 
+from floor_plan_reader.math.snap_index import SnapIndex
 from floor_plan_reader.model.edge import Edge
 from floor_plan_reader.model.node import Node
 
@@ -10,9 +11,45 @@ class Model:
         self.nodes = {}
         self.edges = {}
         self.node_seq = count(start=1)
+        # Same tolerance as Node.__eq__, which the 3 px buckets of Node.__hash__ miss across bucket edges
+        self.snap = SnapIndex(3)
 
     def add_node(self, node):
         self.nodes[node.__hash__()] = node
+        self.snap.add(node.get_x(), node.get_y(), node)
+
+    def copy(self):
+        """
+        Shallow copy: new dictionaries sharing the node and edge objects.
+        """
+        m = Model()
+        for n in self.nodes.values():
+            m.add_node(n)
+        m.edges = dict(self.edges)
+        return m
+
+    def detached_copy(self, copies):
+        """
+        Deep copy sharing no node, edge or line with this model, for the main loop to own
+        while the worker keeps changing this one.
+
+        Args:
+            copies: dict filled with id(node) -> copy, to map other references to the nodes.
+        """
+        def copy_of(node):
+            if id(node) not in copies:
+                copies[id(node)] = node.detached()
+            return copies[id(node)]
+
+        m = Model()
+        for n in self.nodes.values():
+            m.add_node(copy_of(n))
+        lines = {}
+        for key, e in self.edges.items():
+            if e.line.id not in lines:
+                lines[e.line.id] = e.line.detached()
+            m.edges[key] = e.detached(copy_of(e.node_a), copy_of(e.node_b), lines[e.line.id])
+        return m
 
     def convert_to_scale(self, meter_per_pixel):
         m = Model()
@@ -27,15 +64,13 @@ class Model:
     def create_node(self, position):
         x = position[0]
         y = position[1]
-        n = Node((x, y))
-        hash_ = n.__hash__()
-        if hash_ in self.nodes.keys():
-            return self.nodes.get(hash_)
-        else:
-            n = Node((x, y))
-            n.id = f"N{next(self.node_seq)}"
-            self.add_node(n)
+        n = self.snap.find(x, y)
+        if n is not None:
             return n
+        n = Node((x, y))
+        n.id = f"N{next(self.node_seq)}"
+        self.add_node(n)
+        return n
 
     def get_edges(self):
         return self.edges.values()
@@ -44,11 +79,20 @@ class Model:
         return self.nodes.values()
 
     def has_node(self, node):
-        return node.__hash__() in self.nodes.keys()
+        return self.snap.find(node.get_x(), node.get_y()) is not None
 
     def add_edges(self, edge):
         self.edges[edge.__hash__()] = edge
 
+    def remove_node(self, node):
+        if self.nodes.get(node.__hash__()) is node:
+            del self.nodes[node.__hash__()]
+            self.snap.remove(node.get_x(), node.get_y(), node)
+
+    def remove_edge(self, edge):
+        if self.edges.get(edge.__hash__()) is edge:
+            del self.edges[edge.__hash__()]
+
     def create_edge(self, node_a, node_b, line):
         if node_a is None or node_b is None:
             logging.error("node error")
@@ -17,6 +17,14 @@ class Node:
         n.lines = self.lines
         return n
 
+    def detached(self):
+        """
+        Copy that shares nothing with this node, to hand over to another thread.
+        """
+        n = self.copy()
+        n.lines = list(self.lines)
+        return n
+
     def convert_to_scale(self, meter_per_pixel):
         n = self.copy()
         (x, y) = n.point
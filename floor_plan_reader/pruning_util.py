@@ -1,14 +1,33 @@
+from floor_plan_reader.math.collision_box_array import CollisionBoxArray
+
+
 class PruningUtil:
+    # Below this many parallel neighbours the scalar overlap check is cheaper than packing an array
+    BATCH_THRESHOLD = 16
+    OVERLAP_RATIO = 0.1
+
+    @staticmethod
+    def overlapping(candiate, list):
+        """
+        Agents of `list` that are alive, valid, parallel to `candiate` and overlap it
+        (same test as CollisionBox.is_overlapping), in list order.
+        """
+        box = candiate.collision_box
+        parallel = [m for m in list
+                    if m != candiate and m.alive and m.is_valid() and box.is_parallel_to(m.collision_box)]
+        if len(parallel) < PruningUtil.BATCH_THRESHOLD:
+            return [m for m in parallel if box.is_overlapping(m.collision_box)]
+        boxes = CollisionBoxArray.from_boxes([box] + [m.collision_box for m in parallel])
+        ratios = boxes.overlap_ratios_against(0)[1:]
+        return [m for m, ratio in zip(parallel, ratios) if ratio > PruningUtil.OVERLAP_RATIO]
+
     @staticmethod
     def prune(candiate,list):
-        for m in list:
-            if m != candiate and m.alive and m.is_valid():
-                if candiate.collision_box.is_parallel_to(m.collision_box):
-                    if candiate.collision_box.is_overlapping(m.collision_box):
-                        candiate.overlapping.add(m)
-                        ratio = candiate.get_occupation_ratio()
-                        if ratio < m.get_occupation_ratio():
-                            candiate.kill()
-                            #candiate.kill()
-                            return True,m
-        return False,None
\ No newline at end of file
+        for m in PruningUtil.overlapping(candiate, list):
+            candiate.overlapping.add(m)
+            ratio = candiate.get_occupation_ratio()
+            if ratio < m.get_occupation_ratio():
+                candiate.kill()
+                #candiate.kill()
+                return True,m
+        return False,None
@@ -0,0 +1,105 @@
+import heapq
+import logging
+from itertools import count
+
+
+class RecomputeQueue:
+    """
+    Deduplicating priority queue of agent recomputes, drained by AgentManager every tick.
+
+    An agent is queued at most once per kind of action: asking again for the same kind while
+    it waits keeps one entry with the higher priority and the latest action, other kinds get
+    entries of their own so none is lost. Highest priority runs first, then the shallowest
+    cascade, then the oldest request. A request made while another one runs is one level
+    deeper in the cascade than it; max_depth is the deepest cascade seen so far.
+    """
+
+    def __init__(self):
+        self._heap = []
+        # (agent, kind) -> live heap entry [key, agent, action, kind]; replaced entries get their agent set to None
+        self._entries = {}
+        # agent -> number of kinds it is queued for
+        self._queued = {}
+        self._seq = count()
+        self._running_depth = None
+        self.depth = 0
+        self.max_depth = 0
+        self.coalesced = 0
+        self.processed = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, agent):
+        return agent in self._queued
+
+    def push(self, agent, action, priority=0, kind=None):
+        """
+        Ask for `action()` to run for `agent` on a later drain.
+
+        Args:
+            kind: what the action does, e.g. "grow"; only requests of the same kind are merged.
+
+        Returns:
+            False if the agent was already queued for `kind` and the request was merged into that entry.
+        """
+        depth = 0 if self._running_depth is None else self._running_depth + 1
+        entry = self._entries.get((agent, kind))
+        if entry is not None:
+            self.coalesced += 1
+            old_priority, old_depth = -entry[0][0], entry[0][1]
+            if priority <= old_priority and depth >= old_depth:
+                entry[2] = action
+                return False
+            # Moves up: queue it again with the best of both requests
+            entry[1] = None
+            priority, depth = max(priority, old_priority), min(depth, old_depth)
+        else:
+            self._queued[agent] = self._queued.get(agent, 0) + 1
+        new_entry = [(-priority, depth, next(self._seq)), agent, action, kind]
+        self._entries[(agent, kind)] = new_entry
+        heapq.heappush(self._heap, new_entry)
+        return entry is None
+
+    def pop(self):
+        """
+        The next (agent, action, depth), or None when the queue is empty.
+        """
+        while self._heap:
+            key, agent, action, kind = heapq.heappop(self._heap)
+            if agent is not None:
+                del self._entries[(agent, kind)]
+                if self._queued[agent] == 1:
+                    del self._queued[agent]
+                else:
+                    self._queued[agent] -= 1
+                return agent, action, key[1]
+        return None
+
+    def drain(self, budget):
+        """
+        Run up to `budget` queued actions, skipping agents that died while waiting.
+
+        Returns:
+            the number of actions run.
+        """
+        ran = 0
+        while ran < budget:
+            item = self.pop()
+            if item is None:
+                break
+            agent, action, depth = item
+            if not agent.alive:
+                continue
+            self._running_depth = depth
+            try:
+                action()
+            finally:
+                self._running_depth = None
+            ran += 1
+            self.depth = depth
+            if depth > self.max_depth:
+                self.max_depth = depth
+                logging.debug("Recompute cascade reached depth %d", depth)
+        self.processed += ran
+        return ran
@@ -1,5 +1,8 @@
 import json
 import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 from itertools import count
 
 import pygame
@@ -8,10 +11,15 @@ from agent_manager import AgentManager
 from floor_plan_reader.agents.blob import Blob
 from floor_plan_reader.agents.mushroom_agent import Mushroom
 from floor_plan_reader.agents.wall_segment import WallSegment
+from floor_plan_reader.blueprint_extractor import BlueprintExtractor
+from floor_plan_reader.event_log import EventLogWriter
 from floor_plan_reader.image_parser import ImageParser
-from floor_plan_reader.intersections_solver import IntersectionSolver
 from floor_plan_reader.json_writer import JsonWriter
+from floor_plan_reader.metrics import JsonlSink, MetricsRegistry, rss_mb
+from floor_plan_reader.display.offscreen_renderer import OffscreenRenderer
 from floor_plan_reader.display.simulation_view import SimulationView
+from floor_plan_reader.simulation_worker import FrameSnapshot, SimulationWorker
+from floor_plan_reader.world import World
 from floor_plan_reader.world_factory import WorldFactory
 from pygame import font
 
@@ -21,6 +29,9 @@ f_small = font.Font(None, 12)
 
 
 class Simulation:
+    # States in which agents are still alive but no longer do anything
+    SLEEPING_STATES = ("done", "error")
+
     def __init__(self):
 
         self._line_dic = None
@@ -28,8 +39,20 @@ class Simulation:
         self.wf = WorldFactory()
         self.agent_manager = AgentManager(self)
         self.world = None
-        self.solver = None
+        self.extractor = None
         self.view = SimulationView(self)
+        # Callables run on the simulation thread between two ticks, see submit()
+        self.commands = queue.Queue()
+        self.worker = None
+        # Single thread for slow inspection jobs of the UI, see run_in_background()
+        self.background = None
+        self.tick = 0
+        # EventLogWriter when recording, see record_events()
+        self.recorder = None
+        # OffscreenRenderer for headless runs, see render_offscreen()
+        self.offscreen = None
+        self.metrics = MetricsRegistry()
+        self.register_metrics()
 
         self.width = 0
         self.height = None
@@ -48,35 +71,76 @@ class Simulation:
             }
         ]
 
+    def register_metrics(self):
+        m = self.metrics
+        m.register("tick", lambda: self.tick)
+        m.register_rate("ticks_per_s", lambda: self.tick)
+        m.register("agents", self.get_agent_metrics)
+        m.register("candidates", lambda: len(self.world.candidates))
+        m.register("recompute_queue", lambda: len(self.world.recompute_queue))
+        m.register("recompute_queue.depth", lambda: self.world.recompute_queue.depth)
+        m.register("recompute_queue.max_depth", lambda: self.world.recompute_queue.max_depth)
+        m.register("recompute_queue.coalesced", lambda: self.world.recompute_queue.coalesced)
+        m.register_rate("occupancy_writes_per_tick", lambda: self.world.writes[World.OCCUPIED], per=lambda: self.tick)
+        m.register("blueprint_snapshot_ms", lambda: self._ms(self.extractor and self.extractor.last_snapshot_time))
+        m.register("blueprint_extract_ms", lambda: self._ms(self.extractor and self.extractor.last_extract_time))
+        m.register("json_write_ms", lambda: self._ms(self.jw.last_latency))
+        m.register("rss_mb", rss_mb)
+
+    @staticmethod
+    def _ms(seconds):
+        return None if seconds is None else seconds * 1000
+
+    def get_agent_metrics(self):
+        """
+        Live agents, active and sleeping, and how many are in each state, keyed "Kind.state".
+        """
+        active = sleeping = 0
+        states = {}
+        for agent in self.world.agents:
+            if not agent.alive:
+                continue
+            state = agent.get_state()
+            key = f"{type(agent).__name__}.{state}"
+            states[key] = states.get(key, 0) + 1
+            if state in self.SLEEPING_STATES:
+                sleeping += 1
+            else:
+                active += 1
+        return {"active": active, "sleeping": sleeping, "states": states}
+
+    def write_metrics(self, path):
+        """
+        Append a JSON line with every metrics sample to `path`, e.g. for headless runs.
+        """
+        self.metrics.add_sink(JsonlSink(path))
+
     def get_intersections(self):
         return self._intersections
 
     def save_blue_print(self):
-        result = self.solver.build_lines_and_intersections(self.world.wall_segments)
+        """
+        Hand a snapshot of the world to the extraction worker; apply_blue_print runs when it is done.
+        """
+        self.extractor.submit(self.world)
+
+    def apply_blue_print(self, result):
         self._intersections = result.get("intersections")
         self._lines = result.get("lines")
         self._line_dic = {}
         for l in self._lines:
             self._line_dic[l.id] = l
-            l.seg.calculate_openings()
+        for i in result.get("removed_intersections"):
+            (ix, iy) = i.point
+            blob = self.world.get_blob(ix, iy)
+            if blob is not None:
+                blob.remove_intersection(i)
         for i in self._intersections:
             (ix, iy) = i.point
             blob = self.world.get_blob(ix, iy)
             if blob is not None:
                 blob.add_intersection(i)
-        model = self.world.model
-        scaled_model = model.convert_to_scale(0.028)
-        nodes = list(model.get_nodes())
-        edges = list(model.get_edges())
-        for e in edges:
-            e.calculate_opening()
-        data = {
-            "nodes": nodes,
-            "edges": edges
-        }
-
-        if len(edges) > 10:
-            self.jw.build_floorplan_json(data, self.world.walls)
+        self.world.model = result.get("model")
 
     def get_blob_count(self):
         return len(self.world.blobs)
@@ -109,14 +173,85 @@ class Simulation:
     def get_wall_segment_count(self):
         return len(self.world.wall_segments)
 
+    def submit(self, command):
+        """
+        Run `command` on the simulation thread before the next tick. Anything that touches
+        the agents from the UI goes through here.
+        """
+        self.commands.put(command)
+
+    def run_in_background(self, job):
+        """
+        Run `job` on the background thread, one job at a time in submission order. Jobs must
+        only read copies of the world; what they want changed goes through submit().
+        """
+        if self.background is None:
+            self.background = ThreadPoolExecutor(max_workers=1, thread_name_prefix="background")
+        future = self.background.submit(job)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            logging.error("background job failed", exc_info=future.exception())
+
+    def run_commands(self):
+        while True:
+            try:
+                command = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            command()
+
     def run(self):
+        self.run_commands()
         self.agent_manager.run()
+        if self.extractor is not None:
+            self.extractor.run_pending()
+        self.tick += 1
+        if self.recorder is not None:
+            self.recorder.record(self.tick)
+        self.metrics.tick()
+        if self.offscreen is not None:
+            self.offscreen.tick()
+
+    def record_events(self, path, keyframe_interval=EventLogWriter.KEYFRAME_INTERVAL):
+        """
+        Write an event log of the run to `path`, for the replay viewer. Call once the world exists.
+        """
+        self.recorder = EventLogWriter(path, self.world, keyframe_interval)
+
+    def render_offscreen(self, path, every=50, budget=0.05, scale=1.0):
+        """
+        Save frames of the run to `path`, PNGs in a directory or a .mp4/.avi video, see
+        OffscreenRenderer. Headless runs only, call once the world exists.
+        """
+        self.offscreen = OffscreenRenderer(self, path, every, budget, scale)
+
+    def run_tasks(self, dt):
+        for task in self.tasks:
+            task["accumulator"] += dt
+            if task["accumulator"] >= task["interval"]:
+                task["command"]()
+                task["accumulator"] = 0
+
+    def take_frame(self):
+        return FrameSnapshot(self)
+
+    def get_frame(self):
+        """
+        Latest frame for the renderer: the worker's when it runs, else taken right away.
+        """
+        if self.worker is not None:
+            return self.worker.get_frame()
+        return self.take_frame()
 
     def init_world(self, image):
         img_gray = image.get_black_and_white()
         self.wf.set_grid(img_gray)
         self.world = self.wf.create_World()
-        self.solver = IntersectionSolver(self.world)
+        self.extractor = BlueprintExtractor(self.apply_blue_print, self.jw)
         self.height, self.width = self.world.grid.shape
         self.floorplan_surf = pygame.Surface((self.width, self.height))
         if image.img_colour is not None:
@@ -131,13 +266,30 @@ class Simulation:
 
     def stop(self):
         self.running = False
+        if self.worker is not None:
+            self.worker.stop()
+        if self.background is not None:
+            self.background.shutdown()
+            self.background = None
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.offscreen is not None:
+            self.offscreen.close()
+        self.metrics.close()
+        if self.extractor is not None:
+            self.extractor.stop()
+        self.jw.flush()
+        if self.world is not None:
+            self.world.debug_artifacts.flush()
 
     def run_ant_simulation(self,
                            image_path,
                            image_path_filtered,
                            threshold=200,  # if pixel >= threshold => empty, else wall
                            num_ants=20,
-                           allow_revisit=False
+                           allow_revisit=False,
+                           event_log=None,
+                           metrics_log=None
                            ):
         self.wf.set_num_ants(num_ants)
         img_scanner = ImageParser()
@@ -145,6 +297,10 @@ class Simulation:
         # 1) Load grayscale
         self.init_world(img_scanner)
         self.world.init_ants()
+        if event_log is not None:
+            self.record_events(event_log)
+        if metrics_log is not None:
+            self.write_metrics(metrics_log)
 
         # 3) Init Pygame with the *exact* dimensions as the image
         pygame.init()
@@ -163,20 +319,58 @@ class Simulation:
                 else:
                     self.floorplan_surf.set_at((x, y), (0, 0, 0))  # black => wall
 
-        # 7) Zoom parameters
+        # 7) The agents run on their own thread, the window draws their latest frame
         self.running = True
+        self.worker = SimulationWorker(self)
+        self.worker.start()
         while self.running:
-            dt = clock.tick(120)  # up to 30 FPS
+            clock.tick(120)  # up to 120 FPS
 
-            # --- Update ants (simple example) ---
-            self.run()
             self.view.run()
-
             self.view.draw()
-            for task in self.tasks:
-                task["accumulator"] += dt
-                if task["accumulator"] >= task["interval"]:
-                    task["command"]()
-                    task["accumulator"] = 0
+        self.worker.stop()
         pygame.quit()
         print("All done!")
+
+    def run_headless(self,
+                     image_path,
+                     ticks,
+                     threshold=200,
+                     num_ants=20,
+                     frames=None,
+                     frame_every=50,
+                     event_log=None,
+                     metrics_log=None
+                     ):
+        """
+        Run `ticks` ticks without a window, e.g. for batch runs. The blueprint is saved on the
+        usual interval and once more at the end. With `frames` the run is still drawn every
+        `frame_every` ticks, to a directory of PNGs or a .mp4/.avi video.
+        """
+        self.wf.set_num_ants(num_ants)
+        img_scanner = ImageParser()
+        img_scanner.init(image_path, threshold)
+        self.init_world(img_scanner)
+        self.world.init_ants()
+        if event_log is not None:
+            self.record_events(event_log)
+        if metrics_log is not None:
+            self.write_metrics(metrics_log)
+        if frames is not None:
+            # Fonts only, no display is opened
+            pygame.font.init()
+            self.render_offscreen(frames, frame_every)
+
+        self.running = True
+        last = time.perf_counter()
+        while self.running and self.tick < ticks:
+            self.run()
+            now = time.perf_counter()
+            self.run_tasks((now - last) * 1000)
+            last = now
+        # The blueprint of the final state, also for runs shorter than the save interval
+        self.save_blue_print()
+        self.extractor.wait()
+        self.extractor.run_pending()
+        self.metrics.sample()
+        self.stop()
@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+
+
+class FrameSnapshot:
+    """
+    Immutable state of the simulation between two ticks, everything the renderer reads.
+
+    Taken on the simulation thread, so the agents, counters and inspection agree with each
+    other, and only read by the renderer afterwards.
+    """
+
+    def __init__(self, simulation):
+        world = simulation.world
+        self.tick = simulation.tick
+        self.agent_count = len(world.agents)
+        self.wall_segment_count = len(world.wall_segments)
+        self.blob_count = len(world.blobs)
+        self.intersections = tuple(simulation.get_intersections())
+        self.agents = tuple(a.snapshot() for a in world.agents if a.alive)
+        self.inspection = simulation.view.inspect()
+        # The registry's latest sample, replaced rather than changed by the next one
+        self.metrics = simulation.metrics.latest
+
+
+class SimulationWorker:
+    """
+    Runs the agent loop and the periodic tasks on their own thread, as fast as it goes.
+
+    The renderer asks for frames with get_frame() at its own rate. A frame is only taken
+    after a tick in which one was asked for, and at most every FRAME_INTERVAL seconds, so
+    the simulation does not pay for snapshots nobody sees. UI commands reach the simulation
+    through Simulation.submit(), they run between two ticks.
+    """
+    FRAME_INTERVAL = 1 / 60
+
+    def __init__(self, simulation, clock=time.monotonic):
+        """
+        Args:
+            simulation: the Simulation to run.
+            clock: returns seconds, advances the periodic tasks and paces the frames.
+        """
+        self.simulation = simulation
+        self.clock = clock
+        self.frame = None
+        self.frame_time = None
+        self.frame_wanted = threading.Event()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.frame_wanted.set()
+        self.thread = threading.Thread(target=self._work, name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def get_frame(self):
+        """
+        Latest frame, None before the first one. Asks for a new one after the next tick.
+        """
+        self.frame_wanted.set()
+        return self.frame
+
+    def step(self, dt):
+        """
+        One tick: the agents, then the tasks that are due after `dt` milliseconds.
+        """
+        self.simulation.run()
+        self.simulation.run_tasks(dt)
+        if not self.frame_wanted.is_set():
+            return
+        now = self.clock()
+        if self.frame_time is None or now - self.frame_time >= self.FRAME_INTERVAL:
+            self.frame_wanted.clear()
+            self.frame = self.simulation.take_frame()
+            self.frame_time = now
+
+    def _work(self):
+        last = self.clock()
+        try:
+            while self.running:
+                now = self.clock()
+                self.step((now - last) * 1000)
+                last = now
+        except Exception:
+            logging.exception("Simulation thread stopped")
+            self.running = False
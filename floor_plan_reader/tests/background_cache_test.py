@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+import pygame
+
+from floor_plan_reader.display.background_cache import BackgroundCache
+from floor_plan_reader.display.view_point import ViewPoint
+
+
+def checkerboard(width, height):
+    surface = pygame.Surface((width, height))
+    for y in range(height):
+        for x in range(width):
+            surface.set_at((x, y), (255, 255, 255) if (x // 4 + y // 4) % 2 else (0, 0, 0))
+    return surface
+
+
+class TestBackgroundCache(unittest.TestCase):
+    def setUp(self):
+        self.source = checkerboard(64, 48)
+        self.vp = ViewPoint()
+        self.vp.zoom_factor = 2
+        self.vp.set_position((-10, -5))
+
+    def expected(self, size):
+        screen = pygame.Surface(size)
+        scaled = pygame.transform.smoothscale(self.source, (128, 96))
+        screen.blit(scaled, self.vp.get_center())
+        return screen
+
+    def test_scaled_once_per_zoom(self):
+        smoothscale = mock.Mock(wraps=pygame.transform.smoothscale)
+        cache = BackgroundCache(smoothscale)
+        for _ in range(3):
+            screen = pygame.Surface((50, 40))
+            cache.draw(screen, self.source, (64, 48), self.vp)
+        self.assertEqual(1, smoothscale.call_count)
+        self.assertEqual(pygame.image.tobytes(self.expected((50, 40)), "RGB"), pygame.image.tobytes(screen, "RGB"))
+
+    def test_window_path_covers_the_screen(self):
+        cache = BackgroundCache()
+        cache.MAX_CACHED_PIXELS = 100
+        screen = pygame.Surface((50, 40))
+        cache.draw(screen, self.source, (64, 48), self.vp)
+        expected = self.expected((50, 40))
+        # Scaling a sub-rectangle only differs from the full image at its border
+        for point in ((38, 28), (46, 35)):
+            self.assertEqual(expected.get_at(point), screen.get_at(point))
+        self.assertEqual(0, len(cache.scaled))
+
+
+class TestViewPointCulling(unittest.TestCase):
+    def test_visible_bounds(self):
+        vp = ViewPoint()
+        vp.zoom_factor = 2
+        vp.set_position((-100, -50))
+        visible = vp.visible_bounds(200, 100)
+        self.assertEqual((100, 50, 200, 100), visible)
+        self.assertTrue(ViewPoint.is_visible((190, 90, 250, 95), visible))
+        self.assertFalse(ViewPoint.is_visible((201, 60, 250, 95), visible))
+        self.assertTrue(ViewPoint.is_visible(None, visible))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+import numpy as np
+from shapely import LineString
+
+from floor_plan_reader.blueprint_extractor import BlueprintExtractor, WorldSnapshot
+from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.world_factory import WorldFactory
+
+
+class TestBlueprintExtractor(unittest.TestCase):
+    def setUp(self):
+        wf = WorldFactory()
+        wf.set_grid(np.zeros((400, 400), dtype=int))
+        self.world = wf.create_World()
+        self.results = []
+        self.extractor = BlueprintExtractor(self.results.append)
+
+    def tearDown(self):
+        self.extractor.stop()
+
+    def create_segment(self, coords):
+        seg = self.world.create_wall_segment()
+        seg.collision_box = CollisionBox.create_from_line(LineString(coords), 4)
+        seg.collision_box_extended = seg.collision_box.copy()
+        return seg
+
+    def test_results_are_applied_on_run_pending(self):
+        self.create_segment([(50, 100), (250, 100)])
+        self.create_segment([(100, 50), (100, 150)])
+
+        self.extractor.submit(self.world)
+        self.extractor.wait()
+        # Nothing reaches the live world before the main loop drains the queue
+        self.assertEqual([], self.results)
+        self.assertEqual(0, len(self.world.model.nodes))
+
+        self.extractor.run_pending()
+        self.assertEqual(1, len(self.results))
+        self.assertEqual([(100, 100)], [n.point for n in self.results[0]["model"].get_nodes()])
+
+    def test_result_shares_nothing_with_the_worker(self):
+        self.create_segment([(50, 100), (250, 100)])
+        self.create_segment([(100, 50), (100, 150)])
+        self.extractor.submit(self.world)
+        self.extractor.wait()
+        self.extractor.run_pending()
+
+        worker = self.extractor.world.model
+        model = self.results[0]["model"]
+        self.assertIsNot(worker, model)
+        node = next(iter(model.get_nodes()))
+        self.assertNotIn(id(node), {id(n) for n in worker.get_nodes()})
+        # Intersections are the model's own copies
+        self.assertIs(node, self.results[0]["intersections"][0])
+        for e in model.get_edges():
+            self.assertIsNone(e.line.seg)
+            self.assertIn(id(e.node_a), {id(n) for n in model.get_nodes()})
+            self.assertNotIn(id(e), {id(w) for w in worker.get_edges()})
+        self.assertTrue(all(l.seg is None for l in self.results[0]["lines"]))
+
+    def test_snapshot_is_detached_from_the_world(self):
+        seg = self.create_segment([(50, 100), (250, 100)])
+        self.extractor.submit(self.world)
+        seg.collision_box_extended = CollisionBox.create_from_line(LineString([(0, 0), (10, 0)]), 4)
+        self.world.occupied[0, 0] = 7
+
+        self.extractor.wait()
+        self.extractor.run_pending()
+        line = self.results[0]["lines"][0]
+        self.assertEqual(((50, 100), (250, 100)), (line.start_point, line.end_point))
+        self.assertEqual(0, self.extractor.world.occupied[0, 0])
+
+    def test_later_snapshots_copy_only_written_tiles(self):
+        self.create_segment([(50, 100), (250, 100)])
+        self.extractor.submit(self.world)
+        self.extractor.wait()
+
+        agent = type("Agent", (), {"id": 9})()
+        self.world.occupy(70, 130, agent)
+        self.world.occupy(300, 20, agent)
+        snapshot = WorldSnapshot(self.world, self.extractor.mutations)
+        self.assertIsNone(snapshot.grids)
+        self.assertEqual({(2, 1), (0, 4)}, set(snapshot.tiles))
+
+        # A snapshot dropped before the worker got to it hands its tiles on
+        self.world.occupy(380, 390, agent)
+        later = WorldSnapshot(self.world, self.extractor.mutations)
+        later.follow(snapshot)
+        self.assertEqual({(2, 1), (0, 4), (6, 5)}, set(later.tiles))
+        self.extractor.extract(later)
+        np.testing.assert_array_equal(self.world.occupied, self.extractor.world.occupied)
+        self.assertEqual(3, self.extractor.world.count_in_box(CollisionBox(200, 200, 400, 400, 0),
+                                                              self.extractor.world.OCCUPIED))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+import random
+import unittest
+
+import numpy as np
+from shapely import Polygon, Point
+
+from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.math.collision_box_array import CollisionBoxArray
+
+
+class TestCollisionBoxArray(unittest.TestCase):
+    def setUp(self):
+        random.seed(7)
+        self.boxes = []
+        for _ in range(200):
+            self.boxes.append(CollisionBox(random.randint(0, 300) + 0.5 * random.randint(0, 1),
+                                           random.randint(0, 300),
+                                           random.randint(2, 10),
+                                           random.randint(2, 80),
+                                           random.choice([0, 45, 90, 135, 180, 225, 270, 315])))
+        self.array = CollisionBoxArray.from_boxes(self.boxes)
+
+    def test_corners_match_collision_box(self):
+        corners = self.array.corners()
+        for i, b in enumerate(self.boxes):
+            with self.subTest(box=i):
+                self.assertEqual([tuple(c) for c in corners[i].tolist()], b.calculate_corners())
+
+    def test_directions_match_collision_box(self):
+        directions = self.array.directions()
+        normals = self.array.normals()
+        for i, b in enumerate(self.boxes):
+            d, n = b.derive_direction_and_normal()
+            self.assertEqual(tuple(directions[i]), d.direction)
+            self.assertEqual(tuple(normals[i]), n.direction)
+
+    def test_overlap_ratios_match_shapely(self):
+        a = np.arange(len(self.boxes))
+        b = a[::-1].copy()
+        ratios = self.array.overlap_ratios(a, b)
+        for i, j, r in zip(a, b, ratios):
+            pa = Polygon(self.boxes[i].calculate_corners())
+            pb = Polygon(self.boxes[j].calculate_corners())
+            expected = pa.intersection(pb).area / self.boxes[i].get_area()
+            self.assertAlmostEqual(expected, r, places=6)
+
+    def test_point_containment(self):
+        array = CollisionBoxArray()
+        array.append(10, 10, 4, 10, 0)
+        array.append(10, 10, 4, 10, 90)
+        inside = array.contains_points([(10, 10), (14, 10), (10, 14), (30, 30)])
+        self.assertEqual([True, True, False, False], inside[0].tolist())
+        self.assertEqual([True, False, True, False], inside[1].tolist())
+        self.assertEqual([0, 1], array.boxes_containing(10, 10).tolist())
+
+    def test_parallel_diagonal_overlap_matches_shapely(self):
+        # Rounded 45 degree corners are not always a rectangle on the box axes
+        for i, a in enumerate(self.boxes):
+            b = a.copy()
+            b.set_position(a.center_x + random.randint(-3, 3), a.center_y + random.randint(-3, 3))
+            b.set_width(random.randint(2, 10))
+            pa = Polygon(a.calculate_corners())
+            pb = Polygon(b.calculate_corners())
+            expected = pa.intersection(pb).area
+            with self.subTest(box=i):
+                self.assertAlmostEqual(expected, a.calculate_overlap(b), places=6)
+                self.assertAlmostEqual(expected, CollisionBoxArray.from_boxes([a, b]).overlap_areas([0], [1])[0],
+                                       places=6)
+
+    def test_strict_containment_matches_shapely(self):
+        points = [(x + 0.5 * (x % 2), y) for x in range(0, 300, 7) for y in range(0, 300, 7)]
+        for i, b in enumerate(self.boxes[:50]):
+            polygon = Polygon(b.calculate_corners())
+            expected = [polygon.contains(Point(x, y)) for x, y in points]
+            with self.subTest(box=i):
+                self.assertEqual(expected, [b.is_point_inside(x, y) for x, y in points])
+                self.assertEqual(expected, b.points_inside(points).tolist())
+
+    def test_view_writes_through(self):
+        array = CollisionBoxArray()
+        array.append(0, 0, 2, 4, 0)
+        box = array.view(0)
+        box.set_position(5, 6)
+        box.rotation = 90
+        self.assertEqual([5.0, 6.0], array.centers[0].tolist())
+        self.assertEqual(90, array.rotations[0])
+        standalone = CollisionBox(1, 2, 3, 4, 45)
+        index = array.attach(standalone)
+        self.assertIs(standalone.store, array)
+        self.assertEqual(standalone.calculate_corners(), [tuple(c) for c in array.corners([index])[0].tolist()])
+
+
+    def test_standalone_boxes_drop_derived_values_on_writes(self):
+        box = CollisionBox(10, 10, 2, 8, 0)
+        self.assertIsNone(box.store)
+        before = box.calculate_corners()
+        box.rotation = 90
+        self.assertNotEqual(before, box.calculate_corners())
+        box.width = 6
+        self.assertEqual(CollisionBox(10, 10, 6, 8, 90).calculate_corners(), box.calculate_corners())
+        copy = box.copy()
+        copy.set_position(20, 20)
+        self.assertEqual((10, 10), box.get_center())
+
+
+if __name__ == "__main__":
+    unittest.main()
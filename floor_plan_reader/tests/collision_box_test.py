@@ -3,6 +3,7 @@ import unittest
 import math
 
 from floor_plan_reader.display.point import Point
+from floor_plan_reader.math.Constants import Constants
 from floor_plan_reader.math.collision_box import CollisionBox
 from floor_plan_reader.math.vector import Vector
 
@@ -79,6 +80,27 @@ class TestLineDistanceCalculations(unittest.TestCase):
 
 
 
+    def test_vector_is_immutable_and_caches_forms(self):
+        v = Vector((3, 4))
+        with self.assertRaises(AttributeError):
+            v.direction = (1, 1)
+        self.assertIs(v.normalize(), v.normalize())
+        self.assertIs(v.get_normal(), v.get_normal())
+        self.assertIs(v.opposite().opposite(), v)
+        self.assertEqual((0.6, 0.8), v.normalize().direction)
+        self.assertEqual((6, 8), v.scale(2).direction)
+        self.assertEqual((3, 4), v.direction)
+        self.assertEqual((4, 5), Vector.madd_t((1, 1), v.direction, 1))
+        out = [1, 1]
+        Vector.madd_into(out, v.direction, 2)
+        self.assertEqual([7, 9], out)
+
+    def test_direction_lookup_without_rounding(self):
+        for angle, v in Constants.DIRECTIONS_8.items():
+            self.assertEqual(angle, Constants.vector_to_angle(v))
+            self.assertIs(Constants.DIRECTIONS_8[(angle + 90) % 360], v.get_normal())
+        self.assertEqual(45, Constants.vector_to_angle(Vector((0.7071068, 0.7071068))))
+
     def test_move_forward(self):
         cb = CollisionBox(center_x=0, center_y=0, width=2, length=4, rotation=0)
         cb.move_forward(5)
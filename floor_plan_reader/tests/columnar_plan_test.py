@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from floor_plan_reader.model.columnar_plan import ColumnarPlan
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "resources")
+
+
+class TestColumnarPlan(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(RESOURCES, "experiment_floorplan_diag.json"), "r") as f:
+            self.data = json.load(f)
+
+    def test_round_trip_through_disk(self):
+        plan = ColumnarPlan.from_floorplan_dict(self.data)
+        with tempfile.TemporaryDirectory() as tmp:
+            plan.save(tmp)
+            loaded = ColumnarPlan.load(tmp)
+            self.assertIsInstance(loaded.node_xy, np.memmap)
+            self.assertEqual(self.data, loaded.to_floorplan_dict())
+            del loaded
+
+    def test_doors_keep_their_kind(self):
+        with open(os.path.join(RESOURCES, "house_test.json"), "r") as f:
+            data = json.load(f)
+        plan = ColumnarPlan.from_floorplan_dict(data)
+        self.assertEqual([e.get("openings", []) for e in data["edges"]],
+                         [e["openings"] for e in plan.to_floorplan_dict()["edges"]])
+        edge = next(i for i, e in enumerate(data["edges"]) if e.get("openings"))
+        self.assertEqual(data["edges"][edge]["openings"], plan.opening_dicts(plan.openings_of(edge)))
+
+    def test_loads_version_1(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ColumnarPlan.from_floorplan_dict(self.data).save(tmp)
+            os.remove(os.path.join(tmp, "opening_sub_type.npy"))
+            with open(os.path.join(tmp, "meta.json"), "r") as f:
+                meta = json.load(f)
+            meta["version"] = 1
+            meta["columns"].remove("opening_sub_type")
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            self.assertEqual(self.data, ColumnarPlan.load(tmp, mmap=False).to_floorplan_dict())
+
+    def test_is_up_to_date(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "plan.json")
+            directory = os.path.join(tmp, "plan.columnar")
+            self.assertFalse(ColumnarPlan.is_up_to_date(directory, source))
+            with open(source, "w") as f:
+                json.dump(self.data, f)
+            ColumnarPlan.from_floorplan_dict(self.data).save(directory)
+            os.utime(source, (1000, 1000))
+            self.assertTrue(ColumnarPlan.is_up_to_date(directory, source))
+            # The JSON was edited after the columnar plan was written
+            meta = os.path.join(directory, "meta.json")
+            os.utime(source, (os.path.getmtime(meta) + 10,) * 2)
+            self.assertFalse(ColumnarPlan.is_up_to_date(directory, source))
+
+    def test_transformed(self):
+        plan = ColumnarPlan.from_floorplan_dict(self.data).transformed(0.5, (10, 20), flip_y=True)
+        result = plan.to_floorplan_dict()
+        for before, after in zip(self.data["nodes"], result["nodes"]):
+            self.assertEqual(before["x"] * 0.5 + 10, after["x"])
+            self.assertEqual(before["y"] * -0.5 + 20, after["y"])
+        for before, after in zip(self.data["edges"], result["edges"]):
+            self.assertEqual([o["width"] * 0.5 for o in before["openings"]], [o["width"] for o in after["openings"]])
+
+    def test_rejects_newer_versions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ColumnarPlan.from_floorplan_dict(self.data).save(tmp)
+            with open(os.path.join(tmp, "meta.json"), "r") as f:
+                meta = json.load(f)
+            meta["version"] += 1
+            with open(os.path.join(tmp, "meta.json"), "w") as f:
+                json.dump(meta, f)
+            with self.assertRaises(ValueError):
+                ColumnarPlan.load(tmp)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,54 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from floor_plan_reader.debug_artifacts import DebugArtifacts
+from floor_plan_reader.tests.fixtures import create_world, food_grid
+
+
+class TestDebugArtifacts(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "debug")
+        grid = food_grid()
+        grid[:, :5] = 0
+        self.world = create_world(grid)
+        self.world.debug_artifacts = DebugArtifacts(self.path, budget=3)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def files(self):
+        self.world.debug_artifacts.flush()
+        return sorted(os.listdir(self.path))
+
+    def test_same_key_is_written_once(self):
+        for _ in range(5):
+            self.world.print_snapshot(10, 10, 6, 6, "blob", key=(7, "blob"))
+        self.world.print_snapshot(12, 10, 6, 6, "blob", key=(8, "blob"))
+        self.assertEqual(["blob_6x6_10_10.png", "blob_6x6_12_10.png"], self.files())
+        self.assertEqual(4, self.world.debug_artifacts.dropped)
+
+    def test_budget_per_run(self):
+        for x in range(10, 16):
+            self.world.print_snapshot(x, 10, 4, 4, "region")
+        self.assertEqual(3, len(self.files()))
+        self.assertEqual(3, self.world.debug_artifacts.written)
+        self.assertEqual(3, self.world.debug_artifacts.dropped)
+
+    def test_occupancy_colours(self):
+        self.world.occupied[10, 6] = 3
+        self.world.print_occupancy_status(6, 10, 4, 4, "test")
+        image = np.asarray(Image.open(os.path.join(self.path, self.files()[0])))
+        # Region x 4..7, y 8..11: x 4 is a wall, (6, 10) occupied, the rest free
+        expected = np.zeros((4, 4, 3), dtype=np.uint8)
+        expected[:, 1:] = [255, 0, 0]
+        expected[2, 2] = [0, 255, 0]
+        np.testing.assert_array_equal(expected, image)
+
+
+if __name__ == "__main__":
+    unittest.main()
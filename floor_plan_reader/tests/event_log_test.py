@@ -0,0 +1,100 @@
+import os
+import random
+import tempfile
+import unittest
+
+import numpy as np
+
+from floor_plan_reader.event_log import EventLog, EventLogWriter
+from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.tests.fixtures import create_world
+
+
+class FakeAgent:
+    def __init__(self, agent_id):
+        self.id = agent_id
+        self.alive = True
+        self.state = "born"
+        self.collision_box = None
+
+    def get_state(self):
+        return self.state
+
+    def get_collision_box(self):
+        return self.collision_box
+
+
+class TestEventLog(unittest.TestCase):
+    def setUp(self):
+        self.world = create_world()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "run.evlog")
+        self.recorded = {}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def record(self, writer, tick):
+        writer.record(tick)
+        agents = {a.id: ["other", a.state, None if a.collision_box is None else (
+            a.collision_box.center_x, a.collision_box.center_y, a.collision_box.width, a.collision_box.length,
+            a.collision_box.rotation)] for a in self.world.agents if a.alive}
+        self.recorded[tick] = (self.world.grid.copy(), self.world.occupied.copy(), agents)
+
+    def test_replays_every_tick(self):
+        writer = EventLogWriter(self.path, self.world, keyframe_interval=3)
+        a, b = FakeAgent(1), FakeAgent(2)
+        self.world.agents.add(a)
+        self.world.occupy(3, 4, a)
+        self.record(writer, 1)
+
+        a.state = "grow"
+        a.collision_box = CollisionBox(5.5, 6, 2, 10, 90)
+        self.world.occupy(4, 4, a)
+        self.record(writer, 2)
+
+        self.record(writer, 3)
+
+        self.world.agents.add(b)
+        b.collision_box = CollisionBox(1, 2, 3, 4, 45)
+        self.world.free(3, 4)
+        self.world.draw_at((7, 8), 0)
+        self.record(writer, 5)
+
+        a.alive = False
+        self.world.occupy(9, 9, b)
+        self.record(writer, 6)
+
+        b.state = "done"
+        self.world.reset_coverage()
+        self.record(writer, 7)
+        writer.close()
+        self.assertIsNone(self.world.journal)
+
+        log = EventLog(self.path)
+        # Tick 1, tick 5 (three ticks after the first) and tick 7 (grids replaced) are keyframes
+        self.assertEqual([1, 5, 7], [tick for tick, _ in log.keyframes])
+        self.assertEqual(7, log.last_tick())
+        ticks = list(self.recorded) * 2
+        random.Random(4).shuffle(ticks)
+        for tick in ticks:
+            grid, occupied, agents = self.recorded[tick]
+            state = log.state_at(tick)
+            np.testing.assert_array_equal(grid, state.grid)
+            np.testing.assert_array_equal(occupied, state.occupied)
+            self.assertEqual(agents, state.agents)
+        log.close()
+
+    def test_quiet_ticks_write_nothing(self):
+        writer = EventLogWriter(self.path, self.world)
+        self.world.agents.add(FakeAgent(1))
+        self.record(writer, 1)
+        size = writer.file.tell()
+        for tick in range(2, 50):
+            writer.record(tick)
+        self.assertEqual(size, writer.file.tell())
+        writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
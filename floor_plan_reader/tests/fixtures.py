@@ -0,0 +1,53 @@
+import numpy as np
+
+from floor_plan_reader.simulation import Simulation
+from floor_plan_reader.world_factory import WorldFactory
+
+
+class FakeClock:
+    """
+    Monotonic clock the tests move forward by hand through `now`.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeWall:
+    """
+    Stands in for a wall Mushroom where only its id, blob and state are read.
+    """
+
+    def __init__(self, agent_id=7, blob=None):
+        self.id = agent_id
+        self.blob = blob
+        self.wall_segment = None
+
+    def get_state(self):
+        return "done"
+
+
+def food_grid():
+    """
+    The 30 x 20 grid of food most world tests start from.
+    """
+    return np.ones((20, 30), dtype=np.uint8)
+
+
+def create_world(grid=None):
+    wf = WorldFactory()
+    wf.set_grid(food_grid() if grid is None else grid)
+    return wf.create_World()
+
+
+def create_simulation(grid=None):
+    """
+    A Simulation over a world of `grid`, food_grid() by default; call stop() when done.
+    """
+    simulation = Simulation()
+    simulation.wf.set_grid(food_grid() if grid is None else grid)
+    simulation.world = simulation.wf.create_World()
+    return simulation
@@ -0,0 +1,56 @@
+import unittest
+
+from floor_plan_reader.cell import Cell
+from floor_plan_reader.display.glyph_atlas import GlyphAtlas
+from floor_plan_reader.display.popup_menu import Inspection
+from floor_plan_reader.tests.fixtures import FakeWall, create_world
+
+
+class TestInspection(unittest.TestCase):
+    def setUp(self):
+        self.world = create_world()
+        self.blob = self.world.create_blob(5, 5)
+        for x in range(5, 12):
+            for y in range(5, 10):
+                self.blob.cells.add(Cell(x, y))
+        self.wall = FakeWall(blob=self.blob)
+
+    def test_snapshots_are_reused_until_their_grid_changes(self):
+        first = Inspection(self.wall, None)
+        second = Inspection(self.wall, None, first)
+        self.assertIs(first.grid_snapshot, second.grid_snapshot)
+        self.assertIs(first.occupied_snapshot, second.occupied_snapshot)
+        self.assertIs(first.bounding_box, second.bounding_box)
+
+        self.world.occupy(7, 7, self.wall)
+        third = Inspection(self.wall, None, second)
+        self.assertIs(second.grid_snapshot, third.grid_snapshot)
+        self.assertIsNot(second.occupied_snapshot, third.occupied_snapshot)
+
+        self.blob.cells.add(Cell(13, 5))
+        fourth = Inspection(self.wall, None, third)
+        self.assertIsNot(third.grid_snapshot, fourth.grid_snapshot)
+        self.assertEqual(13, fourth.bounding_box.max_x)
+
+
+class TestGlyphAtlas(unittest.TestCase):
+    def test_text_is_rendered_once(self):
+        atlas = GlyphAtlas()
+        label = atlas.render("s: 0.50", 12, (15, 255, 0))
+        self.assertIs(label, atlas.render("s: 0.50", 12, (15, 255, 0)))
+        self.assertIsNot(label, atlas.render("s: 0.50", 16, (15, 255, 0)))
+        self.assertEqual(2, len(atlas.fonts))
+
+    def test_least_recently_used_text_is_dropped(self):
+        atlas = GlyphAtlas()
+        atlas.MAX_TEXTS = 2
+        first = atlas.render("a", 12, (0, 0, 0))
+        atlas.render("b", 12, (0, 0, 0))
+        atlas.render("a", 12, (0, 0, 0))
+        atlas.render("c", 12, (0, 0, 0))
+        self.assertIs(first, atlas.render("a", 12, (0, 0, 0)))
+        self.assertNotIn((None, 12, "b", (0, 0, 0)), atlas.texts)
+
+
+if __name__ == "__main__":
+    unittest.main()
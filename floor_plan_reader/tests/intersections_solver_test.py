@@ -0,0 +1,102 @@
+import queue
+import random
+import unittest
+
+import numpy as np
+from shapely import LineString
+
+from floor_plan_reader.agents.wall_segment import WallSegment
+from floor_plan_reader.blueprint_extractor import SegmentSnapshot
+from floor_plan_reader.intersections_solver import IntersectionSolver
+from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.model.line import Line
+from floor_plan_reader.world_factory import WorldFactory
+
+
+class TestIntersectionSolver(unittest.TestCase):
+    def setUp(self):
+        wf = WorldFactory()
+        wf.set_grid(np.zeros((400, 400), dtype=int))
+        self.world = wf.create_World()
+
+    def create_segment(self, seg_id, coords):
+        seg = WallSegment(seg_id, self.world)
+        seg.collision_box = CollisionBox.create_from_line(LineString(coords), 4)
+        seg.collision_box_extended = seg.collision_box.copy()
+        return seg
+
+    @staticmethod
+    def snapshots(segments):
+        # The solver runs on snapshots, as in the BlueprintExtractor
+        return [SegmentSnapshot(seg, queue.Queue()) for seg in segments]
+
+    def test_nodes_and_edges(self):
+        horizontal = self.create_segment(1, [(50, 100), (250, 100)])
+        left = self.create_segment(2, [(100, 50), (100, 150)])
+        right = self.create_segment(3, [(200, 50), (200, 150)])
+        solver = IntersectionSolver(self.world)
+
+        result = solver.build_lines_and_intersections(self.snapshots([horizontal, left, right]))
+
+        points = sorted(n.point for n in result["intersections"])
+        self.assertEqual([(100, 100), (200, 100)], points)
+        edges = [e for e in result["edges"] if e.seg_id == horizontal.id]
+        self.assertEqual(1, len(edges))
+        self.assertEqual({(100, 100), (200, 100)}, {edges[0].node_a.point, edges[0].node_b.point})
+
+    def test_incremental_updates(self):
+        horizontal = self.create_segment(1, [(50, 100), (250, 100)])
+        left = self.create_segment(2, [(100, 50), (100, 150)])
+        right = self.create_segment(3, [(200, 50), (200, 150)])
+        segments = [horizontal, left, right]
+        solver = IntersectionSolver(self.world)
+        solver.build_lines_and_intersections(self.snapshots(segments))
+
+        # Nothing changed: nothing is rebuilt
+        result = solver.build_lines_and_intersections(self.snapshots(segments))
+        self.assertEqual([], result["dirty_lines"])
+        self.assertEqual(2, len(self.world.model.nodes))
+
+        # Move the right wall: its old node goes away, the new one replaces it
+        right.collision_box_extended = CollisionBox.create_from_line(LineString([(150, 50), (150, 150)]), 4)
+        right.mark_dirty()
+        result = solver.build_lines_and_intersections(self.snapshots(segments))
+        self.assertEqual([right.id], [l.seg.id for l in result["dirty_lines"]])
+        self.assertEqual([(200, 100)], [n.point for n in result["removed_intersections"]])
+        self.assertEqual({(100, 100), (150, 100)}, {n.point for n in self.world.model.get_nodes()})
+        self.assertEqual({(100, 100), (150, 100)}, {n.point for n in solver.lines[horizontal.id].seg.nodes})
+
+        # A dead segment takes its nodes and its edge with it
+        left.kill()
+        solver.build_lines_and_intersections(self.snapshots(segments))
+        self.assertEqual({(150, 100)}, {n.point for n in self.world.model.get_nodes()})
+        self.assertEqual(set(), {e.seg_id for e in self.world.model.get_edges()})
+
+    def test_intersect_pairs_matches_pairwise_shapely(self):
+        random.seed(5)
+        lines = []
+        for i in range(150):
+            x, y = random.randint(0, 300), random.randint(0, 300)
+            dx, dy = random.choice([(1, 0), (0, 1), (1, 1), (1, -1)])
+            length = random.randint(5, 80)
+            geometry = LineString([(x, y), (x + dx * length, y + dy * length)])
+            lines.append(Line(geometry.coords[0], geometry.coords[-1], f"L{i}", None, geometry))
+
+        expected = []
+        for i in range(len(lines)):
+            for j in range(i + 1, len(lines)):
+                inter = lines[i].geometry.intersection(lines[j].geometry)
+                if not inter.is_empty:
+                    expected.append((i, j, IntersectionSolver._points_of(inter)))
+
+        actual = IntersectionSolver.intersect_pairs(lines)
+        self.assertEqual([(i, j) for i, j, _ in expected], [(i, j) for i, j, _ in actual])
+        for (_, _, e), (_, _, a) in zip(expected, actual):
+            self.assertEqual(len(e), len(a))
+            for (ex, ey), (ax, ay) in zip(e, a):
+                self.assertAlmostEqual(ex, ax, places=9)
+                self.assertAlmostEqual(ey, ay, places=9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import json
+import os
+import stat
+import tempfile
+import threading
+import unittest
+
+from floor_plan_reader.json_writer import JsonWriter
+from floor_plan_reader.model.columnar_plan import ColumnarPlan
+
+
+def floorplan(count):
+    nodes = [{"id": f"N{i}", "x": float(i), "y": 2.0 * i} for i in range(count)]
+    edges = [{"id": f"E{i}", "start_node": f"N{i}", "end_node": f"N{i + 1}", "wall_type": "exterior",
+              "stud_type": "2x6", "height": 2.7, "openings": []} for i in range(count - 1)]
+    return {"nodes": nodes, "edges": edges, "furnitures": []}
+
+
+class TestJsonWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.tmp.name, "plan.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_async_saves_keep_the_newest_payload(self):
+        jw = JsonWriter()
+        started = threading.Event()
+        release = threading.Event()
+        save = jw.save_floorplan_json
+
+        def blocked_save(filename, data):
+            started.set()
+            release.wait()
+            save(filename, data)
+
+        jw.save_floorplan_json = blocked_save
+        jw.save_floorplan_async(self.filename, floorplan(2))
+        started.wait()
+        # Queued while the first write runs: each replaces the one before
+        for count in range(3, 30):
+            jw.save_floorplan_async(self.filename, floorplan(count))
+        release.set()
+        jw.flush()
+
+        with open(self.filename) as f:
+            self.assertEqual(floorplan(29), json.load(f))
+        self.assertEqual(2, jw.write_count)
+        self.assertIsNotNone(jw.last_latency)
+        # Only the target is left behind, no temp files
+        self.assertEqual(["plan.json"], os.listdir(self.tmp.name))
+
+    def test_files_get_the_usual_mode(self):
+        reference = os.path.join(self.tmp.name, "reference.json")
+        open(reference, "w").close()
+        JsonWriter().save_floorplan_json(self.filename, floorplan(3))
+        self.assertEqual(stat.S_IMODE(os.stat(reference).st_mode), stat.S_IMODE(os.stat(self.filename).st_mode))
+
+    def test_sidecar(self):
+        jw = JsonWriter(sidecar=True)
+        jw.save_floorplan_json(self.filename, floorplan(4))
+
+        plan = ColumnarPlan.load(os.path.join(self.tmp.name, "plan.columnar"))
+        self.assertEqual(floorplan(4), plan.to_floorplan_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
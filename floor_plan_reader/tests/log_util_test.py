@@ -0,0 +1,47 @@
+import logging
+import unittest
+
+from floor_plan_reader.log_util import Log
+
+
+class Formatted:
+    def __init__(self):
+        self.count = 0
+
+    def __str__(self):
+        self.count += 1
+        return "formatted"
+
+
+class TestLog(unittest.TestCase):
+    def setUp(self):
+        self.log = Log("floor_plan_reader.tests.log_util")
+
+    def test_disabled_levels_do_not_format(self):
+        value = Formatted()
+        self.log.logger.setLevel(logging.INFO)
+        with self.assertLogs(self.log.logger, logging.INFO) as logs:
+            self.log.debug("value %s", value)
+            self.log.info("value %s", value)
+        # Once, for the info record
+        self.assertEqual(1, value.count)
+        self.assertEqual(["INFO:floor_plan_reader.tests.log_util:value formatted"], logs.output)
+        self.assertFalse(self.log.is_enabled(logging.DEBUG))
+
+    def test_sampling_per_call_site(self):
+        with self.assertLogs(self.log.logger, logging.INFO) as logs:
+            for i in range(10):
+                self.log.info("first %d", i, every=4)
+                self.log.info("second %d", i, every=5)
+        messages = [r.getMessage() for r in logs.records]
+        self.assertEqual(["first 0", "second 0", "first 4", "second 5", "first 8"], messages)
+
+    def test_records_point_at_the_caller(self):
+        with self.assertLogs(self.log.logger, logging.INFO) as logs:
+            self.log.info("here")
+        self.assertEqual(__file__, logs.records[0].pathname)
+        self.assertEqual("test_records_point_at_the_caller", logs.records[0].funcName)
+
+
+if __name__ == "__main__":
+    unittest.main()
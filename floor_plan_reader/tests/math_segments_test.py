@@ -0,0 +1,88 @@
+import json
+import os
+import random
+import unittest
+from itertools import permutations
+
+from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.math.math_segments import MERGE_EPSILON, merge_corners_decimal, snap_to_axis, \
+    snap_to_axis_decimal, combine_segments, combine_segments_decimal
+
+RESOURCES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+
+
+class TestMathSegments(unittest.TestCase):
+    def setUp(self):
+        with open(os.path.join(RESOURCES, "test.json"), "r") as f:
+            data = json.load(f)
+        self.boxes = [CollisionBox.from_dict(item) for item in data]
+
+    def assertBoxMatches(self, expected, box):
+        center_x, center_y, width, length = expected
+        self.assertAlmostEqual(center_x, box.center_x, delta=MERGE_EPSILON)
+        self.assertAlmostEqual(center_y, box.center_y, delta=MERGE_EPSILON)
+        self.assertAlmostEqual(width, box.width, delta=MERGE_EPSILON)
+        self.assertAlmostEqual(length, box.length, delta=MERGE_EPSILON)
+
+    def reference(self, boxes):
+        direction, normal = boxes[0].derive_direction_and_normal()
+        corners = [c for b in boxes for c in b.calculate_corners()]
+        return merge_corners_decimal(corners, direction.direction, normal.direction)
+
+    def test_merge_aligned_matches_decimal(self):
+        for a, b in permutations(self.boxes, 2):
+            with self.subTest(a=a.to_dict(), b=b.to_dict()):
+                self.assertBoxMatches(self.reference([a, b]), a.merge_aligned(b))
+
+    def test_merge_all_aligned_matches_decimal(self):
+        merged = CollisionBox.merge_all_aligned(self.boxes)
+        self.assertBoxMatches(self.reference(self.boxes), merged)
+        direction, normal = merged.derive_direction_and_normal()
+        for b in self.boxes:
+            for x, y in b.calculate_corners():
+                dx, dy = x - merged.center_x, y - merged.center_y
+                self.assertLessEqual(abs(dx * direction.dx() + dy * direction.dy()), merged.length / 2 + MERGE_EPSILON)
+                self.assertLessEqual(abs(dx * normal.dx() + dy * normal.dy()), merged.width / 2 + MERGE_EPSILON)
+
+    def test_fold_aligned_matches_pairwise_merges(self):
+        random.seed(3)
+        cases = list(permutations(self.boxes))
+        for _ in range(200):
+            rotation = random.choice([0, 45, 90, 135, 180, 270])
+            cases.append([CollisionBox(random.uniform(0, 400), random.uniform(0, 400), random.randint(2, 12),
+                                       random.randint(5, 80), rotation + random.choice([0, 180]))
+                          for _ in range(random.randint(2, 8))])
+        for boxes in cases:
+            with self.subTest(boxes=[b.to_dict() for b in boxes]):
+                folded = boxes[0].copy()
+                for b in boxes[1:]:
+                    folded = folded.merge_aligned(b)
+                self.assertEqual(folded.to_dict(), CollisionBox.fold_aligned(list(boxes)).to_dict())
+
+    def test_fold_aligned_rejects_skew_boxes(self):
+        skew = CollisionBox(0, 0, 4, 10, 45)
+        self.assertFalse(CollisionBox.fold_aligned([self.boxes[0], self.boxes[1], skew]))
+
+    def test_merge_all_aligned_rejects_skew_boxes(self):
+        skew = CollisionBox(0, 0, 4, 10, 45)
+        self.assertFalse(CollisionBox.merge_all_aligned([self.boxes[0], skew]))
+
+    def test_combine_segments_matches_decimal(self):
+        for a, b in permutations(self.boxes, 2):
+            expected = [float(v) for v in combine_segments_decimal(a, b)]
+            for e, v in zip(expected, combine_segments(a, b)):
+                self.assertAlmostEqual(e, v, delta=MERGE_EPSILON)
+
+    def test_snap_to_axis_matches_decimal(self):
+        parent = CollisionBox.merge_all_aligned(self.boxes)
+        direction, normal = parent.derive_direction_and_normal()
+        centers = [b.get_center() for b in self.boxes]
+        expected = snap_to_axis_decimal(centers, direction.direction, normal.direction, parent.get_center())
+        actual = snap_to_axis(centers, direction.direction, normal.direction, parent.get_center())
+        for (ex, ey), (x, y) in zip(expected, actual.tolist()):
+            self.assertAlmostEqual(ex, x, delta=MERGE_EPSILON)
+            self.assertAlmostEqual(ey, y, delta=MERGE_EPSILON)
+
+
+if __name__ == "__main__":
+    unittest.main()
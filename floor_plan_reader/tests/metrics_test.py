@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+import unittest
+
+from floor_plan_reader.metrics import JsonlSink, MetricsRegistry
+from floor_plan_reader.tests.fixtures import FakeClock
+
+
+class TestMetricsRegistry(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.metrics = MetricsRegistry(self.clock)
+        self.ticks = 0
+        self.writes = 0
+        self.metrics.register("queued", lambda: 3)
+        self.metrics.register_rate("ticks_per_s", lambda: self.ticks)
+        self.metrics.register_rate("writes_per_tick", lambda: self.writes, per=lambda: self.ticks)
+
+    def run_ticks(self, count, seconds, writes):
+        for _ in range(count):
+            self.ticks += 1
+            self.writes += writes
+            self.clock.now += seconds / count
+            self.metrics.tick()
+
+    def test_rates_between_samples(self):
+        self.metrics.tick()
+        self.run_ticks(8, 0.5, 2)
+        self.assertEqual({}, self.metrics.latest)
+
+        self.run_ticks(8, 0.5, 2)
+        latest = self.metrics.latest
+        self.assertEqual(3, latest["queued"])
+        self.assertAlmostEqual(16.0, latest["ticks_per_s"])
+        self.assertAlmostEqual(2.0, latest["writes_per_tick"])
+
+        self.run_ticks(32, 1.0, 5)
+        self.assertIsNot(latest, self.metrics.latest)
+        self.assertAlmostEqual(32.0, self.metrics.latest["ticks_per_s"])
+        self.assertAlmostEqual(5.0, self.metrics.latest["writes_per_tick"])
+
+    def test_samples_go_to_the_sinks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "metrics.jsonl")
+            self.metrics.add_sink(JsonlSink(path))
+            self.metrics.tick()
+            self.run_ticks(4, 2.0, 1)
+            self.run_ticks(4, 2.0, 1)
+            self.metrics.close()
+            with open(path) as f:
+                samples = [json.loads(line) for line in f]
+        # One per second
+        self.assertEqual(4, len(samples))
+        self.assertAlmostEqual(1.0, samples[-1]["writes_per_tick"])
+
+
+if __name__ == "__main__":
+    unittest.main()
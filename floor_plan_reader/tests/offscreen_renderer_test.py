@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+import pygame
+
+from floor_plan_reader.display.offscreen_renderer import OffscreenRenderer
+from floor_plan_reader.simulation import Simulation
+from floor_plan_reader.tests.fixtures import FakeClock, create_simulation
+
+
+class TestOffscreenRenderer(unittest.TestCase):
+    def setUp(self):
+        pygame.font.init()
+        self.simulation = create_simulation()
+        self.simulation.height, self.simulation.width = self.simulation.world.grid.shape
+        self.simulation.img_colour_surface = pygame.Surface((30, 20))
+        self.clock = FakeClock()
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.simulation.stop()
+        self.directory.cleanup()
+
+    def run_ticks(self, count, seconds=0.0):
+        for _ in range(count):
+            self.simulation.run()
+            self.clock.now += seconds
+
+    def test_frames_every_few_ticks(self):
+        path = os.path.join(self.directory.name, "frames")
+        self.simulation.offscreen = OffscreenRenderer(self.simulation, path, every=4, scale=2, clock=self.clock)
+        self.run_ticks(10)
+        self.assertEqual(["frame_0000001.png", "frame_0000005.png", "frame_0000009.png"], sorted(os.listdir(path)))
+        image = pygame.image.load(os.path.join(path, "frame_0000009.png"))
+        self.assertEqual((60, 40), image.get_size())
+
+    def test_rendering_stays_within_budget(self):
+        path = os.path.join(self.directory.name, "frames")
+        renderer = OffscreenRenderer(self.simulation, path, every=1, budget=0.1, clock=self.clock)
+        draw = renderer.view.render
+
+        def slow_render(surface, frame):
+            draw(surface, frame)
+            self.clock.now += 0.05
+
+        renderer.view.render = slow_render
+        self.simulation.offscreen = renderer
+        self.run_ticks(200, 0.01)
+        # 2 s of ticks and 0.05 s per frame: 4 frames plus the first one
+        self.assertEqual(5, renderer.frames)
+        self.assertLessEqual(renderer.render_time, 0.1 * (self.clock.now - renderer.started) + 0.05)
+
+
+class TestRunHeadless(unittest.TestCase):
+    IMAGE = os.path.join(os.path.dirname(__file__), "..", "test_img", "blob_43x42_688_354.png")
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.directory.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.directory.cleanup()
+
+    def test_blueprint_tasks_run(self):
+        simulation = Simulation()
+        saves = []
+        save = simulation.save_blue_print
+        simulation.save_blue_print = lambda: (saves.append(simulation.tick), save())
+        simulation.tasks[0]["command"] = simulation.save_blue_print
+        # Due on every tick
+        simulation.tasks[0]["interval"] = 0
+        simulation.run_headless(self.IMAGE, 5, num_ants=2, metrics_log="metrics.jsonl")
+        # Once per tick and once at the end
+        self.assertEqual([1, 2, 3, 4, 5, 5], saves)
+        self.assertIsNotNone(simulation.metrics.latest["blueprint_snapshot_ms"])
+        self.assertIsNotNone(simulation.metrics.latest["blueprint_extract_ms"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import pygame
+
+from floor_plan_reader.cell import Cell
+from floor_plan_reader.display.overlay_layers import OverlayLayers
+from floor_plan_reader.display.view_point import ViewPoint
+
+
+class FakeAgent:
+    def __init__(self, layer, cells):
+        self.alive = True
+        self.layer = layer
+        self.cells = set(cells)
+        self.calls = 0
+
+    def get_overlay_key(self):
+        return len(self.cells)
+
+    def get_overlay_cells(self):
+        self.calls += 1
+        return {self.layer: self.cells}
+
+
+class TestOverlayLayers(unittest.TestCase):
+    def setUp(self):
+        self.overlays = OverlayLayers((20, 30))
+
+    def colour_at(self, x, y):
+        screen = pygame.Surface((30, 20))
+        self.overlays.draw(screen, ViewPoint())
+        return tuple(screen.get_at((x, y)))[:3]
+
+    def test_cells_are_repainted_only_when_they_change(self):
+        mush = FakeAgent(OverlayLayers.ROOT_CELLS, [Cell(1, 2), Cell(3, 4)])
+        self.overlays.sync([mush])
+        self.overlays.sync([mush])
+        self.assertEqual(1, mush.calls)
+        self.assertEqual(OverlayLayers.COLOURS[OverlayLayers.ROOT_CELLS], self.colour_at(3, 4))
+
+        mush.cells.add(Cell(5, 6))
+        self.overlays.sync([mush])
+        self.assertEqual(2, mush.calls)
+        self.assertEqual(OverlayLayers.COLOURS[OverlayLayers.ROOT_CELLS], self.colour_at(5, 6))
+
+    def test_shared_cells_stay_until_every_agent_is_gone(self):
+        a = FakeAgent(OverlayLayers.ROOT_CELLS, [Cell(1, 1), Cell(2, 1)])
+        b = FakeAgent(OverlayLayers.ROOT_CELLS, [Cell(2, 1)])
+        blob = FakeAgent(OverlayLayers.BLOB_CELLS, [Cell(2, 1), Cell(7, 7), Cell(40, 40)])
+        self.overlays.sync([a, b, blob])
+        # Root cells are drawn over blob cells
+        self.assertEqual(OverlayLayers.COLOURS[OverlayLayers.ROOT_CELLS], self.colour_at(2, 1))
+
+        a.alive = False
+        self.overlays.sync([a, b, blob])
+        self.assertEqual((0, 0, 0), self.colour_at(1, 1))
+        self.assertEqual(OverlayLayers.COLOURS[OverlayLayers.ROOT_CELLS], self.colour_at(2, 1))
+
+        self.overlays.sync([blob])
+        self.assertEqual(OverlayLayers.COLOURS[OverlayLayers.BLOB_CELLS], self.colour_at(2, 1))
+        self.assertEqual(OverlayLayers.COLOURS[OverlayLayers.BLOB_CELLS], self.colour_at(7, 7))
+
+    def test_scaled_with_the_view(self):
+        self.overlays.sync([FakeAgent(OverlayLayers.FREE_SLOTS, [Cell(2, 3)])])
+        vp = ViewPoint()
+        vp.zoom_factor = 2
+        screen = pygame.Surface((60, 40))
+        self.overlays.draw(screen, vp)
+        for x, y in ((4, 6), (5, 7)):
+            self.assertEqual(OverlayLayers.COLOURS[OverlayLayers.FREE_SLOTS], tuple(screen.get_at((x, y)))[:3])
+        self.assertEqual((0, 0, 0), tuple(screen.get_at((6, 6)))[:3])
+
+
+if __name__ == "__main__":
+    unittest.main()
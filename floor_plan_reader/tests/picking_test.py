@@ -0,0 +1,56 @@
+import threading
+import unittest
+
+from floor_plan_reader.tests.fixtures import FakeWall, create_simulation
+
+
+class TestPicking(unittest.TestCase):
+    def setUp(self):
+        self.simulation = create_simulation()
+        self.world = self.simulation.world
+
+    def tearDown(self):
+        self.simulation.stop()
+
+    def add_wall(self, agent_id, cells):
+        wall = FakeWall(agent_id)
+        self.world.walls.add(wall)
+        self.world.walls_by_id[agent_id] = wall
+        for x, y in cells:
+            self.world.occupy(x, y, wall)
+        return wall
+
+    def test_walls_near_a_point(self):
+        a = self.add_wall(9, [(5, 5), (6, 5), (7, 5)])
+        b = self.add_wall(4, [(8, 7)])
+        # Occupied by an agent that is not a wall
+        self.world.occupied[5, 4] = 11
+
+        self.assertEqual([a], self.world.get_walls_near(5, 5, 0))
+        self.assertEqual([a], self.world.get_walls_near(5, 5, 1))
+        self.assertEqual([b, a], self.world.get_walls_near(6.5, 5.5, 2))
+        self.assertEqual([], self.world.get_walls_near(20, 15, 3))
+        # Windows reaching past the border are clamped
+        self.assertEqual([], self.world.get_walls_near(0, 0, 3))
+        self.assertEqual([b], self.world.get_walls_near(10, 9, 2))
+
+    def test_background_jobs_run_in_order_off_the_caller(self):
+        threads = []
+        order = []
+        for i in range(5):
+            self.simulation.run_in_background(lambda i=i: (order.append(i), threads.append(threading.get_ident())))
+        self.simulation.stop()
+        self.assertEqual(list(range(5)), order)
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_blob_rerun_result_goes_back_to_the_blob(self):
+        blob = self.world.create_blob(3, 4)
+        self.simulation.view.solve_blob(blob, [])
+        # Handed over on the simulation thread, between two ticks
+        self.assertIsNone(blob.rerun)
+        self.simulation.run_commands()
+        self.assertEqual(((), {}), blob.rerun)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+
+from floor_plan_reader.recompute_queue import RecomputeQueue
+
+
+class FakeAgent:
+    def __init__(self, name):
+        self.name = name
+        self.alive = True
+
+
+class TestRecomputeQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = RecomputeQueue()
+        self.ran = []
+
+    def action(self, name):
+        return lambda: self.ran.append(name)
+
+    def test_requests_for_one_agent_are_coalesced(self):
+        a = FakeAgent("a")
+        self.assertTrue(self.queue.push(a, self.action("first"), 1))
+        self.assertFalse(self.queue.push(a, self.action("second"), 1))
+        self.assertFalse(self.queue.push(a, self.action("third"), 5))
+        self.assertEqual(1, len(self.queue))
+        self.assertEqual(2, self.queue.coalesced)
+
+        self.assertEqual(1, self.queue.drain(10))
+        self.assertEqual(["third"], self.ran)
+
+    def test_different_kinds_for_one_agent_all_run(self):
+        a = FakeAgent("a")
+        self.assertTrue(self.queue.push(a, self.action("grow"), 2, "grow"))
+        self.assertTrue(self.queue.push(a, self.action("retrace"), 1, "retrace"))
+        self.assertFalse(self.queue.push(a, self.action("grow again"), 2, "grow"))
+        self.assertEqual(2, len(self.queue))
+        self.assertIn(a, self.queue)
+
+        self.assertEqual(2, self.queue.drain(10))
+        self.assertEqual(["grow again", "retrace"], self.ran)
+        self.assertNotIn(a, self.queue)
+
+    def test_priority_order_and_budget(self):
+        agents = [FakeAgent(name) for name in "abcd"]
+        for agent, priority in zip(agents, (1, 3, 2, 3)):
+            self.queue.push(agent, self.action(agent.name), priority)
+        agents[0].alive = False
+
+        self.assertEqual(2, self.queue.drain(2))
+        self.assertEqual(["b", "d"], self.ran)
+        self.assertEqual(1, self.queue.drain(2))
+        self.assertEqual(["b", "d", "c"], self.ran)
+        self.assertEqual(0, len(self.queue))
+
+    def test_cascade_depth(self):
+        a, b, c = FakeAgent("a"), FakeAgent("b"), FakeAgent("c")
+        self.queue.push(c, self.action("c"))
+        self.queue.push(a, lambda: self.queue.push(b, lambda: self.queue.push(c, self.action("c2"))))
+        self.queue.drain(10)
+
+        # c was queued at depth 0 and ran before the cascade reached it again
+        self.assertEqual(["c", "c2"], self.ran)
+        self.assertEqual(2, self.queue.max_depth)
+
+
+if __name__ == "__main__":
+    unittest.main()
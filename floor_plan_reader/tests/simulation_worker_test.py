@@ -0,0 +1,73 @@
+import unittest
+
+from floor_plan_reader.cell import Cell
+from floor_plan_reader.display.overlay_layers import OverlayLayers
+from floor_plan_reader.simulation_worker import SimulationWorker
+from floor_plan_reader.tests.fixtures import FakeClock, create_simulation
+
+
+class TestSimulationWorker(unittest.TestCase):
+    def setUp(self):
+        self.simulation = create_simulation()
+        self.clock = FakeClock()
+        self.worker = SimulationWorker(self.simulation, self.clock)
+        self.simulation.worker = self.worker
+
+    def test_commands_run_on_the_next_tick(self):
+        ticks = []
+        self.simulation.submit(lambda: ticks.append(self.simulation.tick))
+        self.assertEqual([], ticks)
+        self.worker.step(0)
+        self.worker.step(0)
+        self.assertEqual([0], ticks)
+        self.assertEqual(2, self.simulation.tick)
+
+    def test_frames_are_taken_when_asked_for_and_paced(self):
+        self.assertIsNone(self.worker.get_frame())
+        self.worker.step(0)
+        first = self.worker.get_frame()
+        self.assertEqual(1, first.tick)
+
+        # Asked for again too soon: the renderer keeps the previous frame
+        self.worker.step(0)
+        self.assertIs(first, self.worker.frame)
+        self.clock.now += SimulationWorker.FRAME_INTERVAL
+        self.worker.step(0)
+        self.assertEqual(3, self.worker.frame.tick)
+
+        # Not asked for since: none is taken
+        self.clock.now += 1
+        self.worker.step(0)
+        self.assertEqual(3, self.worker.frame.tick)
+
+    def test_frames_do_not_change_with_the_agents(self):
+        world = self.simulation.world
+        blob = world.create_blob(3, 4)
+        world.agents.add(blob)
+        self.worker.get_frame()
+        self.worker.step(0)
+        frame = self.worker.get_frame()
+        snapshot = frame.agents[0]
+        self.assertEqual(blob.id, snapshot.id)
+
+        blob.cells.add(Cell(5, 6))
+        blob.alive = False
+        self.assertTrue(snapshot.alive)
+        self.assertEqual(frozenset([Cell(3, 4)]), snapshot.get_overlay_cells()[OverlayLayers.BLOB_CELLS])
+
+    def test_metrics_follow_the_recompute_cascade(self):
+        queue = self.simulation.world.recompute_queue
+        agent = type("Agent", (), {"alive": True})()
+        queue.push(agent, lambda: None, kind="trace")
+        # Merged with the first request, then queues a grow one level deeper
+        queue.push(agent, lambda: queue.push(agent, lambda: None, kind="grow"), kind="trace")
+        queue.drain(10)
+
+        sample = self.simulation.metrics.sample()
+        self.assertEqual(1, sample["recompute_queue.depth"])
+        self.assertEqual(1, sample["recompute_queue.max_depth"])
+        self.assertEqual(1, sample["recompute_queue.coalesced"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+import math
+import random
+import unittest
+
+from floor_plan_reader.math.snap_index import SnapIndex
+from floor_plan_reader.model.model import Model
+
+
+class TestSnapIndex(unittest.TestCase):
+    def test_find_across_bucket_edges(self):
+        index = SnapIndex(3)
+        index.add(2.9, 2.9, "a")
+        self.assertEqual("a", index.find(3.1, 3.1))
+        self.assertEqual("a", index.find(0.0, 5.8))
+        self.assertIsNone(index.find(5.9, 2.9))
+
+    def test_find_or_add_and_remove(self):
+        index = SnapIndex(1)
+        self.assertEqual("a", index.find_or_add(10, 10, lambda: "a"))
+        self.assertEqual("a", index.find_or_add(10.5, 9.5, lambda: "b"))
+        self.assertEqual(1, len(index))
+        self.assertTrue(index.remove(10, 10, "a"))
+        self.assertIsNone(index.find(10, 10))
+        self.assertEqual(0, len(index))
+
+    def test_nearest_matches_brute_force(self):
+        random.seed(3)
+        points = [(random.uniform(0, 500), random.uniform(0, 500)) for _ in range(300)]
+        index = SnapIndex(16)
+        for i, (x, y) in enumerate(points):
+            index.add(x, y, i)
+        for _ in range(50):
+            qx, qy = random.uniform(-200, 700), random.uniform(-200, 700)
+            expected = sorted(range(len(points)), key=lambda i: math.hypot(points[i][0] - qx, points[i][1] - qy))[:5]
+            self.assertEqual(expected, [i for _, i in index.nearest(qx, qy, 5)])
+
+    def test_model_create_node_snaps_across_node_buckets(self):
+        model = Model()
+        # 2.9 and 3.1 fall in different Node.__hash__ buckets but are equal nodes
+        a = model.create_node((2.9, 10))
+        b = model.create_node((3.1, 10))
+        self.assertIs(a, b)
+        self.assertEqual(1, len(model.nodes))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+import unittest
+
+import numpy as np
+from shapely import Point, Polygon
+
+from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.math.summed_area import LayerCoverage, TiledSummedArea
+from floor_plan_reader.world import World
+
+
+class TestLayerCoverage(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(3)
+        self.layer = (self.rng.random((70, 90)) < 0.5).astype(np.int32)
+        self.coverage = LayerCoverage(self.layer.shape, lambda y0, y1, x0, x1: self.layer[y0:y1, x0:x1], tile=16)
+
+    def flip(self, count):
+        for _ in range(count):
+            x, y = int(self.rng.integers(90)), int(self.rng.integers(70))
+            self.layer[y, x] ^= 1
+            self.coverage.mark_dirty(x, y)
+
+    def test_rectangles_match_brute_force_after_writes(self):
+        for _ in range(20):
+            self.flip(15)
+            for _ in range(10):
+                x0, y0 = self.rng.integers(-5, 95), self.rng.integers(-5, 75)
+                x1, y1 = x0 + self.rng.integers(0, 40), y0 + self.rng.integers(0, 40)
+                expected = self.layer[max(y0, 0):max(y1 + 1, 0), max(x0, 0):max(x1 + 1, 0)].sum()
+                self.assertEqual(expected, self.coverage.count_rect(x0, y0, x1, y1))
+
+    def test_writes_refresh_only_their_tile(self):
+        windows = []
+
+        def cells(y0, y1, x0, x1):
+            windows.append((y0, y1, x0, x1))
+            return self.layer[y0:y1, x0:x1]
+
+        table = TiledSummedArea(self.layer.shape, cells, tile=16)
+        table.sum(0, 0, 89, 69)
+        windows.clear()
+        self.layer[20, 40] ^= 1
+        table.mark_dirty(40, 20)
+        self.assertEqual(self.layer.sum(), table.sum(0, 0, 89, 69))
+        self.assertEqual([(16, 32, 32, 48)], windows)
+
+        fresh = TiledSummedArea(self.layer.shape, lambda y0, y1, x0, x1: self.layer[y0:y1, x0:x1], tile=16)
+        fresh.refresh()
+        for name in ("local", "_down", "_across", "_totals"):
+            np.testing.assert_array_equal(getattr(fresh, name), getattr(table, name))
+
+    def test_diamonds_match_brute_force_after_writes(self):
+        ys, xs = np.mgrid[0:70, 0:90]
+        for _ in range(20):
+            self.flip(15)
+            for _ in range(10):
+                u0, v0 = self.rng.integers(0, 160), self.rng.integers(-70, 90)
+                u1, v1 = u0 + self.rng.integers(0, 40), v0 + self.rng.integers(0, 40)
+                inside = (xs + ys >= u0) & (xs + ys <= u1) & (xs - ys >= v0) & (xs - ys <= v1)
+                self.assertEqual(self.layer[inside].sum(), self.coverage.count_diamond(u0, v0, u1, v1))
+
+    def test_lines(self):
+        self.assertEqual(self.layer[10, 5:31].sum(), self.coverage.count_line((30, 10), (5, 10)))
+        diagonal = sum(self.layer[10 + i, 5 + i] for i in range(21))
+        self.assertEqual(diagonal, self.coverage.count_line((5, 10), (25, 30)))
+        self.assertIsNone(self.coverage.count_line((5, 10), (25, 20)))
+        # Longer than a tile, leaving the layer on both ends
+        anti_diagonal = sum(self.layer[70 - x, x] for x in range(1, 71))
+        self.assertEqual(anti_diagonal, self.coverage.count_line((80, -10), (-5, 75)))
+
+
+class TestWorldCoverage(unittest.TestCase):
+    def setUp(self):
+        self.world = World()
+        grid = np.zeros((60, 60), dtype=np.uint8)
+        grid[20:30, 10:50] = 1
+        self.world.set_grid(grid)
+
+    def test_box_ratios_follow_occupation(self):
+        box = CollisionBox(30, 25, 10, 40, 0)
+        self.assertEqual(1.0, self.world.coverage_ratio(box, World.FOOD))
+        self.assertEqual(0.0, self.world.coverage_ratio(box, World.OCCUPIED))
+
+        agent = type("Agent", (), {"id": 7})()
+        for x in range(10, 30):
+            for y in range(20, 30):
+                self.world.occupy(x, y, agent)
+        self.assertEqual(0.5, self.world.coverage_ratio(box, World.OCCUPIED))
+        self.assertEqual(200, self.world.count_in_box(box, World.FREE_FOOD))
+
+        self.world.free(10, 20)
+        self.assertEqual(201, self.world.count_in_box(box, World.FREE_FOOD))
+
+    def test_rotated_box_matches_covered_cells(self):
+        for rotation in (45, 30):
+            box = CollisionBox(30, 25, 6, 20, rotation)
+            polygon = Polygon(box.calculate_corners())
+            # Cells on the box outline count as covered
+            expected = sum(1 for x in range(60) for y in range(60)
+                           if self.world.is_food(x, y) and polygon.covers(Point(x, y)))
+            self.assertEqual(expected, self.world.count_in_box(box, World.FOOD))
+
+
+if __name__ == "__main__":
+    unittest.main()
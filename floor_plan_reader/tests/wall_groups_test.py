@@ -0,0 +1,85 @@
+import gc
+import random
+import unittest
+import weakref
+
+import numpy as np
+from shapely import LineString
+
+from floor_plan_reader.agents.mushroom_agent import Mushroom
+from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.wall_groups import WallGroups
+from floor_plan_reader.world_factory import WorldFactory
+
+
+class TestWallGroups(unittest.TestCase):
+    def setUp(self):
+        wf = WorldFactory()
+        wf.set_grid(np.zeros((300, 300), dtype=int))
+        self.world = wf.create_World()
+        self.groups = self.world.wall_groups
+
+    def create_segment(self, *part_ids):
+        seg = self.world.create_wall_segment()
+        for part_id in part_ids:
+            part = Mushroom(self.world, None, 10, 10, part_id)
+            part.collision_box = CollisionBox.create_from_line(LineString([(0, 10), (20, 10)]), 4)
+            seg.add_part(part)
+        return seg
+
+    def test_merged_segments_resolve_to_the_survivor(self):
+        a, b, c = self.create_segment("a"), self.create_segment("b1", "b2"), self.create_segment("c")
+        self.assertIs(a, self.groups.union(a, b))
+        self.assertIs(c, self.groups.union(c, a))
+
+        self.assertIs(c, self.groups.find(b))
+        self.assertIs(c, self.groups.find(a))
+        # Merging again is a no-op
+        self.assertIs(c, self.groups.union(c, b))
+        self.assertEqual({"a", "b1", "b2", "c"}, {p.id for p in c.parts})
+        self.assertEqual({"a", "b1", "b2", "c"}, set(c.wall_dic))
+
+    def test_merged_segments_are_not_kept(self):
+        a, b = self.create_segment("a"), self.create_segment("b")
+        self.groups.union(a, b)
+        self.assertEqual({"a", "b"}, {p.id for p in a.parts})
+        b.kill()
+        self.world.wall_segments.discard(b)
+        self.world.candidates.remove(b)
+        loser = weakref.ref(b)
+        del b
+        gc.collect()
+        self.assertIsNone(loser())
+
+    def test_axis_buckets_never_reject_coaxial_boxes(self):
+        random.seed(7)
+        coaxial = 0
+        for _ in range(2000):
+            rotation = random.choice([0, 45, 90, 135, 180, 225, 270, 315, 30.5, -90])
+            a = CollisionBox(random.uniform(0, 300), random.uniform(0, 300), 4, 20, rotation)
+            b = CollisionBox(random.uniform(0, 300), random.uniform(0, 300), 4, 20,
+                             rotation + random.choice([0, 180, 0.5]))
+            if a.is_on_same_axis_as(b):
+                coaxial += 1
+                self.assertTrue(WallGroups.same_axis_bucket(WallGroups.axis_key(a), WallGroups.axis_key(b)))
+        self.assertGreater(coaxial, 0)
+
+    def test_crawl_skips_parts_on_other_axes(self):
+        mush = Mushroom(self.world, None, 10, 10, "m")
+        mush.collision_box = CollisionBox.create_from_line(LineString([(0, 10), (20, 10)]), 4)
+        coaxial = Mushroom(self.world, None, 60, 10, "c")
+        coaxial.collision_box = CollisionBox.create_from_line(LineString([(50, 12), (70, 12)]), 4)
+        parallel = Mushroom(self.world, None, 60, 40, "p")
+        parallel.collision_box = CollisionBox.create_from_line(LineString([(50, 40), (70, 40)]), 4)
+        checked = []
+        parallel.is_on_same_axis_as = lambda other: checked.append(other)
+
+        for obj in [coaxial, parallel, coaxial, None]:
+            mush.evaluate_segment_agregate(obj)
+        self.assertEqual({coaxial}, mush.co_axial_walls)
+        # 30 px apart: three buckets, the exact check never runs
+        self.assertEqual([], checked)
+
+
+if __name__ == "__main__":
+    unittest.main()
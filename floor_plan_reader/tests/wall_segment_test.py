@@ -1,4 +1,5 @@
 import unittest
+from unittest import mock
 from itertools import count, permutations
 
 import numpy as np
@@ -7,6 +8,9 @@ from shapely.geometry import LineString, Point
 from floor_plan_reader.agents.mushroom_agent import Mushroom
 from floor_plan_reader.agents.wall_segment import WallSegment
 from floor_plan_reader.math.collision_box import CollisionBox
+from floor_plan_reader.model.edge import Edge
+from floor_plan_reader.model.line import Line
+from floor_plan_reader.model.node import Node
 from floor_plan_reader.world_factory import WorldFactory
 
 
@@ -105,3 +109,68 @@ class TestWallScanner(unittest.TestCase):
                 f"indicating incorrect order"
             )
 
+    def test_openings_from_gaps_between_parts(self):
+        parent_line = [(602.5, 50.0), (602.5, 190.0)]
+        wall = WallSegment(0, self.world)
+        wall.collision_box = CollisionBox.create_from_line(LineString(parent_line), 4)
+        wall.collision_box_extended = wall.collision_box.copy()
+        # Two 10 px gaps, and a part overlapping C that must not create an opening
+        for coords in [[(602.5, 50), (602.5, 90)],
+                       [(602.5, 100), (602.5, 140)],
+                       [(602.5, 150), (602.5, 190)],
+                       [(602.5, 160), (602.5, 175)]]:
+            wall.add_part(self.create_mush(coords))
+
+        openings = sorted(wall.calculate_openings(), key=lambda o: o.center_x)
+
+        self.assertEqual(2, len(openings))
+        self.assertAlmostEqual(-25, openings[0].center_x)
+        self.assertAlmostEqual(25, openings[1].center_x)
+        for o in openings:
+            self.assertAlmostEqual(10, o.width)
+
+    def test_openings_are_cached_until_the_segment_changes(self):
+        wall = WallSegment(0, self.world)
+        wall.collision_box = CollisionBox.create_from_line(LineString([(602.5, 50.0), (602.5, 190.0)]), 4)
+        wall.collision_box_extended = wall.collision_box.copy()
+        for coords in [[(602.5, 50), (602.5, 90)], [(602.5, 100), (602.5, 190)]]:
+            wall.add_part(self.create_mush(coords))
+        edge = Edge(Node((602.5, 50.0)), Node((602.5, 190.0)), Line((602.5, 50.0), (602.5, 190.0), "L0", wall, None))
+
+        with mock.patch.object(wall, "project_parts", wraps=wall.project_parts) as project:
+            first = wall.calculate_openings()
+            self.assertIs(first, wall.calculate_openings())
+            # Exporting reads the cache
+            edge.calculate_opening()
+            edge.get_json()
+            edge.convert_to_scale(0.028)
+            self.assertEqual(1, project.call_count)
+            self.assertEqual(1, len(edge.opening))
+
+            wall.mark_dirty()
+            wall.calculate_openings()
+            self.assertEqual(2, project.call_count)
+
+    def test_openings_follow_a_part_traced_again(self):
+        wall = WallSegment(0, self.world)
+        wall.collision_box = CollisionBox.create_from_line(LineString([(602.5, 50.0), (602.5, 190.0)]), 4)
+        wall.collision_box_extended = wall.collision_box.copy()
+        parts = [self.create_mush(coords) for coords in [[(602.5, 50), (602.5, 90)], [(602.5, 100), (602.5, 190)]]]
+        for i, part in enumerate(parts):
+            part.id = i + 1
+            part.wall_segment = wall
+            wall.add_part(part)
+        self.assertEqual([10], [o.width for o in wall.calculate_openings()])
+
+        # The second part only finds food from 140 on when it traces again on its own
+        self.world.grid[140:191, 601:605] = 1
+        self.world.reset_coverage()
+        for y in range(140, 191):
+            for x in range(601, 605):
+                self.world.occupy(x, y, parts[1])
+        parts[1].performe_ray_trace()
+
+        openings = wall.calculate_openings()
+        self.assertEqual(1, len(openings))
+        self.assertAlmostEqual(49.5, next(iter(openings)).width)
+
@@ -0,0 +1,70 @@
+import math
+
+
+class WallGroups:
+    """
+    Union-find over the wall segments merged into one wall.
+
+    A merged segment points at the segment it was merged into (WallSegment.merged_into), so
+    mushrooms still holding it resolve to the surviving segment with find() instead of merging
+    it again. The links live on the segments, not in a table here, so a merged-away segment
+    goes away with the last mushroom holding it. Merging only links the roots; the survivor
+    collects the parts lazily (WallSegment.merge).
+
+    Coaxial candidates are bucketed by axis_key(): (direction, normal offset) of the line
+    through a box. Coaxial boxes always share the direction and are at most one offset
+    bucket apart, so only those need the exact CollisionBox.is_on_same_axis_as check.
+    """
+    # Bucket size in pixels of the axis offset: the center offset tolerance of
+    # CollisionBox.is_on_same_axis_as, so coaxial boxes are at most one bucket apart
+    OFFSET_STEP = 10.0
+
+    @staticmethod
+    def find(seg):
+        """
+        The segment that `seg` was merged into, following merges all the way; `seg` if it was never merged.
+        """
+        if seg is None:
+            return None
+        root = seg
+        while root.merged_into is not None:
+            root = root.merged_into
+        # Path compression: point everything on the way straight at the root
+        while seg is not root:
+            seg.merged_into, seg = root, seg.merged_into
+        return root
+
+    def union(self, winner, loser):
+        """
+        Merge the group of `loser` into the group of `winner`, the winner's root stays the root.
+
+        Returns:
+            the root of the merged group.
+        """
+        root, other = self.find(winner), self.find(loser)
+        if root is not other:
+            other.merged_into = root
+            root.merge(other)
+        return root
+
+    @staticmethod
+    def axis_key(box):
+        """
+        (direction, offset bucket) of the infinite line through a collision box.
+
+        The direction is the one CollisionBox.is_on_same_axis_as uses (snapped to 45 degrees),
+        flipped to point into the upper half plane so rotations 180 degrees apart share a key.
+        """
+        dx, dy = box.get_direction().direction
+        if dy < 0 or (dy == 0 and dx < 0):
+            dx, dy = -dx, -dy
+        cx, cy = box.get_center()
+        offset = cx * dy - cy * dx
+        return (round(dx, 9), round(dy, 9)), math.floor(offset / WallGroups.OFFSET_STEP)
+
+    @staticmethod
+    def same_axis_bucket(key_a, key_b):
+        """
+        True when boxes with these axis keys may be coaxial: same direction and adjacent offset buckets.
+        """
+        return key_a[0] == key_b[0] and abs(key_a[1] - key_b[1]) <= 1
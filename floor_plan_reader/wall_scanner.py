@@ -1,13 +1,15 @@
-import logging
 import math
 
 from floor_plan_reader.display.point import Point
+from floor_plan_reader.log_util import Log
 from floor_plan_reader.math.Constants import Constants
 from floor_plan_reader.scan_result import ScanResult
 from floor_plan_reader.sonde import Sonde
 from floor_plan_reader.sonde_data import SondeData
 from floor_plan_reader.math.vector import Vector
 
+log = Log(__name__)
+
 
 class WallScanner:
     def __init__(self, world):
@@ -59,7 +61,7 @@ class WallScanner:
                 if mush.wall_segment is not None:
                     wall_free = mush.wall_segment.id == wall_id
                     if not wall_free:
-                        logging.debug("other wall ?")
+                        log.debug("other wall ?")
         elif has_wall:
             wall_free = False
 
@@ -105,8 +107,7 @@ class WallScanner:
             min_y = y
         else:
             pass
-        d_reverse = d.copy()
-        d_reverse.scale(-1)
+        d_reverse = d.opposite()
         back_x, back_y, _ = self.walk_until_invalid(mush, x, y, d_reverse, self.ping)
 
         # 3) Walk forward from that backward boundary
@@ -114,7 +115,7 @@ class WallScanner:
         forward_x, forward_y, forward_steps = self.walk_until_invalid(mush, back_x, back_y, d, self.ping)
 
         if min_x is None:
-            logging.info(f"{x} {y}  {width} {height}")
+            log.info("%s %s  %s %s", x, y, width, height)
         # Step 2: Move one step forward to set the actual starting point
 
         data = SondeData(forward_steps, back_x, back_y, forward_x, forward_y)
@@ -158,12 +159,12 @@ class WallScanner:
         right_bleed = 0
         division_points = []
         half_width = cb.width / 2.0
+        normal_vector = Vector((ndx, ndy))
 
         for i in range(-resolution // 2, resolution // 2 + 1):
             x = int(cx + i * dx + .5)
             y = int(cy + i * dy + .5)
 
-            normal_vector = Vector((ndx, ndy))
             left_vector = normal_vector.opposite()
             min_x, min_y, left_steps = self.walk_until_invalid(mush, x, y, left_vector, self.is_cell_valid)
 
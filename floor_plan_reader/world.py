@@ -2,20 +2,30 @@ import logging
 from collections import deque
 from itertools import count
 
-from PIL import Image
-
 import numpy as np
 import random
 
 from floor_plan_reader.agents.agent_factory import AgentFactory
 from floor_plan_reader.agents.wall_segment import WallSegment
+from floor_plan_reader.debug_artifacts import DebugArtifacts
 from floor_plan_reader.id_util import IdUtil
+from floor_plan_reader.math.collision_box_array import direction_for
+from floor_plan_reader.math.summed_area import LayerCoverage
 from floor_plan_reader.model.edge import Edge
 from floor_plan_reader.model.model import Model
 from floor_plan_reader.model.node import Node
+from floor_plan_reader.recompute_queue import RecomputeQueue
+from floor_plan_reader.wall_groups import WallGroups
 
 
 class World:
+    # Layers with summed-area tables for box coverage, see coverage_ratio()
+    FOOD = "food"
+    OCCUPIED = "occupied"
+    WALL_OCCUPIED = "wall_occupied"
+    FREE_FOOD = "free_food"
+    # Edge in cells of the tiles the coverage tables and the snapshot journal work with
+    TILE = 64
 
     def __init__(self):
         self.num_ants = 0
@@ -28,11 +38,25 @@ class World:
 
         self.occupied = None
         self.walls = set()
+        # id -> live wall, kept with `walls` by the AgentManager, see get_walls_near()
+        self.walls_by_id = {}
         self.agents = set()
         self.wall_segments = set()
         self.zombies = []
         self.blobs = set()
+        self.wall_groups = WallGroups()
+        self.recompute_queue = RecomputeQueue()
         self.model = Model()
+        # layer name -> LayerCoverage, built on the first coverage query
+        self.coverage = None
+        # layer name -> number of writes, a version for caches of what the grids look like
+        self.writes = dict.fromkeys((World.FOOD, World.OCCUPIED, World.WALL_OCCUPIED, World.FREE_FOOD), 0)
+        # GridJournal of an EventLogWriter recording this world, None when not recording
+        self.journal = None
+        # (tile row, tile column) of the tiles written since take_changed_tiles(), None when all of them count
+        self.changed_tiles = None
+        # Debug images of this run, written off the simulation thread
+        self.debug_artifacts = DebugArtifacts()
 
     def has_node(self, node):
         return self.model.has_node(node)
@@ -46,6 +70,12 @@ class World:
     def create_edge(self, node_a, node_b, line):
         return self.model.create_edge(node_a, node_b, line)
 
+    def remove_node(self, node):
+        self.model.remove_node(node)
+
+    def remove_edge(self, edge):
+        self.model.remove_edge(edge)
+
     def get_neighbors_8(self, x, y):
         """Returns all 8 neighboring coordinates."""
         neighbors = [(x + dx, y + dy) for dx in [-1, 0, 1] for dy in [-1, 0, 1] if (dx, dy) != (0, 0)]
@@ -57,6 +87,90 @@ class World:
         self.occupied = np.zeros(self.grid.shape, dtype=np.uint64)
         self.blob_grid = np.zeros(self.grid.shape, dtype=np.uint64)
         self.occupied_wall = np.zeros(self.grid.shape, dtype=np.uint64)
+        self.reset_coverage()
+
+    def reset_coverage(self):
+        """
+        Drop the coverage tables, for when the grids were replaced rather than written cell by cell.
+        """
+        self.coverage = None
+        self.changed_tiles = None
+        for layer in self.writes:
+            self.writes[layer] += 1
+        if self.journal is not None:
+            self.journal.replaced = True
+
+    def _coverage_layer(self, layer):
+        if self.coverage is None:
+            shape = self.grid.shape
+            self.coverage = {
+                World.FOOD: LayerCoverage(shape, lambda y0, y1, x0, x1: self.grid[y0:y1, x0:x1] == 1, World.TILE),
+                World.OCCUPIED: LayerCoverage(shape, lambda y0, y1, x0, x1: self.occupied[y0:y1, x0:x1] != 0,
+                                              World.TILE),
+                World.WALL_OCCUPIED: LayerCoverage(shape,
+                                                   lambda y0, y1, x0, x1: self.occupied_wall[y0:y1, x0:x1] != 0,
+                                                   World.TILE),
+                World.FREE_FOOD: LayerCoverage(shape, lambda y0, y1, x0, x1: (self.grid[y0:y1, x0:x1] == 1) & (
+                        self.occupied[y0:y1, x0:x1] == 0), World.TILE),
+            }
+        return self.coverage[layer]
+
+    def _touch(self, x, y, *layers):
+        for layer in layers:
+            self.writes[layer] += 1
+        if self.journal is not None:
+            self.journal.touch(x, y, layers)
+        if self.changed_tiles is not None:
+            self.changed_tiles.add((y // World.TILE, x // World.TILE))
+        if self.coverage is not None:
+            for layer in layers:
+                self.coverage[layer].mark_dirty(x, y)
+
+    def take_changed_tiles(self):
+        """
+        The tiles written since the last call, and start collecting anew.
+
+        Returns:
+            set of (tile row, tile column), or None when the grids were replaced or never taken:
+            then every tile changed.
+        """
+        tiles, self.changed_tiles = self.changed_tiles, set()
+        return tiles
+
+    def paste_tile(self, ty, tx, grid, occupied, occupied_wall):
+        """
+        Overwrite one tile of the grids, e.g. with the same tile copied from another world.
+        """
+        y0, x0 = ty * World.TILE, tx * World.TILE
+        y1, x1 = y0 + grid.shape[0], x0 + grid.shape[1]
+        self.grid[y0:y1, x0:x1] = grid
+        self.occupied[y0:y1, x0:x1] = occupied
+        self.occupied_wall[y0:y1, x0:x1] = occupied_wall
+        self._touch(x0, y0, World.FOOD, World.OCCUPIED, World.WALL_OCCUPIED, World.FREE_FOOD)
+
+    def count_in_box(self, box, layer):
+        """
+        Cells of `layer` inside a collision box, O(1) for axis aligned boxes.
+        """
+        return self._coverage_layer(layer).count_box(box.calculate_corners(), direction_for(box.rotation))
+
+    def count_on_line(self, start, end, layer):
+        """
+        Cells of `layer` on the pixel line between two cells.
+
+        Returns:
+            the count, or None when the line is neither axis aligned nor diagonal.
+        """
+        return self._coverage_layer(layer).count_line(start, end)
+
+    def coverage_ratio(self, box, layer):
+        """
+        Cells of `layer` inside a collision box per unit of box area.
+        """
+        area = box.get_area()
+        if area == 0:
+            return 0
+        return self.count_in_box(box, layer) / area
 
     def get_occupied_snapshot(self, x, y, width, height):
         grid = self.occupied
@@ -133,44 +247,30 @@ class World:
 
         return color_coded
 
-    def print_occupancy_status(self, x, y, width, height, name_prefix="occupancy"):
-        wall_grid = self.get_clampt_region(x, y, width, height, self.grid)
-        occ = self.get_clampt_region(x, y, width, height, self.occupied)
-        occ_binary = (occ > 0).astype(np.uint8)
-        h, l = occ.shape
-        out = np.zeros((h, l, 3), dtype=np.uint8)
-        for i in range(h):
-            for j in range(l):
-                wall = wall_grid[i, j]
-                occ = occ_binary[i, j]
-                if wall == 0:
-                    out[i, j] = [0, 0, 0]  # black
-                elif wall == 1 and occ == 0:
-                    out[i, j] = [255, 0, 0]  # red
-                elif wall == 1 and occ == 1:
-                    out[i, j] = [0, 255, 0]  # green
-
-        region_image = Image.fromarray(out)
-        if region_image is not None:
-            name = f"debug_output\\occupancy_{name_prefix}_{width}x{height}_{x}_{y}.png"
-            region_image.save(name)
-            logging.info(f"{width}x{height} region saved as '{name}'")
-
-    def print_snapshot(self, x, y, width=20, height=20, name_prefix="region"):
+    def print_occupancy_status(self, x, y, width, height, name_prefix="occupancy", key=None):
+        def build():
+            wall = self.get_clampt_region(x, y, width, height, self.grid) == 1
+            occ = self.get_clampt_region(x, y, width, height, self.occupied) > 0
+            out = np.zeros(wall.shape + (3,), dtype=np.uint8)
+            out[wall & ~occ] = [255, 0, 0]  # red
+            out[wall & occ] = [0, 255, 0]  # green
+            return out
+
+        self.debug_artifacts.save(f"occupancy_{name_prefix}_{width}x{height}_{x}_{y}", build, key)
+
+    def print_snapshot(self, x, y, width=20, height=20, name_prefix="region", key=None):
+        """
+        Save the grid around (x, y) as a debug image, see DebugArtifacts. With a `key`, e.g.
+        (agent id, reason), only the first image of that key is kept.
+        """
         x = int(x)
         y = int(y)
-        # Ensure the region is within the image boundaries
-        color_coded = self.get_grid_snapwhot(x, y, width, height)
-        if color_coded is None:
-            return
-        region_image = Image.fromarray(color_coded)
-        if region_image is not None:
-            name = f"debug_output\\{name_prefix}_{width}x{height}_{x}_{y}.png"
-            region_image.save(name)
-            logging.info(f"{width}x{height} region saved as '{name}'")
+        self.debug_artifacts.save(f"{name_prefix}_{width}x{height}_{x}_{y}",
+                                  lambda: self.get_grid_snapwhot(x, y, width, height), key)
 
     def free(self, x, y):
         self.occupied[int(y), int(x)] = 0
+        self._touch(int(x), int(y), World.OCCUPIED, World.FREE_FOOD)
 
     def is_any_occupied(self, x, y):
         h, w = self.grid.shape
@@ -197,6 +297,25 @@ class World:
             return i_val != 0
         return True  # Out of bounds is occupied
 
+    def sample_cells(self, xs, ys):
+        """
+        Gather food and occupancy for many cells in one indexing pass.
+
+        Out of bounds cells are not food and count as occupied, like is_food and is_occupied.
+
+        Returns:
+            (food, occupied) boolean arrays aligned with xs, ys.
+        """
+        xs = np.asarray(xs, dtype=np.int64)
+        ys = np.asarray(ys, dtype=np.int64)
+        h, w = self.grid.shape
+        inside = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+        food = np.zeros(len(xs), dtype=bool)
+        occupied = np.ones(len(xs), dtype=bool)
+        food[inside] = self.grid[ys[inside], xs[inside]] == 1
+        occupied[inside] = self.occupied[ys[inside], xs[inside]] != 0
+        return food, occupied
+
     def get_shape(self):
         return self.grid.shape
 
@@ -207,6 +326,7 @@ class World:
             return
 
         self.occupied[int(y), int(x)] = mush.id
+        self._touch(int(x), int(y), World.OCCUPIED, World.FREE_FOOD)
 
     def get_obj_by_id(self, id):
         for a in self.agents:
@@ -219,6 +339,19 @@ class World:
             return self.occupied[int(y), int(x)]
         return 0
 
+    def get_walls_near(self, x, y, radius):
+        """
+        Walls occupying a cell at most `radius` cells from (x, y), in id order.
+
+        The occupied grid doubles as an id buffer of the walls, so this reads a small window
+        of it instead of testing every wall.
+        """
+        x, y = int(x), int(y)
+        h, w = self.occupied.shape
+        region = self.occupied[max(0, y - radius):min(h, y + radius + 1), max(0, x - radius):min(w, x + radius + 1)]
+        ids = np.unique(region[region != 0])
+        return [self.walls_by_id[i] for i in ids.tolist() if i in self.walls_by_id]
+
     def get_occupied_wall_id(self, x, y):
         if self.is_within_bounds(x, y):
             return self.occupied_wall[int(y), int(x)]
@@ -238,6 +371,7 @@ class World:
         if y >= h or x >= l:
             return
         self.occupied_wall[y, x] = wall.id
+        self._touch(x, y, World.WALL_OCCUPIED)
 
     def find_all(self, type):
         results = []
@@ -288,6 +422,7 @@ class World:
         y = int(point[1])
         if self.is_within_bounds(x, y):
             self.grid[y, x] = value
+            self._touch(x, y, World.FOOD, World.FREE_FOOD)
 
     def is_food_at(self, location):
         return self.is_food(int(location[0]), int(location[1]))
@@ -6,6 +6,8 @@ import networkx as nx
 import pygame
 from pathlib import Path
 
+from floor_plan_reader.math.snap_index import SnapIndex
+
 
 ###############################################################################
 # PART 1: FLOORPLAN ANALYZER
@@ -50,6 +52,9 @@ def keep_dark_tones(image_path, dark_threshold=80):
 
 
 class FloorplanAnalyzer:
+    # Bucket size in pixels of the wall point index
+    WALL_INDEX_CELL = 32
+
     def __init__(self, door_template_path=None, window_template_path=None):
         """
         Initialize the floorplan analyzer with optional templates for doors and windows.
@@ -226,6 +231,10 @@ class FloorplanAnalyzer:
 
         # Add edges for wall segments
         point_to_idx = {point: i for i, point in enumerate(points)}
+        # Wall points by position, for the door/window connections below
+        wall_index = SnapIndex(self.WALL_INDEX_CELL)
+        for point, i in point_to_idx.items():
+            wall_index.add(point[0], point[1], i)
         for start, end in wall_segments:
             if start in point_to_idx and end in point_to_idx:
                 G.add_edge(point_to_idx[start], point_to_idx[end], type='wall')
@@ -236,7 +245,7 @@ class FloorplanAnalyzer:
             G.add_node(node_id, pos=door_pos, type='door')
 
             # Find closest wall points and connect
-            self._connect_to_closest_walls(G, node_id, door_pos, points, point_to_idx)
+            self._connect_to_closest_walls(G, node_id, door_pos, wall_index)
 
         # Add nodes for windows
         for i, window_pos in enumerate(windows):
@@ -244,7 +253,7 @@ class FloorplanAnalyzer:
             G.add_node(node_id, pos=window_pos, type='window')
 
             # Find closest wall points and connect
-            self._connect_to_closest_walls(G, node_id, window_pos, points, point_to_idx)
+            self._connect_to_closest_walls(G, node_id, window_pos, wall_index)
 
         # Add room information
         for i, room in enumerate(rooms):
@@ -257,17 +266,10 @@ class FloorplanAnalyzer:
 
         return G
 
-    def _connect_to_closest_walls(self, G, node_id, pos, points, point_to_idx, k=2):
+    def _connect_to_closest_walls(self, G, node_id, pos, wall_index, k=2):
         """Helper to connect elements to closest walls"""
-        # Calculate distances to all wall points
-        distances = [np.sqrt((pos[0] - p[0]) ** 2 + (pos[1] - p[1]) ** 2) for p in points]
-
-        # Find k closest points
-        closest_indices = np.argsort(distances)[:k]
-
-        # Connect to closest points
-        for idx in closest_indices:
-            wall_node_id = point_to_idx[points[idx]]
+        # Connect to the k closest wall points
+        for _, wall_node_id in wall_index.nearest(pos[0], pos[1], k):
             G.add_edge(node_id, wall_node_id, type='connection')
 
     def process_floorplan(self, image_path):
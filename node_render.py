@@ -5,6 +5,8 @@ import os
 import bpy
 
 from ResourceFinder import get_finder
+from floor_plan_reader.model import columnar_plan
+from floor_plan_reader.model.columnar_plan import ColumnarPlan
 from furnitures_gen.furniture_factory import FurnitureFactory
 from furnitures_gen.materials import MaterialFactory
 from furnitures_gen.segment_factory import SegmentFactory
@@ -12,38 +14,34 @@ from furnitures_gen.segment_factory import SegmentFactory
 
 class NodeRender:
     @staticmethod
-    def render_nodes(data,nodes_lookup):
-        for node_dict in data["nodes"]:
-            node_id = node_dict["id"]
-            x = node_dict["x"]
-            y = node_dict["y"]
-            nodes_lookup[node_id] = (x, y)
+    def render_nodes(plan):
+        for node_id, (x, y) in zip(plan.node_ids.tolist(), plan.node_xy.tolist()):
             NodeRender.create_marker((x,y,0),node_id)
 
     @staticmethod
-    def render_edges(data,nodes_lookup,house_parent):
-        for edge in data["edges"]:
+    def render_edges(plan,house_parent):
+        for i, id_str in enumerate(plan.edge_ids.tolist()):
             NodeRender.create_wall_segment(
-                edge_data=edge,
-                nodes_lookup=nodes_lookup,
+                plan=plan,
+                edge_index=i,
                 parent_obj=house_parent
             )
-            id_str = edge.get('id')
             output_path = os.path.abspath(f"blend_output\\{id_str}.blend")
             bpy.ops.wm.save_as_mainfile(filepath=output_path)
     @staticmethod
-    def build_house_from_data(data):
+    def build_house_from_data(plan):
+        """
+        Build the house from a ColumnarPlan, reading its arrays directly.
+        """
         # Create an Empty to hold all walls
         bpy.ops.object.empty_add(type='PLAIN_AXES', location=(0, 0, 0))
         house_parent = bpy.context.object
         house_parent.name = "HouseRoot"
-        # Parse nodes into a dictionary for quick lookup
-        nodes_lookup = {}
-        NodeRender.render_nodes(data,nodes_lookup)
+        NodeRender.render_nodes(plan)
 
         # Create each wall from edges
-        NodeRender.render_edges(data,nodes_lookup,house_parent)
-        for furniture in data["furnitures"]:
+        NodeRender.render_edges(plan,house_parent)
+        for furniture in plan.extra.get("furnitures", []):
             NodeRender.create_furniture(furniture,house_parent)
 
     @staticmethod
@@ -69,6 +67,18 @@ class NodeRender:
         data = get_finder().load_json(filepath)
         return data
 
+    @staticmethod
+    def load_floorplan(filepath):
+        """
+        Load the plan as a ColumnarPlan: memory mapped from the columnar plan saved next to
+        the JSON when it is up to date, else parsed from the JSON.
+        """
+        resource_dir = get_finder().resource_dir
+        directory = os.path.join(resource_dir, os.path.splitext(filepath)[0] + columnar_plan.SUFFIX)
+        if ColumnarPlan.is_up_to_date(directory, os.path.join(resource_dir, filepath)):
+            return ColumnarPlan.load(directory)
+        return ColumnarPlan.from_floorplan_dict(NodeRender.load_floorplan_json(filepath))
+
     @staticmethod
     def create_marker(location, name):
         bpy.ops.object.empty_add(type='SPHERE', radius=0.2, location=location)
@@ -80,27 +90,26 @@ class NodeRender:
         filepath = "corrected_floorplan.json"
         #filepath = "experiment_floorplan.json"
         #filepath = "corrected_floorplan.json"
-        floorplan_data = NodeRender.load_floorplan_json(filepath)
+        floorplan_data = NodeRender.load_floorplan(filepath)
         NodeRender.build_house_from_data(floorplan_data)
 
     @staticmethod
-    def create_wall_segment(edge_data, nodes_lookup, parent_obj):
+    def create_wall_segment(plan, edge_index, parent_obj):
         """
         Creates a 3D wall segment (a rectangular prism) from the center-line
         definition plus optional door/window openings.
         """
-        start_node = edge_data["start_node"]
-        end_node = edge_data["end_node"]
+        start_node, end_node = plan.edge_nodes[edge_index]
 
         # Retrieve the 2D coordinates of the nodes
-        xA, yA = nodes_lookup[start_node]
-        xB, yB = nodes_lookup[end_node]
-
-        wall_type = edge_data.get("wall_type", "interior")
-        stud_type = edge_data.get("stud_type", "2x4")
-        wall_height = edge_data.get("height", 2.4)
-        openings = edge_data.get("openings", [])
-        name = edge_data.get("id", "N/A")
+        xA, yA = plan.node_xy[start_node].tolist()
+        xB, yB = plan.node_xy[end_node].tolist()
+
+        wall_type = str(plan.edge_wall_type[edge_index])
+        stud_type = str(plan.edge_stud_type[edge_index])
+        wall_height = float(plan.edge_height[edge_index])
+        openings = plan.opening_dicts(plan.openings_of(edge_index))
+        name = str(plan.edge_ids[edge_index])
 
         dx = xB - xA
         dy = yB - yA
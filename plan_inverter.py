@@ -1,10 +1,17 @@
 import json
 import os
 
+from floor_plan_reader.model import columnar_plan
+from floor_plan_reader.model.columnar_plan import ColumnarPlan
+
 # Replace with your actual plan dimensions
 PLAN_WIDTH = 1000
 PLAN_HEIGHT = 1000
 
+PIXEL_TO_METER = 0.028
+# Where the plan origin lands in the generator scene, in meters
+OFFSET = (-9.67246, 7.68846)
+
 INPUT_PATH = "resources/experiment_floorplan_diag.json"
 OUTPUT_PATH = "resources/corrected_floorplan.json"
 
@@ -16,34 +23,19 @@ def convert_point(x, y):
 
 
 def fix_coordinates(data):
-    pixel_to_meter = 0.028
-    for node in data.get("nodes", []):
-        x = node["x"]
-        y = node["y"]
-        new_x = x * pixel_to_meter
-        new_y = y * pixel_to_meter
-        node["x"] = new_x + -9.67246
-        node["y"] = -new_y + 7.68846
-
-    for edge in data.get("edges", []):
-        for opening in edge.get("openings", []):
-            width = opening.get("width")
-            new_width = width * pixel_to_meter
-            opening["width"] = new_width
-            center_x = opening.get("center_x")
-            opening["center_x"] = center_x * pixel_to_meter
-
-    return data
+    plan = ColumnarPlan.from_floorplan_dict(data)
+    return plan.transformed(PIXEL_TO_METER, OFFSET, flip_y=True)
 
 
 def main():
     with open(INPUT_PATH, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    fixed_data = fix_coordinates(data)
+    plan = fix_coordinates(data)
 
     with open(OUTPUT_PATH, 'w', encoding='utf-8') as f:
-        json.dump(fixed_data, f, indent=4)
+        json.dump(plan.to_floorplan_dict(), f, indent=4)
+    plan.save(os.path.splitext(OUTPUT_PATH)[0] + columnar_plan.SUFFIX)
 
     print(f"✅ Saved corrected file to {OUTPUT_PATH}")
 